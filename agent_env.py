@@ -0,0 +1,336 @@
+"""
+Reset/step environment API for training agents
+
+ZombieEnv wraps a headless GameplayState. Each step applies one of the
+discrete ACTIONS, simulates ENV_ACTION_REPEAT ticks and returns a flat
+float32 observation built from the entities (nothing is drawn), a reward
+for points scored minus damage taken, and gym-style terminated/truncated
+flags.
+
+VectorEnv runs many environments across worker processes. Actions,
+observations, rewards and done flags live in shared memory, so a step
+only sends one short message to each worker.
+
+Benchmark with: python agent_env.py [--envs N] [--workers N] [--steps N]
+"""
+import sys
+import math
+import time
+import argparse
+import itertools
+import multiprocessing
+import numpy as np
+from settings import (
+    WIDTH, HEIGHT, GAMEOVER, PLAYER_JUMP_POWER,
+    ENV_NEAREST_ZOMBIES, ENV_NEAREST_PROJECTILES, ENV_ACTION_REPEAT, ENV_MAX_TICKS,
+    ENV_SCORE_WEIGHT, ENV_DAMAGE_WEIGHT
+)
+from headless import init_headless, HeadlessManager
+from level_data import ensure_compiled
+
+# Actions: horizontal move, jump, and no shot or a shot in one of 8 directions
+MOVES = (0, -1, 1)
+AIMS = (None,) + tuple((math.cos(i * math.pi / 4), math.sin(i * math.pi / 4)) for i in range(8))
+ACTIONS = tuple(itertools.product(MOVES, (False, True), AIMS))
+AIM_DISTANCE = 100  # How far from the player the simulated mouse is placed
+
+# Observation layout: player features, then fixed slots for the nearest
+# zombies and projectiles. Empty slots are all zeros.
+PLAYER_FEATURES = ("x", "y", "velocity_y", "health", "on_ground", "facing_right",
+                   "progress", "wave", "enemies")
+ZOMBIE_FEATURES = ("present", "dx", "dy", "health", "facing", "attacking")
+PROJECTILE_FEATURES = ("present", "dx", "dy", "dir_x", "dir_y")
+ZOMBIES_START = len(PLAYER_FEATURES)
+PROJECTILES_START = ZOMBIES_START + ENV_NEAREST_ZOMBIES * len(ZOMBIE_FEATURES)
+OBSERVATION_SIZE = PROJECTILES_START + ENV_NEAREST_PROJECTILES * len(PROJECTILE_FEATURES)
+
+def nearest(dx, dy, count):
+    """Indices of the count smallest distances, nearest first"""
+    distance = dx * dx + dy * dy
+    if len(distance) > count:
+        index = np.argpartition(distance, count - 1)[:count]
+    else:
+        index = np.arange(len(distance))
+    return index[np.argsort(distance[index], kind="stable")]
+
+class ZombieEnv:
+    """One headless game behind a reset/step interface"""
+
+    observation_size = OBSERVATION_SIZE
+    action_count = len(ACTIONS)
+
+    def __init__(self, level=1, action_repeat=ENV_ACTION_REPEAT, max_ticks=ENV_MAX_TICKS):
+        from game_states import GameplayState
+
+        init_headless()
+        self.action_repeat = action_repeat
+        self.max_ticks = max_ticks
+        self.manager = HeadlessManager()
+        self.state = GameplayState(self.manager, level, history=False, effects=False)
+        self.level_width = max(self.state.level_data.width, 1)
+
+    def reset(self, seed=None, out=None):
+        """
+        Restart the level, reseeding the game's random generator if a seed is given
+
+        Returns:
+            tuple: (observation, info)
+        """
+        if seed is not None:
+            self.state.rng.seed(seed)
+        self.state.reset()
+        self.manager.outcome = None
+        return self.observe(out), {}
+
+    def step(self, action, out=None):
+        """
+        Apply an action and simulate until the next decision
+
+        Args:
+            action (int): Index into ACTIONS
+            out (ndarray): Optional buffer to write the observation into
+
+        Returns:
+            tuple: (observation, reward, terminated, truncated, info)
+        """
+        state = self.state
+        player = state.player
+        move, jump, aim = ACTIONS[action]
+
+        player.moving_left = move < 0
+        player.moving_right = move > 0
+        if jump:
+            player.jump()
+        if aim is not None:
+            center_x = player.x + player.width / 2
+            center_y = player.y + player.height / 2
+            target = (center_x + aim[0] * AIM_DISTANCE, center_y + aim[1] * AIM_DISTANCE)
+            player.shoot(target, state.camera_offset_x, state.projectiles)
+
+        score = state.score
+        health = player.health
+        for _ in range(self.action_repeat):
+            state.update()
+            if self.manager.outcome is not None:
+                break
+
+        score_delta = state.score - score
+        damage = health - max(player.health, 0)
+        reward = score_delta * ENV_SCORE_WEIGHT - damage * ENV_DAMAGE_WEIGHT
+        terminated = self.manager.outcome is not None
+        truncated = not terminated and state.tick >= self.max_ticks
+        info = {"score": state.score, "wave": state.wave, "tick": state.tick,
+                "died": self.manager.outcome == GAMEOVER}
+        return self.observe(out), reward, terminated, truncated, info
+
+    def observe(self, out=None):
+        """Build the observation vector from the current entities"""
+        if out is None:
+            out = np.zeros(OBSERVATION_SIZE, dtype=np.float32)
+        else:
+            out.fill(0)
+
+        state = self.state
+        player = state.player
+        center_x = player.x + state.camera_offset_x + player.width / 2
+        center_y = player.y + player.height / 2
+        out[:ZOMBIES_START] = (
+            player.x / WIDTH,
+            player.y / HEIGHT,
+            player.velocity_y / -PLAYER_JUMP_POWER,
+            player.health / player.max_health,
+            player.on_ground,
+            player.facing_right,
+            state.camera_offset_x / self.level_width,
+            state.wave / state.tuning.max_waves,
+            len(state.enemies) / state.tuning.wave_size(state.tuning.max_waves),
+        )
+
+        if state.enemies:
+            zombies = np.array([
+                (e.x + e.width / 2 - center_x, e.y + e.height / 2 - center_y,
+                 e.health / e.max_health, e.facing_right, e.is_attacking)
+                for e in state.enemies
+            ], dtype=np.float32)
+            index = nearest(zombies[:, 0], zombies[:, 1], ENV_NEAREST_ZOMBIES)
+            slots = out[ZOMBIES_START:PROJECTILES_START].reshape(ENV_NEAREST_ZOMBIES, len(ZOMBIE_FEATURES))
+            chosen = zombies[index]
+            count = len(index)
+            slots[:count, 0] = 1
+            slots[:count, 1] = chosen[:, 0] / WIDTH
+            slots[:count, 2] = chosen[:, 1] / HEIGHT
+            slots[:count, 3] = chosen[:, 2]
+            slots[:count, 4] = chosen[:, 3] * 2 - 1
+            slots[:count, 5] = chosen[:, 4]
+
+        if state.projectiles:
+            projectiles = np.array([
+                (p.x - center_x, p.y - center_y, p.dir_x, p.dir_y)
+                for p in state.projectiles
+            ], dtype=np.float32)
+            index = nearest(projectiles[:, 0], projectiles[:, 1], ENV_NEAREST_PROJECTILES)
+            slots = out[PROJECTILES_START:].reshape(ENV_NEAREST_PROJECTILES, len(PROJECTILE_FEATURES))
+            chosen = projectiles[index]
+            count = len(index)
+            slots[:count, 0] = 1
+            slots[:count, 1] = chosen[:, 0] / WIDTH
+            slots[:count, 2] = chosen[:, 1] / HEIGHT
+            slots[:count, 3:5] = chosen[:, 2:4]
+
+        return out
+
+def env_worker(pipe, start, stop, level, observations, actions, rewards, terminated, truncated):
+    """
+    Step environments start..stop on each command from VectorEnv
+
+    Finished environments are reset straight away, so the observation
+    written for them is the first one of their next episode.
+    """
+    from debug import set_log_level, ERROR
+    set_log_level(ERROR)
+
+    obs = np.frombuffer(observations, dtype=np.float32).reshape(-1, OBSERVATION_SIZE)
+    act = np.frombuffer(actions, dtype=np.int32)
+    rew = np.frombuffer(rewards, dtype=np.float32)
+    term = np.frombuffer(terminated, dtype=np.bool_)
+    trunc = np.frombuffer(truncated, dtype=np.bool_)
+    envs = {i: ZombieEnv(level) for i in range(start, stop)}
+
+    while True:
+        command, data = pipe.recv()
+        if command == "step":
+            episodes = []
+            for i, env in envs.items():
+                _, rew[i], term[i], trunc[i], info = env.step(act[i], obs[i])
+                if term[i] or trunc[i]:
+                    episodes.append((i, info))
+                    env.reset(out=obs[i])
+            pipe.send(episodes)
+        elif command == "reset":
+            for i, env in envs.items():
+                env.reset(None if data is None else data + i, obs[i])
+            pipe.send(None)
+        elif command == "close":
+            pipe.close()
+            return
+
+class VectorEnv:
+    """
+    Many ZombieEnvs stepped in parallel across worker processes
+
+    step() and reset() return views of the shared buffers; they are
+    overwritten by the next call, so copy anything that must be kept.
+    """
+
+    def __init__(self, num_envs, level=1, workers=None):
+        workers = min(workers or multiprocessing.cpu_count(), num_envs)
+        self.num_envs = num_envs
+        self.observation_size = OBSERVATION_SIZE
+        self.action_count = len(ACTIONS)
+
+        # Compile the level once here rather than racing to in every worker
+        ensure_compiled(level)
+
+        # Fork where available so workers share the already imported game
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+        else:
+            context = multiprocessing.get_context()
+
+        buffers = (
+            context.RawArray("f", num_envs * OBSERVATION_SIZE),
+            context.RawArray("i", num_envs),
+            context.RawArray("f", num_envs),
+            context.RawArray("b", num_envs),
+            context.RawArray("b", num_envs),
+        )
+        self.observations = np.frombuffer(buffers[0], dtype=np.float32).reshape(num_envs, OBSERVATION_SIZE)
+        self.actions = np.frombuffer(buffers[1], dtype=np.int32)
+        self.rewards = np.frombuffer(buffers[2], dtype=np.float32)
+        self.terminated = np.frombuffer(buffers[3], dtype=np.bool_)
+        self.truncated = np.frombuffer(buffers[4], dtype=np.bool_)
+
+        # Split the environments evenly, one pipe per worker
+        self.pipes = []
+        self.processes = []
+        bounds = np.linspace(0, num_envs, workers + 1).astype(int)
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            parent, child = context.Pipe()
+            process = context.Process(target=env_worker, daemon=True,
+                                      args=(child, start, stop, level, *buffers))
+            process.start()
+            child.close()
+            self.pipes.append(parent)
+            self.processes.append(process)
+
+    def reset(self, seed=None):
+        """
+        Restart every environment; environment i is seeded with seed + i
+
+        Returns:
+            ndarray: (num_envs, observation_size) observations
+        """
+        for pipe in self.pipes:
+            pipe.send(("reset", seed))
+        for pipe in self.pipes:
+            pipe.recv()
+        return self.observations
+
+    def step(self, actions):
+        """
+        Step every environment with its action
+
+        Returns:
+            tuple: (observations, rewards, terminated, truncated, episodes),
+                where episodes lists (env index, final info) for each episode
+                that ended this step
+        """
+        self.actions[:] = actions
+        for pipe in self.pipes:
+            pipe.send(("step", None))
+        episodes = []
+        for pipe in self.pipes:
+            episodes.extend(pipe.recv())
+        return self.observations, self.rewards, self.terminated, self.truncated, episodes
+
+    def close(self):
+        for pipe in self.pipes:
+            try:
+                pipe.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        self.pipes = []
+        self.processes = []
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure VectorEnv throughput with random actions")
+    parser.add_argument("--envs", type=int, default=16, help="environments")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--steps", type=int, default=500, help="vector steps to run")
+    parser.add_argument("--level", type=int, default=1, help="level to play")
+    args = parser.parse_args()
+
+    envs = VectorEnv(args.envs, args.level, args.workers)
+    try:
+        envs.reset(seed=0)
+        rng = np.random.default_rng(0)
+        episodes = []
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            _, _, _, _, done = envs.step(rng.integers(0, envs.action_count, args.envs))
+            episodes.extend(done)
+        elapsed = time.perf_counter() - start
+    finally:
+        envs.close()
+
+    steps = args.steps * args.envs
+    print(f"{steps} env steps in {elapsed:.2f}s: {steps / elapsed:.0f} steps/s, "
+          f"{steps * ENV_ACTION_REPEAT / elapsed:.0f} ticks/s, {len(episodes)} episodes finished")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Shared animation clips and the animation clock
+
+A Clip holds the frames of one animation for both facings and is shared
+by every entity that plays it. Entities don't step their own animation:
+they remember the clock tick their current clip started on, and the frame
+is worked out from the clock only when an entity is actually drawn.
+"""
+
+class AnimationClock:
+    """Tick count every animation is timed against"""
+
+    def __init__(self):
+        self.tick = 0
+
+    def advance(self):
+        self.tick += 1
+
+class Clip:
+    """Immutable frames of one animation, facing right and left"""
+
+    __slots__ = ("right", "left", "delay")
+
+    def __init__(self, right, left, delay):
+        object.__setattr__(self, "right", tuple(right))
+        object.__setattr__(self, "left", tuple(left))
+        object.__setattr__(self, "delay", delay)  # Ticks each frame is shown for
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Clips are shared and can't be changed")
+
+    def __bool__(self):
+        return bool(self.right and self.left)
+
+    def frame(self, start_tick, facing_right=True):
+        """
+        Frame shown by an entity that started this clip on start_tick
+
+        Returns:
+            Surface: The frame, or None if the clip has no frames for the facing
+        """
+        frames = self.right if facing_right else self.left
+        if not frames:
+            return None
+        return frames[(animation_clock.tick - start_tick) // self.delay % len(frames)]
+
+def make_clips(sprites, delay):
+    """Build clips from {animation: {"right": frames, "left": frames}}"""
+    return {animation: Clip(frames.get("right", ()), frames.get("left", ()), delay)
+            for animation, frames in sprites.items()}
+
+# Global clock; gameplay keeps it at the simulation tick
+animation_clock = AnimationClock()
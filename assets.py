@@ -0,0 +1,108 @@
+"""
+Cached asset manifest
+
+Instead of probing the filesystem for every sprite and background, the game
+looks assets up in a manifest of the asset directories. The manifest is
+cached on disk and only rebuilt when one of the directories it covers has
+changed, which takes one stat per directory to check.
+"""
+import os
+import json
+from settings import ASSET_DIRS, ASSET_MANIFEST_FILE
+from debug import add_debug, DEBUG
+
+# Manifest format version, bump when the layout changes
+MANIFEST_VERSION = 1
+
+# Loaded manifest, built on first use
+_manifest = None
+
+def _normalize(path):
+    """Normalize a relative asset path so lookups match manifest keys"""
+    return os.path.normpath(path).replace(os.sep, "/")
+
+def build_manifest():
+    """
+    Walk the asset directories and record every file in them
+
+    Returns:
+        dict: {"version", "dirs": {dir: mtime_ns}, "files": {path: size}}
+    """
+    dirs = {}
+    files = {}
+
+    # Loose images in the game's root directory are allowed as fallbacks
+    dirs["."] = os.stat(".").st_mtime_ns
+    for name in os.listdir("."):
+        if name.lower().endswith(".png") and os.path.isfile(name):
+            files[name] = os.path.getsize(name)
+
+    for top in ASSET_DIRS:
+        for root, _, names in os.walk(top):
+            dirs[_normalize(root)] = os.stat(root).st_mtime_ns
+            for name in names:
+                path = os.path.join(root, name)
+                files[_normalize(path)] = os.path.getsize(path)
+
+    return {"version": MANIFEST_VERSION, "dirs": dirs, "files": files}
+
+def _manifest_is_current(manifest):
+    """Check that no covered directory has gained or lost files"""
+    if manifest.get("version") != MANIFEST_VERSION:
+        return False
+    for top in ASSET_DIRS:
+        if top not in manifest["dirs"] and os.path.isdir(top):
+            return False
+    try:
+        for path, mtime in manifest["dirs"].items():
+            if os.stat(path).st_mtime_ns != mtime:
+                return False
+    except OSError:
+        return False
+    return True
+
+def load_manifest():
+    """Return the asset manifest, rebuilding the cached copy if it is stale"""
+    global _manifest
+    if _manifest is not None:
+        return _manifest
+
+    try:
+        with open(ASSET_MANIFEST_FILE) as f:
+            manifest = json.load(f)
+        if _manifest_is_current(manifest):
+            _manifest = manifest
+            add_debug("Asset manifest loaded from cache (%d files)", len(manifest["files"]), level=DEBUG)
+            return _manifest
+    except (OSError, ValueError, KeyError):
+        pass
+
+    _manifest = build_manifest()
+    add_debug("Asset manifest rebuilt (%d files)", len(_manifest["files"]))
+    try:
+        os.makedirs(os.path.dirname(ASSET_MANIFEST_FILE), exist_ok=True)
+        with open(ASSET_MANIFEST_FILE, "w") as f:
+            json.dump(_manifest, f)
+    except OSError as e:
+        add_debug("Could not cache asset manifest: %s", e)
+    return _manifest
+
+def asset_exists(path):
+    """Return True if the asset is listed in the manifest"""
+    return _normalize(path) in load_manifest()["files"]
+
+def find_asset(*candidates):
+    """Return the first candidate path that exists, or None"""
+    files = load_manifest()["files"]
+    for path in candidates:
+        if _normalize(path) in files:
+            return path
+    return None
+
+def list_assets(directory):
+    """Return the names of the files directly inside an asset directory"""
+    prefix = _normalize(directory) + "/"
+    return sorted(
+        path[len(prefix):] for path in load_manifest()["files"]
+        if path.startswith(prefix) and "/" not in path[len(prefix):]
+    )
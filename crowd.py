@@ -0,0 +1,63 @@
+"""
+Crowd separation for hordes of zombies
+
+Zombies chasing the same player otherwise walk into one spot and draw as a
+single sprite. Each tick, grounded zombies are hashed into a grid of
+CROWD_CELL wide cells, one row of cells per surface they stand on. Only
+neighbours next to each other along a row are compared, within a cell and
+across into the next cell, and overlapping pairs are pushed apart. A stack
+spreads out into a queue over a few ticks, and the cost grows with the
+number of zombies rather than the number of pairs.
+"""
+from operator import itemgetter
+from settings import CROWD_CELL, CROWD_SPACING, CROWD_PUSH
+
+by_center = itemgetter(0)
+
+def separate(enemies):
+    """
+    Push apart grounded zombies standing too close on the same surface
+
+    Airborne zombies are left alone; they land where physics puts them and
+    are spaced out once they do.
+
+    Args:
+        enemies (list): Zombies to separate
+
+    Returns:
+        int: Neighbour pairs compared
+    """
+    # Cell (feet y, cell index) -> [center x, half width, zombie] entries in it
+    grid = {}
+    for zombie in enemies:
+        if zombie.on_ground:
+            half_width = zombie.width / 2
+            center = zombie.x + half_width
+            key = (zombie.y + zombie.height, int(center // CROWD_CELL))
+            cell = grid.get(key)
+            if cell is None:
+                grid[key] = [[center, half_width, zombie]]
+            else:
+                cell.append([center, half_width, zombie])
+
+    for cell in grid.values():
+        if len(cell) > 1:
+            cell.sort(key=by_center)
+
+    pairs = 0
+    for (feet, index), cell in grid.items():
+        # The leftmost zombie of the next cell along is this cell's last neighbour
+        following = grid.get((feet, index + 1))
+        neighbours = cell + following[:1] if following is not None else cell
+        left = neighbours[0]
+        for right in neighbours[1:]:
+            overlap = (left[1] + right[1]) * CROWD_SPACING - (right[0] - left[0])
+            if overlap > 0:
+                push = min(overlap / 2, CROWD_PUSH)
+                left[0] -= push
+                left[2].x -= push
+                right[0] += push
+                right[2].x += push
+            left = right
+        pairs += len(neighbours) - 1
+    return pairs
@@ -1,78 +1,198 @@
 """
 Debug utilities for displaying debug information and logging to file
+
+Log records are pushed onto a bounded ring buffer and written to the log
+file by a background thread, so logging never touches the disk from the
+frame thread.
 """
 import pygame
 import os
 import time
-from settings import DEBUG_FONT, WHITE, BLACK, WIDTH, HEIGHT
+import atexit
+import threading
+from collections import deque
+from settings import (
+    DEBUG_FONT, WHITE, BLACK, WIDTH, HEIGHT,
+    LOG_FILE, LOG_LEVEL, LOG_BUFFER_SIZE, LOG_FLUSH_INTERVAL,
+    LOG_MAX_BYTES, LOG_BACKUP_COUNT
+)
+from profiler import profiler
+from surface_memory import surface_memory
+
+# Log levels
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
 
-# Global debug messages list
-debug_messages = []
+# Messages below this level are dropped before they are formatted
+log_level = {name: level for level, name in LEVEL_NAMES.items()}[LOG_LEVEL]
 
-# Set up file logging
-log_file = "debug_log.txt"
+# Recent on-screen debug records, oldest first
+debug_messages = deque(maxlen=10)
 
-# Clear the log file when the game starts
-try:
-    with open(log_file, 'w') as f:
-        f.write(f"=== Debug Log Started at {time.strftime('%Y-%m-%d %H:%M:%S')} ===\n\n")
-except Exception as e:
-    print(f"Error initializing log file: {e}")
+# Pending (timestamp, level, message, args) records for the writer thread.
+# deque.append and deque.popleft are atomic, so the frame thread never
+# waits on a lock; when the writer falls behind the oldest records are lost.
+log_buffer = deque(maxlen=LOG_BUFFER_SIZE)
 
-def log_to_file(message):
-    """Write a message to the log file"""
+def format_message(message, args):
+    """Apply %-style arguments to a message, if there are any"""
+    if not args:
+        return message
     try:
-        with open(log_file, 'a') as f:
-            f.write(f"{message}\n")
-    except Exception as e:
-        print(f"Error writing to log file: {e}")
-
-def add_debug(message):
-    """Add a debug message to the list and log to file"""
-    global debug_messages
-    # Add timestamp to the message
-    timestamp = time.strftime("%H:%M:%S")
-    formatted_message = f"[{timestamp}] {message}"
-    
-    # Log to file
-    log_to_file(formatted_message)
-    
-    # Add to on-screen messages
-    debug_messages.append(message)  # Don't show timestamp on screen to save space
-    if len(debug_messages) > 10:  # Keep only the last 10 messages
-        debug_messages.pop(0)
+        return message % args
+    except (TypeError, ValueError):
+        return f"{message} {args}"
+
+class LogWriter(threading.Thread):
+    """Background thread that drains the log buffer into the log file"""
+
+    def __init__(self, path, buffer):
+        super().__init__(name="LogWriter", daemon=True)
+        self.path = path
+        self.buffer = buffer
+        self.file = None
+        self.running = True
+
+    def run(self):
+        try:
+            self.file = open(self.path, 'w')
+            self.file.write(f"=== Debug Log Started at {time.strftime('%Y-%m-%d %H:%M:%S')} ===\n\n")
+        except OSError as e:
+            print(f"Error initializing log file: {e}")
+            return
+
+        while self.running:
+            time.sleep(LOG_FLUSH_INTERVAL)
+            self.drain()
+
+        # Write whatever was queued before shutdown
+        self.drain()
+        self.file.close()
+
+    def drain(self):
+        """Write every buffered record in a single batch"""
+        lines = []
+        try:
+            while True:
+                timestamp, level, message, args = self.buffer.popleft()
+                text = format_message(message, args)
+                stamp = time.strftime("%H:%M:%S", time.localtime(timestamp))
+                if level == INFO:
+                    lines.append(f"[{stamp}] {text}\n")
+                else:
+                    lines.append(f"[{stamp}] {LEVEL_NAMES[level]}: {text}\n")
+        except IndexError:
+            pass
+
+        if not lines:
+            return
+
+        try:
+            self.file.write("".join(lines))
+            self.file.flush()
+            if self.file.tell() >= LOG_MAX_BYTES:
+                self.rotate()
+        except OSError as e:
+            print(f"Error writing to log file: {e}")
+
+    def rotate(self):
+        """Move the current log aside and start a fresh one"""
+        self.file.close()
+        for i in range(LOG_BACKUP_COUNT - 1, 0, -1):
+            older = f"{self.path}.{i}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{i + 1}")
+        if LOG_BACKUP_COUNT > 0:
+            os.replace(self.path, f"{self.path}.1")
+        self.file = open(self.path, 'w')
+
+    def stop(self):
+        """Ask the thread to write out the remaining records and exit"""
+        self.running = False
+
+# Start the writer as soon as debug is imported
+log_writer = LogWriter(LOG_FILE, log_buffer)
+log_writer.start()
+
+def shutdown_logging():
+    """Flush all pending log records to disk and stop the writer thread"""
+    if log_writer.is_alive():
+        log_writer.stop()
+        log_writer.join()
+
+atexit.register(shutdown_logging)
+
+def set_log_level(level):
+    """Change the minimum level of messages that are logged"""
+    global log_level
+    log_level = level
+
+def log_to_file(message, *args, level=INFO):
+    """Queue a message for the log file without showing it on screen"""
+    if level < log_level:
+        return
+    log_buffer.append((time.time(), level, message, args))
+
+def add_debug(message, *args, level=INFO):
+    """
+    Add a debug message to the on-screen list and the log file
+
+    Args:
+        message (str): Message, optionally with %-style placeholders
+        *args: Values for the placeholders, only formatted if the message is shown
+        level (int): One of DEBUG, INFO, WARNING or ERROR
+    """
+    if level < log_level:
+        return
+    record = (time.time(), level, message, args)
+    log_buffer.append(record)
+    debug_messages.append(record)
 
 def clear_debug():
     """Clear all debug messages"""
-    global debug_messages
     debug_messages.clear()
     log_to_file("--- Debug messages cleared ---")
 
-def draw_debug_info(screen, player, camera_offset_x, enemies, projectiles):
-    """Draw debug information on the screen"""
+def draw_debug_info(screen, player, camera_offset_x, enemies, projectiles, active_enemies=None, particles=None):
+    """
+    Draw debug information on the screen
+
+    Args:
+        active_enemies (int): Enemies given full updates this tick, if known
+        particles (int): Live particles, if the game has effects
+    """
     # Draw debug panel background
     pygame.draw.rect(screen, (0, 0, 0, 128), (WIDTH - 300, 10, 290, 200))
-    
+
     # Draw game state info
     debug_info = [
         f"Player Pos: ({player.x:.1f}, {player.y:.1f})",
         f"World Pos: ({(player.x + camera_offset_x):.1f}, {player.y:.1f})",
         f"Camera Offset: {camera_offset_x:.1f}",
-        f"Enemies: {len(enemies)}",
-        f"Projectiles: {len(projectiles)}",
+        f"Enemies: {len(enemies)}" + (f" ({active_enemies} active)" if active_enemies is not None else ""),
+        f"Projectiles: {len(projectiles)}" + (f", Particles: {particles}" if particles is not None else ""),
         f"On Ground: {player.on_ground}",
         f"Health: {player.health}"
     ]
-    
+
     y_pos = 15
     for info in debug_info:
         text = DEBUG_FONT.render(info, True, WHITE)
         screen.blit(text, (WIDTH - 290, y_pos))
         y_pos += 20
+
+    # Draw per-scope frame timings below the info panel
+    profiler.draw_overlay(screen)
     
-    # Draw recent debug messages
+    # Draw resident surface memory by subsystem on the left
+    surface_memory.draw_overlay(screen)
+
+    # Draw recent debug messages (formatted only now that they're shown)
     y_pos = HEIGHT - 30 * len(debug_messages) - 10
-    for msg in debug_messages:
-        text = DEBUG_FONT.render(msg, True, WHITE)
+    for _, _, message, args in debug_messages:
+        text = DEBUG_FONT.render(format_message(message, args), True, WHITE)
         screen.blit(text, (10, y_pos))
-        y_pos += 20
\ No newline at end of file
+        y_pos += 20
@@ -1,149 +1,123 @@
 import pygame
-import random
 import math
-import os
-from settings import (
-    ZOMBIE_WIDTH, ZOMBIE_HEIGHT, ZOMBIE_SPEED, ZOMBIE_MAX_HEALTH,
-    ZOMBIE_DAMAGE, ZOMBIE_ATTACK_COOLDOWN, BROWN, RED, GRAVITY,
-    GROUND_LEVEL, WIDTH, PLAYER_WIDTH, PLAYER_HEIGHT
-)
+from settings import RED, GRAVITY, GROUND_LEVEL, WIDTH, SMALL_DEBUG_FONT, NAV_JUMP_POWER, NAV_JUMP_SPEED
 from debug import add_debug
+from enemy_types import get_enemy_type
+from surface_memory import surface_memory
+from animation import animation_clock
+from nav import Link
+
+def type_stat(name, doc):
+    """Read-only attribute looked up on the enemy's shared type"""
+    return property(lambda self: getattr(self.type, name), doc=doc)
 
 class Zombie:
-    """Basic zombie enemy that moves toward the player"""
+    """
+    Enemy that moves toward the player
+    
+    Stats, hitbox and animation clips come from the shared EnemyType;
+    instances only hold position, health, animation and attack state.
+    Attacks and hit flashes end through callbacks on the simulation's
+    timing wheel rather than per-frame countdowns. Far off-screen zombies
+    get the cheaper coarse_update() every few ticks instead of update().
+    """
     
-    def __init__(self, x, y):
-        # Calculate better size to match player proportions
-        # Make zombies slightly smaller than player but not too small
-        self.width = int(PLAYER_WIDTH * 0.9)  # 90% of player width
-        self.height = int(PLAYER_HEIGHT * 0.9)  # 90% of player height
+    width = type_stat("width", "Hitbox width")
+    height = type_stat("height", "Hitbox height")
+    speed = type_stat("speed", "Pixels moved per frame")
+    max_health = type_stat("max_health", "Health on spawn")
+    damage = type_stat("damage", "Damage per attack")
+    attack_cooldown_max = type_stat("attack_cooldown", "Frames between attacks")
+    attack_range = type_stat("attack_range", "Distance at which an attack starts")
+    attack_duration = type_stat("attack_duration", "Frames for attack animation")
+    color = type_stat("color", "Fallback color")
+    score = type_stat("score", "Points for a kill")
+    clips = type_stat("clips", "Animation clips by state")
+    
+    def __init__(self, x, y, enemy_type=None, timers=None):
+        self.timers = timers  # TimingWheel of the simulation the zombie is in
+        self.attack_timer = None  # Ends the current attack
+        self.hit_timer = None  # Ends the hit flash
         
+        # Position, health, animation and attack state
+        self.reset(x, y, enemy_type or get_enemy_type("zombie"))
+    
+    def reset(self, x, y, enemy_type=None):
+        """Respawn at a new position, optionally as a different type"""
+        if enemy_type is not None:
+            self.type = enemy_type
         self.x = x  # World x position
         self.y = y
-        self.speed = ZOMBIE_SPEED
-        self.health = ZOMBIE_MAX_HEALTH
-        self.max_health = ZOMBIE_MAX_HEALTH
-        self.damage = ZOMBIE_DAMAGE
-        self.attack_cooldown = 0
-        self.attack_cooldown_max = ZOMBIE_ATTACK_COOLDOWN
-        self.color = BROWN  # Fallback color
+        self.health = self.max_health
+        self.attack_ready_tick = 0  # Tick the next attack is allowed on
         self.velocity_y = 0
         self.on_ground = False
+        self.sim_tick = self.timers.tick if self.timers is not None else 0  # Tick last simulated on
+        
+        # Navigation state
+        self.span = None  # Span last stood on
+        self.leaping = False  # In the air from a jump link
+        self.leap_direction = 0
         
         # Animation properties
         self.facing_right = True
         self.animation_state = "run"  # run, idle, attack
-        self.frame_index = 0
-        self.animation_timer = 0
-        self.animation_delay = 10  # Frames between sprite changes
+        self.animation_start = animation_clock.tick  # Tick the current clip started on
         
-        # Attack state
+        # Attack state and damage flash effect
         self.is_attacking = False
-        self.attack_frame = 0
-        self.attack_duration = 40  # Frames for attack animation
-        
-        # Damage flash effect
         self.is_hit = False
-        self.hit_timer = 0
-        
-        # Load sprites
-        self.use_sprites = True
-        self.sprites = self.load_sprites()
-        
-        # Frame counts
-        self.frame_counts = {
-            "run": 4,   # 4 frames in run animation
-            "idle": 2,  # 2 frames in idle animation
-            "attack": 4 # 4 frames in attack animation
-        }
+        self.cancel_timers()
     
-    def load_sprites(self):
-        """Load all zombie sprite images"""
-        add_debug("Zombie: Loading sprites...")
-        
-        sprites = {
-            "run": {
-                "right": [],
-                "left": []
-            },
-            "idle": {
-                "right": [],
-                "left": []
-            },
-            "attack": {
-                "right": [],
-                "left": []
-            }
-        }
+    def cancel_timers(self):
+        """Drop timers left over from a previous life"""
+        if self.attack_timer is not None:
+            self.attack_timer.cancel()
+            self.attack_timer = None
+        if self.hit_timer is not None:
+            self.hit_timer.cancel()
+            self.hit_timer = None
+    
+    def update(self, player_world_x, platforms, flow=None):
+        """
+        Update zombie position and state
         
-        # Check if we have the sprites directory
-        enemy_sprite_dir = "assets/enemy"
-        if not os.path.exists(enemy_sprite_dir):
-            add_debug("Zombie: 'assets/enemy' directory not found!")
-            self.use_sprites = False
-            return sprites
+        Args:
+            player_world_x (float): World x of the player being chased
+            platforms (list): Collision rects the zombie could touch this tick
+            flow (FlowField): Next moves toward the player's cell; without one
+                the zombie walks straight at the player
+        """
+        self.sim_tick = self.timers.tick
         
-        try:
-            # Load animations with the correct frame counts
-            animation_frames = {
-                "run": 4,
-                "idle": 2,
-                "attack": 4
-            }
-            
-            # Load all animation types and directions
-            for anim, frame_count in animation_frames.items():
-                for direction in ["right", "left"]:
-                    # Load all frames for this animation/direction
-                    for i in range(frame_count):
-                        sprite_path = f"{enemy_sprite_dir}/zombie_{anim}_{direction}_{i}.png"
-                        if os.path.exists(sprite_path):
-                            original_sprite = pygame.image.load(sprite_path).convert_alpha()
-                            
-                            # Scale sprite to match the proportions we want
-                            scaled_sprite = pygame.transform.scale(original_sprite, (self.width, self.height))
-                            sprites[anim][direction].append(scaled_sprite)
-                            add_debug(f"Zombie: Loaded {sprite_path}")
-                        else:
-                            add_debug(f"Zombie: Missing sprite {sprite_path}")
-            
-            # Verify we have at least run animation
-            if not sprites["run"]["right"] or not sprites["run"]["left"]:
-                add_debug("Zombie: Missing required run animation sprites")
-                self.use_sprites = False
-            
-            return sprites
-            
-        except Exception as e:
-            add_debug(f"Zombie: Error loading sprites: {e}")
-            self.use_sprites = False
-            return sprites
-    
-    def update(self, player_world_x, platforms):
-        """Update zombie position and state"""
         # Only move if not attacking
         if not self.is_attacking:
-            # Determine facing direction based on player position
-            if self.x < player_world_x:
-                self.x += self.speed
-                self.facing_right = True
-                self.animation_state = "run"
+            self.set_animation("run")
+            if self.leaping:
+                # Carry on the way the jump was aimed until landing
+                self.x += self.leap_direction * NAV_JUMP_SPEED
             else:
-                self.x -= self.speed
-                self.facing_right = False
-                self.animation_state = "run"
+                move = None
+                if flow is not None:
+                    if self.on_ground:
+                        self.span = flow.graph.locate(self.x + self.width / 2, self.y + self.height,
+                                                      self.width / 2, self.span)
+                    move = self.next_move(flow)
                 
-            # If close to player, start attack
-            if abs(self.x - player_world_x) < 50:
-                self.start_attack()
-        else:
-            # Handle attack state
-            self.animation_state = "attack"
-            self.attack_frame += 1
-            if self.attack_frame >= self.attack_duration:
-                self.is_attacking = False
-                self.attack_frame = 0
-                self.animation_state = "run"
+                if move:
+                    self.follow(move, self.speed)
+                else:
+                    # Determine facing direction based on player position
+                    if self.x < player_world_x:
+                        self.x += self.speed
+                        self.facing_right = True
+                    else:
+                        self.x -= self.speed
+                        self.facing_right = False
+                    
+                    # If close to player, start attack
+                    if abs(self.x - player_world_x) < self.attack_range:
+                        self.start_attack()
         
         # Apply gravity
         self.velocity_y += GRAVITY
@@ -164,37 +138,108 @@ class Zombie:
             self.velocity_y = 0
             self.on_ground = True
         
-        # Update attack cooldown
-        if self.attack_cooldown > 0:
-            self.attack_cooldown -= 1
-            
-        # Update animation timer
-        self.animation_timer += 1
-        if self.animation_timer >= self.animation_delay:
-            self.animation_timer = 0
-            
-            # Calculate next frame index based on animation state
-            if self.animation_state in self.sprites and self.use_sprites:
-                direction = "right" if self.facing_right else "left"
-                if direction in self.sprites[self.animation_state]:
-                    # Get correct frame count for this animation
-                    max_frames = len(self.sprites[self.animation_state][direction])
-                    if max_frames > 0:
-                        self.frame_index = (self.frame_index + 1) % max_frames
-                    
-        # Update hit effect timer
-        if self.is_hit:
-            self.hit_timer += 1
-            if self.hit_timer >= 5:  # Flash for 5 frames
-                self.is_hit = False
-                self.hit_timer = 0
+        if self.on_ground:
+            self.leaping = False
+    
+    def next_move(self, flow):
+        """
+        Flow field move from the span the zombie stands on
+        
+        Returns:
+            Link or int: Link to take or direction to walk, or None (or 0) to
+            chase the player directly, as it does once on the player's span
+        """
+        move = flow.next_move(self.span, self.x + self.width / 2)
+        if move is not None and not isinstance(move, Link) and self.span is flow.goal_span:
+            return None
+        return move
+    
+    def follow(self, move, step):
+        """Move up to step pixels along a flow field move, jumping once a jump link is reached"""
+        if isinstance(move, Link):
+            # Walk to the link, then jump, or keep walking off the edge
+            target_x = move.x - self.width / 2
+            if abs(target_x - self.x) <= step:
+                self.x = target_x
+                if move.jump and self.on_ground:
+                    self.velocity_y = NAV_JUMP_POWER
+                    self.leaping = True
+                    self.leap_direction = move.direction
+                    self.x += move.direction * NAV_JUMP_SPEED
+                    if move.direction:
+                        self.facing_right = move.direction > 0
+            else:
+                self.facing_right = target_x > self.x
+                self.x += step if self.facing_right else -step
+        else:
+            # Walking along the span toward the next link
+            self.x += move * step
+            self.facing_right = move > 0
+    
+    def needs_full_update(self, view_left, view_right):
+        """
+        Whether the zombie is close enough to the view, or in the middle of
+        something, to need update() rather than coarse_update()
+        
+        Args:
+            view_left (float): World x of the left edge of the activation margin
+            view_right (float): World x of the right edge of the activation margin
+        """
+        return (not self.on_ground or self.leaping or self.is_attacking or
+                (self.x + self.width > view_left and self.x < view_right))
+    
+    def coarse_update(self, player_world_x, nav, flow=None):
+        """
+        Simplified update for a grounded zombie far from the view
+        
+        Moves along the flow field, or straight toward the player, as far as
+        it would have walked since its last update, with no gravity, platform
+        collisions or animation. A zombie that takes a jump link or walks
+        off its span is left airborne, so it gets full updates until it lands.
+        
+        Args:
+            player_world_x (float): World x of the player being chased
+            nav (NavGraph): The level's navigation graph
+            flow (FlowField): Next moves toward the player's cell
+        
+        Returns:
+            int: Ticks simulated
+        """
+        ticks = self.timers.tick - self.sim_tick
+        self.sim_tick = self.timers.tick
+        
+        self.span = nav.locate(self.x + self.width / 2, self.y + self.height, self.width / 2, self.span)
+        if self.span is None:
+            self.on_ground = False
+            return ticks
+        
+        move = self.next_move(flow) if flow is not None else None
+        if move:
+            self.follow(move, self.speed * ticks)
+        else:
+            step = min(self.speed * ticks, abs(player_world_x - self.x))
+            self.facing_right = self.x < player_world_x
+            self.x += step if self.facing_right else -step
+        return ticks
+    
+    def set_animation(self, state):
+        """Switch to another clip, starting it from its first frame"""
+        if state != self.animation_state:
+            self.animation_state = state
+            self.animation_start = animation_clock.tick
     
     def start_attack(self):
         """Start the attack animation"""
         if not self.is_attacking:
             self.is_attacking = True
-            self.attack_frame = 0
-            self.frame_index = 0  # Reset frame index for attack animation
+            self.attack_timer = self.timers.schedule(self.attack_duration, self.end_attack)
+            self.set_animation("attack")
+    
+    def end_attack(self):
+        """Timer callback for the end of the attack animation"""
+        self.is_attacking = False
+        self.attack_timer = None
+        self.set_animation("run")
     
     def check_collision_with_player(self, player_x, player_y, player_width, player_height, camera_offset_x):
         """Check if zombie collides with the player"""
@@ -212,26 +257,35 @@ class Zombie:
     
     def attack_player(self, player):
         """Attack the player if cooldown allows"""
-        if self.attack_cooldown <= 0:
+        if self.timers.tick >= self.attack_ready_tick:
             # Start attack animation
             self.start_attack()
             
             # Deal damage
             player.take_damage(self.damage)
-            self.attack_cooldown = self.attack_cooldown_max
-            add_debug(f"Player hit! Health: {player.health}")
+            self.attack_ready_tick = self.timers.tick + self.attack_cooldown_max
+            add_debug("Player hit! Health: %d", player.health)
             return True
         return False
     
     def take_damage(self, amount):
         """Reduce zombie health by the given amount"""
         self.health -= amount
+        
+        # Flash for 5 frames, starting over if already flashing
         self.is_hit = True
-        self.hit_timer = 0
+        if self.hit_timer is not None:
+            self.hit_timer.cancel()
+        self.hit_timer = self.timers.schedule(5, self.end_flash)
         
         # If health is low, switch to idle animation briefly
         if self.health < self.max_health / 2 and not self.is_attacking:
-            self.animation_state = "idle"
+            self.set_animation("idle")
+    
+    def end_flash(self):
+        """Timer callback for the end of the hit flash"""
+        self.is_hit = False
+        self.hit_timer = None
     
     def draw(self, screen, camera_offset_x, debug_mode=False):
         """Draw the zombie on the screen"""
@@ -240,21 +294,12 @@ class Zombie:
         
         # Only draw if on screen (with a margin)
         if -self.width < screen_x < WIDTH + self.width:
-            if self.use_sprites:
-                # Determine which direction sprites to use
-                direction = "right" if self.facing_right else "left"
-                
-                # Make sure we have sprites for this animation state and direction
-                if (self.animation_state in self.sprites and 
-                    direction in self.sprites[self.animation_state] and 
-                    self.sprites[self.animation_state][direction]):
-                    
-                    # Make sure frame index is valid
-                    if self.frame_index >= len(self.sprites[self.animation_state][direction]):
-                        self.frame_index = 0
-                    
-                    # Get current sprite
-                    current_sprite = self.sprites[self.animation_state][direction][self.frame_index]
+            clips = self.clips
+            if clips:
+                # The frame follows from the clock and when the clip started
+                clip = clips.get(self.animation_state)
+                current_sprite = clip.frame(self.animation_start, self.facing_right) if clip else None
+                if current_sprite is not None:
                     
                     # Apply hit effect if needed
                     if self.is_hit:
@@ -262,7 +307,7 @@ class Zombie:
                         hit_color = (255, 0, 0)
                         screen.blit(current_sprite, (int(screen_x), int(self.y)))
                         # Draw a semi-transparent red rect over it for the hit effect
-                        hit_surface = pygame.Surface((self.width, self.height))
+                        hit_surface = surface_memory.track(pygame.Surface((self.width, self.height)), "effects")
                         hit_surface.fill(hit_color)
                         hit_surface.set_alpha(128)  # 50% transparency
                         screen.blit(hit_surface, (int(screen_x), int(self.y)))
@@ -302,14 +347,13 @@ class Zombie:
                                 (screen_x, self.y, self.width, self.height), 1)  # Draw outline
                 
                 # Draw state text
-                debug_font = pygame.font.Font(None, 20)
                 state_text = f"{self.animation_state}"
-                text_surf = debug_font.render(state_text, True, (255, 255, 255))
+                text_surf = SMALL_DEBUG_FONT.render(state_text, True, (255, 255, 255))
                 screen.blit(text_surf, (screen_x, self.y - 25))
     
     def _draw_fallback(self, screen, screen_x):
         """Draw fallback rectangle if sprites aren't available"""
-        color = RED if self.is_hit else BROWN
+        color = RED if self.is_hit else self.color
         pygame.draw.rect(screen, color, (screen_x, self.y, self.width, self.height))
         
         # Add simple direction indicator
@@ -321,23 +365,3 @@ class Zombie:
             # Left-facing indicator
             pygame.draw.circle(screen, (255, 255, 255), 
                               (int(screen_x + self.width//4), int(self.y + self.height//4)), 3)
-
-def spawn_wave(player_x, camera_offset_x, wave_size):
-    """Spawn a wave of zombies around the player"""
-    enemies = []
-    
-    # Spawn positions relative to player (world coordinates)
-    spawn_positions = [
-        (player_x + camera_offset_x + WIDTH, GROUND_LEVEL - 50),
-        (player_x + camera_offset_x + WIDTH + 200, GROUND_LEVEL - 50),
-        (player_x + camera_offset_x + WIDTH + 400, GROUND_LEVEL - 50),
-        (player_x + camera_offset_x - WIDTH, GROUND_LEVEL - 50),
-        (player_x + camera_offset_x - WIDTH - 200, GROUND_LEVEL - 50)
-    ]
-    
-    for _ in range(wave_size):
-        pos = random.choice(spawn_positions)
-        enemies.append(Zombie(pos[0], pos[1]))
-    
-    add_debug(f"Spawned {wave_size} zombies")
-    return enemies
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""
+Enemy type registry
+
+Stats, hitbox, AI parameters and animation clips for each entry in
+settings.ENEMY_TYPES are loaded once into an EnemyType and shared by every
+enemy of that type, so enemies themselves only hold per-entity state.
+"""
+import pygame
+from settings import ENEMY_TYPES
+from debug import add_debug, WARNING, ERROR
+from assets import asset_exists
+from surface_memory import surface_memory
+from animation import make_clips
+
+class EnemyType:
+    """Shared data for one kind of enemy; sprites are loaded on first use"""
+
+    def __init__(self, type_id, name, spec):
+        self.type_id = type_id  # Position in the registry, saved in snapshots
+        self.name = name
+        self.width, self.height = spec["size"]
+        self.speed = spec["speed"]
+        self.max_health = spec["max_health"]
+        self.damage = spec["damage"]
+        self.attack_cooldown = spec["attack_cooldown"]
+        self.attack_range = spec["attack_range"]
+        self.attack_duration = spec["attack_duration"]
+        self.score = spec["score"]
+        self.color = spec["color"]
+        self.animation_delay = spec["animation_delay"]
+        self.first_wave = spec["first_wave"]
+        self.spawn_weight = spec["spawn_weight"]
+        self.clip_sources = spec["clips"]  # {animation: (path, frames)}
+        self._clips = None
+
+    @property
+    def clips(self):
+        """{animation: Clip}, empty if the run clip is missing"""
+        if self._clips is None:
+            sprites = surface_memory.track_all(self.load_sprites(), "enemies")
+            self._clips = make_clips(sprites, self.animation_delay)
+        return self._clips
+
+    def preload(self):
+        """Load the sprites now, so the first enemy of this type doesn't stall a frame drawing it"""
+        self.clips
+
+    def load_sprites(self):
+        """Load every clip, scaled to the hitbox"""
+        add_debug("%s: Loading sprites...", self.name.capitalize())
+        sprites = {}
+        try:
+            # Sheets are cropped to the area any of their frames uses,
+            # so the character fills the hitbox the same way in every clip
+            sheets = {}
+            bounds = None
+            for animation, (path, frames) in self.clip_sources.items():
+                if "{i}" in path or not asset_exists(path):
+                    continue
+                sheet = pygame.image.load(path).convert_alpha()
+                size = sheet.get_height()
+                sheets[animation] = [sheet.subsurface((i * size, 0, size, size)) for i in range(frames)]
+                for frame in sheets[animation]:
+                    rect = frame.get_bounding_rect()
+                    bounds = rect if bounds is None else bounds.union(rect)
+
+            for animation, (path, frames) in self.clip_sources.items():
+                if animation in sheets:
+                    right = tuple(pygame.transform.scale(frame.subsurface(bounds), (self.width, self.height))
+                                  for frame in sheets[animation])
+                    left = tuple(pygame.transform.flip(frame, True, False) for frame in right)
+                    sprites[animation] = {"right": right, "left": left}
+                    continue
+
+                sprites[animation] = {}
+                for direction in ("right", "left"):
+                    loaded = []
+                    for i in range(frames):
+                        frame_path = path.format(direction=direction, i=i)
+                        if asset_exists(frame_path):
+                            image = pygame.image.load(frame_path).convert_alpha()
+                            loaded.append(pygame.transform.scale(image, (self.width, self.height)))
+                        else:
+                            add_debug("%s: Missing sprite %s", self.name.capitalize(), frame_path, level=WARNING)
+                    sprites[animation][direction] = tuple(loaded)
+
+            # Without a run animation the enemy is drawn as a rectangle
+            run = sprites.get("run", {})
+            if not run.get("right") or not run.get("left"):
+                add_debug("%s: Missing required run animation sprites", self.name.capitalize())
+                return {}
+            return sprites
+
+        except Exception as e:
+            add_debug("%s: Error loading sprites: %s", self.name.capitalize(), e, level=ERROR)
+            return {}
+
+# Registry in settings order; an enemy's type_id indexes this list
+ENEMY_TYPE_LIST = [EnemyType(i, name, spec) for i, (name, spec) in enumerate(ENEMY_TYPES.items())]
+ENEMY_TYPE_NAMES = {enemy_type.name: enemy_type for enemy_type in ENEMY_TYPE_LIST}
+
+def get_enemy_type(name):
+    return ENEMY_TYPE_NAMES[name]
+
+def enemy_type_by_id(type_id):
+    return ENEMY_TYPE_LIST[type_id]
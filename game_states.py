@@ -3,22 +3,38 @@ Game state management system
 """
 import pygame
 import sys
+import math
+import random
 from settings import (
     MENU, GAMEPLAY, PAUSE, GAMEOVER, CONTROLS, LEVELSELECT, VICTORY,
     MENU_OPTIONS, LEVEL_OPTIONS, PAUSE_OPTIONS, GAMEOVER_OPTIONS, VICTORY_OPTIONS,
-    WIDTH, HEIGHT, GROUND_LEVEL, MAX_WAVES
+    WIDTH, HEIGHT, GROUND_LEVEL, MAX_WAVES, LOD_ACTIVE_MARGIN, LOD_FAR_INTERVAL
 )
 from player import Player
-from enemy import Zombie, spawn_wave
+from spawner import SpawnDirector
+from tuning import Tuning
+from crowd import separate
+from particles import ParticleSystem
 from ui import (
     draw_menu, draw_level_select, draw_controls, 
-    draw_gameplay, draw_pause, draw_gameover, draw_victory
+    draw_gameplay_ui, draw_pause, draw_gameover, draw_victory
 )
-from debug import add_debug, clear_debug
+from debug import add_debug, clear_debug, draw_debug_info
+from level_data import load_level, level_count
+from level_streaming import LevelStreamer
+from snapshots import SnapshotBuffer
+from profiler import profiler
+from surface_memory import surface_memory
+from animation import animation_clock
+from timers import TimingWheel
 
 # Initialize level graphics only when needed, not at module import
 # This prevents loading images before pygame.display is initialized
 
+# Extra distance either side of an entity when looking up nearby platforms,
+# enough to cover how far anything moves in one tick
+COLLISION_MARGIN = 16
+
 class GameState:
     """Base class for all game states"""
     
@@ -40,7 +56,13 @@ class GameState:
 class GameStateManager:
     """Manages game states and transitions between them"""
     
-    def __init__(self):
+    def __init__(self, horde=None):
+        """
+        Args:
+            horde (int): Zombies in every wave, for horde mode; normal waves if None
+        """
+        self.horde = horde
+        
         # Initialize level graphics now that display is set up
         from level import initialize_level_graphics
         initialize_level_graphics()
@@ -61,19 +83,26 @@ class GameStateManager:
         try:
             self.background = pygame.image.load("WCP_Example.png").convert()
             self.background = pygame.transform.scale(self.background, (WIDTH, HEIGHT))
+            surface_memory.track(self.background, "menu")
         except:
             # Create a default background if image isn't found
-            self.background = pygame.Surface((WIDTH, HEIGHT))
+            self.background = surface_memory.track(pygame.Surface((WIDTH, HEIGHT)), "menu")
             self.background.fill((0, 0, 0))
             print("Background image not found. Using default black background.")
     
     def set_state(self, state_id, **kwargs):
         """Change to a different state"""
         if state_id == GAMEPLAY:
-            if not self.states[GAMEPLAY] or kwargs.get('restart', False):
-                # Initialize new gameplay state
-                level = kwargs.get('level', 1)
-                self.states[GAMEPLAY] = GameplayState(self, level)
+            gameplay = self.states[GAMEPLAY]
+            if not gameplay or kwargs.get('restart', False):
+                # Restarting defaults to the level being played
+                level = kwargs.get('level', gameplay.level if gameplay else 1)
+                if gameplay and gameplay.level == level:
+                    # Same level: restart in place, reusing everything already loaded
+                    gameplay.reset()
+                else:
+                    # Initialize new gameplay state
+                    self.states[GAMEPLAY] = GameplayState(self, level, horde=self.horde)
         
         elif state_id == PAUSE and self.states[GAMEPLAY]:
             # Create pause state with current gameplay state
@@ -87,15 +116,17 @@ class GameStateManager:
         elif state_id == VICTORY:
             # Create victory state with score and wave count
             score = kwargs.get('score', 0)
-            wave = kwargs.get('wave', MAX_WAVES)
+            max_waves = kwargs.get('max_waves', MAX_WAVES)
+            wave = kwargs.get('wave', max_waves)
             level = kwargs.get('level', 1)
-            self.states[VICTORY] = VictoryState(self, score, wave, level)
+            self.states[VICTORY] = VictoryState(self, score, wave, level, max_waves)
         
         self.current_state = state_id
     
     def toggle_debug_mode(self):
         """Toggle debug mode on/off"""
         self.debug_mode = not self.debug_mode
+        profiler.set_enabled(self.debug_mode)
         add_debug(f"Debug mode {'enabled' if self.debug_mode else 'disabled'}")
     
     def handle_events(self, event):
@@ -193,33 +224,100 @@ class ControlsState(GameState):
 class GameplayState(GameState):
     """Main gameplay state"""
     
-    def __init__(self, game_manager, level=1):
+    def __init__(self, game_manager, level=1, history=True, horde=None, effects=True, tuning=None, seed=None,
+                 players=1):
         super().__init__(game_manager)
         self.level = level
+        self.horde = horde  # Zombies per wave in horde mode
+        
+        # Wave rules, enemy types and weapons this game is played with
+        self.tuning = tuning or Tuning()
         
-        # Player setup
-        self.player = Player(100, GROUND_LEVEL - 60)
+        # Attack, cooldown and hit flash timers of every entity
+        self.timers = TimingWheel()
+        
+        # Every random choice of the simulation, so games in one process don't share a sequence
+        self.rng = random.Random(seed)
+        
+        # Player setup: every player has its own camera, and the first one is
+        # played and drawn on this machine. A server starts with none and adds
+        # one per client
+        self.players = []
+        for _ in range(players):
+            self.add_player()
+        self.player = self.players[0] if self.players else None
         
         # Level setup
-        from level import create_level
-        self.platforms, self.obstacles = create_level(level)
+        self.level_data = load_level(level)
+        self.platforms = self.level_data.platforms
+        self.obstacles = self.level_data.obstacles
+        self.streamer = LevelStreamer(self.level_data)
         
         # Game elements
         self.enemies = []
         self.projectiles = []
         
+        # Killed zombies, respawned by later waves instead of loading new ones
+        self.zombie_pool = []
+        
+        # Brings each wave in a few zombies per tick; games that are drawn
+        # load each enemy type's sprites a wave before it appears
+        self.director = SpawnDirector(self.level_data, self.timers, self.zombie_pool, self.tuning, self.rng,
+                                      preload=effects)
+        
+        # Recent ticks for rewinding (hold Backspace in debug mode); headless
+        # games skip recording them
+        self.snapshots = SnapshotBuffer() if history else None
+        self.rewinding = False
+        
+        # Hit, kill and shot effects; headless games leave them off
+        self.particles = ParticleSystem(enabled=effects)
+        
+        self.reset()
+    
+    def reset(self):
+        """
+        Restart the level in place
+        
+        Restores the player, enemies, projectiles, score, wave and camera to the
+        level's initial state while keeping the loaded level, sprites and zombies.
+        """
+        # Timers and animations are timed against the gameplay tick
+        self.timers.clear()
+        animation_clock.tick = 0
+        for player in self.players:
+            player.reset(100, GROUND_LEVEL - 60)
+        
+        # Game elements
+        self.zombie_pool.extend(self.enemies)
+        self.enemies = []
+        self.projectiles.clear()
+        self.particles.clear()
+        
         # Game state
         self.score = 0
         self.wave = 1
-        self.wave_enemies_remaining = 5 + self.wave
-        self.camera_offset_x = 0
+        self.wave_enemies_remaining = self.wave_size(self.wave)
+        if self.player is not None:
+            self.streamer.update(self.camera_offset_x)
+        
+        self.active_enemies = 0  # Enemies given full updates last tick
+        self.spawned = []  # Zombies brought in last tick
         
-        # Spawn initial wave
-        self.enemies = spawn_wave(
-            self.player.x, 
-            self.camera_offset_x, 
-            self.wave_enemies_remaining
-        )
+        # Per-tick counters reported to telemetry
+        self.collisions_tested = 0
+        self.hits = 0
+        
+        # Queue the initial wave
+        self.director.clear()
+        self.director.start_wave(self.wave, self.wave_enemies_remaining, self.wave_size(self.wave + 1))
+        
+        # Start the rewind history at the level's initial state
+        self.tick = 0
+        self.rewinding = False
+        if self.snapshots is not None:
+            self.snapshots.clear()
+            self.snapshots.capture(self, self.tick)
         
         # Clear any old debug messages
         clear_debug()
@@ -234,89 +332,230 @@ class GameplayState(GameState):
                 self.player.jump()
             elif event.key == pygame.K_ESCAPE:
                 self.game_manager.set_state(PAUSE)
+            elif event.key == pygame.K_BACKSPACE and self.game_manager.debug_mode and self.snapshots is not None:
+                self.rewinding = True
+            elif pygame.K_1 <= event.key < pygame.K_1 + len(self.tuning.weapons):
+                self.player.select_weapon(self.tuning.weapons[event.key - pygame.K_1])
         
         elif event.type == pygame.KEYUP:
             if event.key == pygame.K_a:
                 self.player.moving_left = False
             elif event.key == pygame.K_d:
                 self.player.moving_right = False
+            elif event.key == pygame.K_BACKSPACE:
+                self.rewinding = False
         
         elif event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1:  # Left mouse button
-                self.player.shoot(pygame.mouse.get_pos(), self.camera_offset_x, self.projectiles)
-    
-    def update(self):
-        # Update player
-        self.player.move(self.platforms, self.camera_offset_x)
+                self.player.trigger_held = True
+                if self.player.shoot(pygame.mouse.get_pos(), self.camera_offset_x, self.projectiles):
+                    self.muzzle_flash(self.player)
+        
+        elif event.type == pygame.MOUSEBUTTONUP:
+            if event.button == 1:
+                self.player.trigger_held = False
+    
+    def wave_size(self, wave):
+        """Zombies in the given wave"""
+        return self.horde or self.tuning.wave_size(wave)
+    
+    @property
+    def camera_offset_x(self):
+        """Camera of the local player, the one drawn on screen"""
+        return self.player.camera_offset_x
+    
+    @camera_offset_x.setter
+    def camera_offset_x(self, camera_offset_x):
+        self.player.camera_offset_x = camera_offset_x
+    
+    @property
+    def flow(self):
+        """Enemies' routes toward the local player"""
+        return self.player.flow
+    
+    @flow.setter
+    def flow(self, flow):
+        self.player.flow = flow
+    
+    def add_player(self):
+        """Add a player at the start of the level, with its own camera"""
+        player = Player(100, GROUND_LEVEL - 60, self.timers, self.tuning.weapons[0], self.rng)
+        self.players.append(player)
+        return player
+    
+    def remove_player(self, player):
+        self.players.remove(player)
+    
+    def check_game_over(self):
+        """End the game once every player is down"""
+        if all(player.health <= 0 for player in self.players):
+            self.game_manager.set_state(GAMEOVER, score=self.score)
+    
+    def muzzle_flash(self, player):
+        """Emit a muzzle flash from a player's weapon after a shot"""
+        muzzle_x, muzzle_y = player.muzzle(player.camera_offset_x)
+        self.particles.emit("muzzle flash", muzzle_x, muzzle_y, player.aim_angle)
+    
+    def nearby_platforms(self, world_x, width):
+        """Collision rects that an entity at world_x could touch this tick"""
+        return self.level_data.collision.query(world_x - COLLISION_MARGIN, world_x + width + COLLISION_MARGIN)
+    
+    def nearby_obstacles(self, world_x, width):
+        """Obstacles overlapping the given horizontal extent"""
+        return self.level_data.obstacle_index.query(world_x, world_x + width)
+    
+    def update_player(self, player):
+        """Fire, move and scroll the camera of one player, and route enemies toward it"""
+        if player.trigger_held:
+            aim = player.aim_target or pygame.mouse.get_pos()
+            if player.hold_trigger(aim, player.camera_offset_x, self.projectiles):
+                self.muzzle_flash(player)
+        platforms = self.nearby_platforms(player.world_x, player.width)
+        self.collisions_tested += len(platforms)
+        player.move(platforms, player.camera_offset_x)
         
         # Camera follows player - side-scrolling effect
         # Camera only moves right when player is past 1/3 of screen
-        if self.player.x > WIDTH / 3:
-            self.camera_offset_x += self.player.x - WIDTH / 3
-            self.player.x = WIDTH / 3  # Keep player position fixed on screen
+        if player.x > WIDTH / 3:
+            player.camera_offset_x += player.x - WIDTH / 3
+            player.x = WIDTH / 3  # Keep player position fixed on screen
         
         # Check obstacles for player collision
-        player_world_x = self.player.x + self.camera_offset_x
-        for obstacle in self.obstacles:
-            if obstacle.check_collision(player_world_x, self.player.y, self.player.width, self.player.height):
+        player_world_x = player.world_x
+        obstacles = self.nearby_obstacles(player_world_x, player.width)
+        self.collisions_tested += len(obstacles)
+        for obstacle in obstacles:
+            if obstacle.check_collision(player_world_x, player.y, player.width, player.height):
                 # If obstacle blocks player, push them back
                 if obstacle.blocks_player:
                     # Push left or right depending on approach direction
                     if player_world_x < obstacle.x + obstacle.width / 2:
                         # Push player left
-                        correction = obstacle.x - (player_world_x + self.player.width)
-                        self.player.x += correction
+                        correction = obstacle.x - (player_world_x + player.width)
+                        player.x += correction
                     else:
                         # Push player right
                         correction = (obstacle.x + obstacle.width) - player_world_x
-                        self.player.x += correction
+                        player.x += correction
                 
                 # If obstacle damages player
                 if obstacle.damage > 0:
-                    self.player.take_damage(obstacle.damage)
-                    add_debug(f"Player hit obstacle! Damage: {obstacle.damage}")
+                    player.take_damage(obstacle.damage)
+                    add_debug("Player hit obstacle! Damage: %d", obstacle.damage)
                     
                     # Check if player is dead
-                    if self.player.health <= 0:
-                        self.game_manager.set_state(GAMEOVER, score=self.score)
+                    if player.health <= 0:
+                        self.check_game_over()
+        
+        # Fields are cached per cell, so this only computes one when the player reaches a new cell
+        if player.on_ground:
+            half_width = player.width / 2
+            flow = self.level_data.nav.field_toward(player_world_x + half_width,
+                                                    player.y + player.height, half_width)
+            if flow is not None:
+                player.flow = flow
+    
+    def update(self):
+        # Step back through the snapshot history instead of simulating
+        if self.rewinding:
+            tick = self.snapshots.rewind(self)
+            if tick is not None:
+                self.tick = tick
+                animation_clock.tick = tick
+                self.streamer.update(self.camera_offset_x)
+                self.particles.clear()
+            return
+        
+        # Run the timers that expire this tick
+        self.timers.advance()
+        
+        # Collision tests are counted as the candidates returned by the level index
+        self.collisions_tested = 0
+        self.hits = 0
+        
+        # Dead players sit out; one whose game just ended still plays out
+        # until the game over screen takes over
+        live = [player for player in self.players if player.health > 0] or self.players
+        
+        # Update players
+        profiler.begin("player")
+        for player in live:
+            self.update_player(player)
+        
+        # Stream level chunks in and out around the camera
+        if self.player is not None:
+            self.streamer.update(self.camera_offset_x)
+        profiler.end("player")
         
         # Update enemies
-        for enemy in self.enemies[:]:
-            # Calculate player's world position
-            player_world_x = self.player.x + self.camera_offset_x
+        profiler.begin("enemies")
+        # Zombies near any player's view get full updates
+        views = [(player.camera_offset_x - LOD_ACTIVE_MARGIN, player.camera_offset_x + WIDTH + LOD_ACTIVE_MARGIN)
+                 for player in live]
+        target = live[0]
+        self.active_enemies = 0
+        for index, enemy in enumerate(self.enemies):
+            full = any(enemy.needs_full_update(view_left, view_right) for view_left, view_right in views)
+            if not full and (self.timers.tick + index) % LOD_FAR_INTERVAL:
+                # Far zombies take turns at a coarse update
+                continue
             
-            # Update enemy
-            enemy.update(player_world_x, self.platforms)
+            # Zombies go after the nearest live player
+            if len(live) > 1:
+                target = min(live, key=lambda player: abs(player.world_x - enemy.x))
+            if full:
+                # Update enemy
+                ticks = 1
+                platforms = self.nearby_platforms(enemy.x, enemy.width)
+                enemy.update(target.world_x, platforms, target.flow)
+                self.collisions_tested += len(platforms)
+                self.active_enemies += 1
+            else:
+                ticks = enemy.coarse_update(target.world_x, self.level_data.nav, target.flow)
             
             # Check for enemy collision with obstacles
-            for obstacle in self.obstacles:
+            obstacles = self.nearby_obstacles(enemy.x, enemy.width)
+            self.collisions_tested += len(obstacles) + 1
+            for obstacle in obstacles:
                 if obstacle.blocks_enemies and obstacle.check_collision(
                     enemy.x, enemy.y, enemy.width, enemy.height
                 ):
-                    # Simple bounce logic - reverse direction
+                    # Simple bounce logic - reverse direction, as far as a coarse update can move
                     if enemy.x < obstacle.x:
-                        enemy.x -= enemy.speed * 2
+                        enemy.x -= enemy.speed * 2 * ticks
                     else:
-                        enemy.x += enemy.speed * 2
+                        enemy.x += enemy.speed * 2 * ticks
             
-            # Check for collision with player
-            if enemy.check_collision_with_player(
-                self.player.x, self.player.y, 
-                self.player.width, self.player.height, 
-                self.camera_offset_x
-            ):
-                # Attack player
-                if enemy.attack_player(self.player):
-                    # Check if player is dead
-                    if self.player.health <= 0:
-                        self.game_manager.set_state(GAMEOVER, score=self.score)
+            # Check for collision with players
+            if not full:
+                continue
+            for player in live:
+                if enemy.check_collision_with_player(
+                    player.x, player.y, 
+                    player.width, player.height, 
+                    player.camera_offset_x
+                ):
+                    # Attack player
+                    if enemy.attack_player(player):
+                        # Check if player is dead
+                        if player.health <= 0:
+                            self.check_game_over()
+        profiler.end("enemies")
+        
+        # Spread out zombies that have walked into each other
+        profiler.begin("crowd")
+        self.collisions_tested += separate(self.enemies)
+        profiler.end("crowd")
         
         # Update projectiles and check for offscreen/age
+        profiler.begin("projectiles")
         for projectile in self.projectiles[:]:
             projectile.update()
             
             # Check for collision with obstacles
-            for obstacle in self.obstacles:
+            obstacles = self.nearby_obstacles(projectile.x, projectile.radius*2)
+            self.collisions_tested += len(obstacles)
+            for obstacle in obstacles:
                 if obstacle.blocks_projectiles and obstacle.check_collision(
                     projectile.x, projectile.y, projectile.radius*2, projectile.radius*2
                 ):
@@ -328,75 +567,112 @@ class GameplayState(GameState):
             if projectile not in self.projectiles:
                 continue
             
-            # Remove projectiles that are too old or off-screen
-            if projectile.is_offscreen(self.camera_offset_x, WIDTH, HEIGHT):
+            # Remove projectiles that are too old or off every player's screen
+            if all(projectile.is_offscreen(player.camera_offset_x, WIDTH, HEIGHT) for player in live):
                 self.projectiles.remove(projectile)
                 continue
             
             # Check for collisions with enemies
             for enemy in self.enemies[:]:
+                self.collisions_tested += 1
                 if projectile.check_collision(enemy):
+                    self.hits += 1
                     enemy.take_damage(projectile.damage)
+                    angle = math.atan2(projectile.dir_y, projectile.dir_x)
+                    self.particles.emit("hit spark", projectile.x, projectile.y, angle + math.pi)
+                    self.particles.emit("blood", projectile.x, projectile.y, angle)
                     
                     if projectile in self.projectiles:
                         self.projectiles.remove(projectile)
                     
                     if enemy.health <= 0:
                         self.enemies.remove(enemy)
-                        self.score += 100
-                        add_debug(f"Enemy killed! Score: {self.score}")
+                        self.zombie_pool.append(enemy)
+                        self.score += enemy.score
+                        self.particles.emit("death burst", enemy.x + enemy.width / 2, enemy.y + enemy.height / 2)
+                        add_debug("Enemy killed! Score: %d", self.score)
                     
                     break
+        profiler.end("projectiles")
+        
+        # Move every particle in one step
+        profiler.begin("particles")
+        self.particles.update()
+        profiler.end("particles")
+        
+        # Bring in some of the wave's queued zombies
+        profiler.begin("spawning")
+        self.spawned = self.director.update(self.enemies, live[0].world_x,
+                                            [player.camera_offset_x for player in live])
+        profiler.end("spawning")
         
         # Check if wave is completed
-        if not self.enemies:
+        if not self.enemies and not self.director.pending:
             self.wave += 1
             
             # Check for victory condition
-            if self.wave > MAX_WAVES:
+            if self.wave > self.tuning.max_waves:
                 add_debug("Victory! All waves completed!")
-                self.game_manager.set_state(VICTORY, score=self.score, wave=self.wave-1, level=self.level)
+                self.game_manager.set_state(VICTORY, score=self.score, wave=self.wave-1, level=self.level,
+                                            max_waves=self.tuning.max_waves)
             else:
-                self.wave_enemies_remaining = 5 + self.wave
-                self.enemies = spawn_wave(
-                    self.player.x, 
-                    self.camera_offset_x, 
-                    self.wave_enemies_remaining
-                )
-                add_debug(f"Wave {self.wave}/{MAX_WAVES} started! Enemies: {self.wave_enemies_remaining}")
+                self.wave_enemies_remaining = self.wave_size(self.wave)
+                self.director.start_wave(self.wave, self.wave_enemies_remaining, self.wave_size(self.wave + 1))
+                add_debug("Wave %d/%d started! Enemies: %d", self.wave, self.tuning.max_waves,
+                          self.wave_enemies_remaining)
+        
+        # Record this tick for rewind
+        self.tick += 1
+        animation_clock.tick = self.tick
+        if self.snapshots is not None:
+            self.snapshots.capture(self, self.tick)
     
     def draw(self, screen):
         """Draw the gameplay state"""
         from level import draw_level_background
         
         # Draw level background with parallax effect
-        draw_level_background(screen, self.camera_offset_x, self.game_manager.debug_mode)
-
+        profiler.begin("draw.background")
+        draw_level_background(screen, self.camera_offset_x, self.game_manager.debug_mode,
+                              ground=not self.level_data.tiles)
+        profiler.end("draw.background")
         
-        # Draw platforms
-        for platform in self.platforms:
-            platform.draw(screen, self.camera_offset_x)
-        
-        # Draw obstacles
-        for obstacle in self.obstacles:
-            obstacle.draw(screen, self.camera_offset_x)
+        # Draw the baked platform and obstacle chunks on screen
+        profiler.begin("draw.level")
+        self.streamer.draw(screen, self.camera_offset_x)
+        if self.game_manager.debug_mode:
+            self.level_data.nav.draw_debug(screen, self.camera_offset_x)
+        profiler.end("draw.level")
         
         # Draw player
+        profiler.begin("draw.player")
         self.player.draw(screen, self.game_manager.debug_mode)
+        profiler.end("draw.player")
         
         # Draw enemies
+        profiler.begin("draw.enemies")
         for enemy in self.enemies:
             enemy.draw(screen, self.camera_offset_x, self.game_manager.debug_mode)
+        profiler.end("draw.enemies")
         
         # Draw projectiles
+        profiler.begin("draw.projectiles")
         for projectile in self.projectiles:
             projectile.draw(screen, self.camera_offset_x, self.game_manager.debug_mode)
+        profiler.end("draw.projectiles")
+        
+        # Draw particle effects over everything but the UI
+        profiler.begin("draw.particles")
+        self.particles.draw(screen, self.camera_offset_x)
+        profiler.end("draw.particles")
         
-        # Draw UI elements - use the function name that's actually defined in ui.py
-        from ui import draw_gameplay
-        draw_gameplay(screen, self.player, self.platforms, self.obstacles, self.enemies, 
-                    self.projectiles, self.score, self.wave, self.camera_offset_x,
-                    self.game_manager.debug_mode)
+        # Draw UI elements
+        profiler.begin("draw.ui")
+        draw_gameplay_ui(screen, self.player, self.score, self.wave, self.tuning.max_waves)
+        if self.game_manager.debug_mode:
+            draw_debug_info(screen, self.player, self.camera_offset_x, self.enemies, self.projectiles,
+                            self.active_enemies, self.particles.live)
+        profiler.end("draw.ui")
 
 class GameOverState(GameState):
     """Game over state showing score and restart options"""
@@ -433,7 +709,7 @@ class PauseState(GameState):
         self.selected_option = 0
         
         # Create a screenshot of the current gameplay
-        self.gameplay_screen = pygame.Surface((WIDTH, HEIGHT))
+        self.gameplay_screen = surface_memory.track(pygame.Surface((WIDTH, HEIGHT)), "ui")
         self.gameplay_screen.blit(pygame.display.get_surface(), (0, 0))
     
     def handle_events(self, event):
@@ -462,11 +738,12 @@ class PauseState(GameState):
 class VictoryState(GameState):
     """Victory state showing score and completion info"""
     
-    def __init__(self, game_manager, score, wave, level):
+    def __init__(self, game_manager, score, wave, level, max_waves=MAX_WAVES):
         super().__init__(game_manager)
         self.score = score
         self.wave = wave
         self.level = level
+        self.max_waves = max_waves
         self.selected_option = 0
     
     def handle_events(self, event):
@@ -479,7 +756,7 @@ class VictoryState(GameState):
                 if VICTORY_OPTIONS[self.selected_option] == "Next Level":
                     # Try to load next level or go to menu if there is no next level
                     next_level = self.level + 1
-                    if next_level <= 2:  # Assuming we have 2 levels
+                    if next_level <= level_count():
                         self.game_manager.set_state(GAMEPLAY, level=next_level, restart=True)
                     else:
                         # No more levels, go back to menu
@@ -491,4 +768,4 @@ class VictoryState(GameState):
         pass
     
     def draw(self, screen):
-        draw_victory(screen, self.score, self.wave, self.selected_option)
\ No newline at end of file
+        draw_victory(screen, self.score, self.wave, self.selected_option, self.max_waves)
\ No newline at end of file
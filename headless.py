@@ -0,0 +1,97 @@
+"""
+Headless games driven by a scripted bot
+
+Runs GameplayState without a window, for balance sweeps and other tools
+that need to play many games unattended.
+"""
+import os
+import pygame
+from settings import FPS, GAMEOVER, VICTORY
+
+def init_headless():
+    """
+    Set up a dummy display
+
+    Sprites and levels are loaded as display surfaces, so even headless
+    games need a display mode set.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    if not pygame.display.get_init():
+        pygame.display.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+
+class HeadlessManager:
+    """Stands in for GameStateManager and records how the game ended"""
+
+    def __init__(self):
+        self.debug_mode = False
+        self.outcome = None
+
+    def set_state(self, state_id, **kwargs):
+        if state_id in (GAMEOVER, VICTORY) and self.outcome is None:
+            self.outcome = state_id
+
+class ScriptedBot:
+    """Walks into range of the nearest zombie, keeps its distance and shoots at it"""
+
+    def __init__(self, fire_interval=12, keep_away=120, engage_range=350, jump_interval=45):
+        self.fire_interval = fire_interval  # Ticks between shots
+        self.keep_away = keep_away  # Back off from zombies closer than this
+        self.engage_range = engage_range  # Walk toward zombies farther than this
+        self.jump_interval = jump_interval  # Ticks between jumps while moving, to clear obstacles
+
+    def act(self, state):
+        """Set the player's input for the next tick"""
+        player = state.player
+        player.moving_left = player.moving_right = False
+        world_x = player.x + state.camera_offset_x
+
+        target = min(state.enemies, key=lambda e: abs(e.x - world_x), default=None)
+        if target is None:
+            return
+
+        distance = target.x - world_x
+        if abs(distance) < self.keep_away:
+            player.moving_left = distance > 0
+            player.moving_right = distance < 0
+        elif abs(distance) > self.engage_range:
+            player.moving_left = distance < 0
+            player.moving_right = distance > 0
+        if (player.moving_left or player.moving_right) and state.tick % self.jump_interval == 0:
+            player.jump()
+
+        if state.tick % self.fire_interval == 0:
+            aim = (target.x + target.width / 2 - state.camera_offset_x, target.y + target.height / 2)
+            player.shoot(aim, state.camera_offset_x, state.projectiles)
+
+def run_game(level=1, seed=None, max_ticks=FPS * 60 * 10, bot=None, tuning=None):
+    """
+    Play one game with a bot until it is won, lost or runs out of time
+
+    Args:
+        tuning (Tuning): Balance values to play with, or None for the defaults
+
+    Returns:
+        dict: completed, wave reached, ticks played, score and health left
+    """
+    from game_states import GameplayState
+
+    init_headless()
+    manager = HeadlessManager()
+    state = GameplayState(manager, level, history=False, effects=False, tuning=tuning, seed=seed)
+    bot = bot or ScriptedBot()
+
+    while manager.outcome is None and state.tick < max_ticks:
+        bot.act(state)
+        state.update()
+
+    completed = manager.outcome == VICTORY
+    return {
+        "completed": completed,
+        "wave": state.wave - 1 if completed else state.wave,
+        "ticks": state.tick,
+        "score": state.score,
+        "health": max(state.player.health, 0),
+    }
@@ -3,8 +3,10 @@ Level management classes and functions
 """
 import pygame
 import os
-from settings import WIDTH, HEIGHT, GROUND_LEVEL, GRAY
+from settings import WIDTH, HEIGHT, GROUND_LEVEL, GRAY, PLATFORM_TILE
 from debug import add_debug  # Import at the top level
+from assets import asset_exists, find_asset
+from surface_memory import surface_memory
 
 # Create a parallax background instance - will be initialized later
 parallax_background = None
@@ -26,9 +28,10 @@ def initialize_level_graphics():
     
     # Load platform tile
     try:
-        platform_path = os.path.join('assets', 'environment', 'platform.png')
-        if os.path.exists(platform_path):
-            platform_tile_img = pygame.image.load(platform_path).convert_alpha()
+        platform_path = PLATFORM_TILE
+        if asset_exists(platform_path):
+            platform_tile_img = surface_memory.track(
+                pygame.image.load(platform_path).convert_alpha(), "level")
             add_debug(f"Platform tile loaded from {platform_path}")
         else:
             add_debug(f"Platform tile not found at {platform_path}")
@@ -40,10 +43,35 @@ def initialize_level_graphics():
     # Log initialization
     add_debug(f"Level graphics initialized with {len(parallax_background.layers) if parallax_background else 0} parallax layers")
 
+def bake_platform_surface(tile, width, height):
+    """Tile an image horizontally across a new platform-sized surface"""
+    platform_surface = surface_memory.track(pygame.Surface((width, height), pygame.SRCALPHA), "platforms")
+    
+    # Get tile dimensions
+    tile_width = tile.get_width()
+    tile_height = tile.get_height()
+    
+    # Calculate how many tiles we need horizontally
+    tiles_x = max(1, width // tile_width)
+    remaining_width = width % tile_width
+    
+    # Draw the middle tiles (repeated)
+    for i in range(tiles_x):
+        # Draw full tiles
+        platform_surface.blit(tile, (i * tile_width, 0))
+    
+    # If there's remaining width, draw a partial tile
+    if remaining_width > 0:
+        # Create a subsurface for the partial tile
+        partial_tile = tile.subsurface((0, 0, remaining_width, tile_height))
+        platform_surface.blit(partial_tile, (tiles_x * tile_width, 0))
+    
+    return platform_surface
+
 class Platform:
     """Platform class for player to stand on"""
     
-    def __init__(self, x, y, width, height, color=GRAY, is_hazard=False):
+    def __init__(self, x, y, width, height, color=GRAY, is_hazard=False, surface=None):
         self.x = x
         self.y = y
         self.width = width
@@ -53,8 +81,8 @@ class Platform:
         # Check if color has alpha channel (transparency)
         self.has_transparency = isinstance(color, tuple) and len(color) == 4
         
-        # Create platform surface based on the platform_tile_img
-        self.surface = self.create_platform_surface()
+        # Use the pre-baked surface from the level file, or tile one now
+        self.surface = surface if surface is not None else self.create_platform_surface()
     
     def create_platform_surface(self):
         """Create a surface for the platform using the tile image"""
@@ -64,49 +92,29 @@ class Platform:
         if platform_tile_img is None or (self.has_transparency and self.color[3] == 0):
             return None
             
-        # Create a surface for the platform
-        platform_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        
-        # Get tile dimensions
-        tile_width = platform_tile_img.get_width()
-        tile_height = platform_tile_img.get_height()
-        
-        # Calculate how many tiles we need horizontally
-        tiles_x = max(1, self.width // tile_width)
-        remaining_width = self.width % tile_width
-        
-        # Draw the middle tiles (repeated)
-        for i in range(tiles_x):
-            # Draw full tiles
-            platform_surface.blit(platform_tile_img, (i * tile_width, 0))
-        
-        # If there's remaining width, draw a partial tile
-        if remaining_width > 0:
-            # Create a subsurface for the partial tile
-            partial_tile = platform_tile_img.subsurface((0, 0, remaining_width, tile_height))
-            platform_surface.blit(partial_tile, (tiles_x * tile_width, 0))
-        
-        return platform_surface
+        return bake_platform_surface(platform_tile_img, self.width, self.height)
     
-    def draw(self, screen, camera_offset_x):
+    def draw(self, screen, camera_offset_x, camera_offset_y=0):
         """Draw the platform on the screen with camera offset"""
         screen_x = self.x - camera_offset_x
+        screen_y = self.y - camera_offset_y
         
         # Only draw if the platform isn't fully transparent
         if not self.has_transparency or self.color[3] > 0:
             if self.surface:
                 # If we have a platform surface, draw it
-                screen.blit(self.surface, (int(screen_x), int(self.y)))
+                screen.blit(self.surface, (int(screen_x), int(screen_y)))
             else:
                 # Fallback to rectangle if no surface
                 if self.has_transparency:
                     # Create a surface with per-pixel alpha
-                    platform_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+                    platform_surface = surface_memory.track(
+                        pygame.Surface((self.width, self.height), pygame.SRCALPHA), "platforms")
                     platform_surface.fill(self.color)
-                    screen.blit(platform_surface, (screen_x, self.y))
+                    screen.blit(platform_surface, (screen_x, screen_y))
                 else:
                     # Regular drawing for non-transparent platforms
-                    pygame.draw.rect(screen, self.color, (screen_x, self.y, self.width, self.height))
+                    pygame.draw.rect(screen, self.color, (screen_x, screen_y, self.width, self.height))
     
     def check_collision(self, x, y, width, height):
         """Check if the platform collides with the given rectangle"""
@@ -129,13 +137,14 @@ class Obstacle:
         self.blocks_projectiles = blocks_projectiles
         self.color = (200, 0, 0)  # Red for hazards
     
-    def draw(self, screen, camera_offset_x):
+    def draw(self, screen, camera_offset_x, camera_offset_y=0):
         """Draw the obstacle on the screen with camera offset"""
         screen_x = self.x - camera_offset_x
+        screen_y = self.y - camera_offset_y
         
         # Only draw if potentially visible on screen
         if screen_x + self.width > 0 and screen_x < screen.get_width():
-            pygame.draw.rect(screen, self.color, (screen_x, self.y, self.width, self.height))
+            pygame.draw.rect(screen, self.color, (screen_x, screen_y, self.width, self.height))
             
             # Draw spikes for hazards
             if self.damage > 0:
@@ -145,9 +154,9 @@ class Obstacle:
                 for i in range(int(num_spikes)):
                     spike_x = screen_x + i * spike_width
                     pygame.draw.polygon(screen, spike_color, [
-                        (spike_x, self.y),
-                        (spike_x + spike_width // 2, self.y - 10),
-                        (spike_x + spike_width, self.y)
+                        (spike_x, screen_y),
+                        (spike_x + spike_width // 2, screen_y - 10),
+                        (spike_x + spike_width, screen_y)
                     ])
     
     def check_collision(self, x, y, width, height):
@@ -157,97 +166,7 @@ class Obstacle:
                 self.y < y + height and
                 self.y + self.height > y)
 
-def create_level(level_number):
-    """Create and return platforms and obstacles for the specified level"""
-    # Make sure the level graphics are initialized
-    if parallax_background is None:
-        initialize_level_graphics()
-        
-    platforms = []
-    obstacles = []
-    
-    if level_number == 1:
-        # Ground platform (spans the entire level)
-        # Make it invisible by setting a transparent color
-        # Use tuple with alpha value (R,G,B,A) where A=0 for full transparency
-        ground = Platform(0, GROUND_LEVEL, WIDTH * 4, HEIGHT - GROUND_LEVEL, color=(0, 0, 0, 0))
-        platforms.append(ground)
-        
-        # Add some floating platforms
-        platforms.append(Platform(300, GROUND_LEVEL - 120, 200, 20))
-        platforms.append(Platform(600, GROUND_LEVEL - 200, 200, 20))
-        
-        # Create a gap with a hazard
-        obstacles.append(Obstacle(800, GROUND_LEVEL - 10, 100, 10, damage=20))
-        
-        # More platforms after the gap
-        platforms.append(Platform(900, GROUND_LEVEL - 150, 200, 20))
-        
-        # Elevated section with obstacles underneath
-        platforms.append(Platform(1200, GROUND_LEVEL - 250, 300, 20))
-        obstacles.append(Obstacle(1250, GROUND_LEVEL - 50, 200, 10, damage=15))
-        
-        # Create a challenging area
-        platforms.append(Platform(1600, GROUND_LEVEL - 180, 100, 20))
-        platforms.append(Platform(1800, GROUND_LEVEL - 130, 100, 20))
-        platforms.append(Platform(2000, GROUND_LEVEL - 200, 150, 20))
-        
-        # Wall that blocks enemies but not projectiles
-        obstacles.append(Obstacle(2300, GROUND_LEVEL - 150, 20, 150, damage=0, 
-                                blocks_player=True, blocks_enemies=True, blocks_projectiles=False))
-        
-        # Safe platform after wall
-        platforms.append(Platform(2400, GROUND_LEVEL - 100, 300, 20))
-        
-        # Final section with challenges
-        platforms.append(Platform(2800, GROUND_LEVEL - 150, 100, 20))
-        obstacles.append(Obstacle(2900, GROUND_LEVEL - 10, 150, 10, damage=25))
-        platforms.append(Platform(3050, GROUND_LEVEL - 180, 100, 20))
-        platforms.append(Platform(3250, GROUND_LEVEL - 220, 150, 20))
-    
-    elif level_number == 2:
-        # Ground platform (spans the entire level)
-        ground = Platform(0, GROUND_LEVEL, WIDTH * 5, HEIGHT - GROUND_LEVEL, color=(0, 0, 0, 0))
-        platforms.append(ground)
-        
-        # Create a more complex level with multiple paths
-        
-        # Lower path with hazards
-        obstacles.append(Obstacle(300, GROUND_LEVEL - 15, 80, 15, damage=10))
-        obstacles.append(Obstacle(600, GROUND_LEVEL - 15, 120, 15, damage=15))
-        obstacles.append(Obstacle(900, GROUND_LEVEL - 15, 150, 15, damage=20))
-        
-        # Upper path with challenging jumps
-        platforms.append(Platform(200, GROUND_LEVEL - 150, 80, 20))
-        platforms.append(Platform(400, GROUND_LEVEL - 200, 80, 20))
-        platforms.append(Platform(600, GROUND_LEVEL - 250, 80, 20))
-        platforms.append(Platform(800, GROUND_LEVEL - 300, 120, 20))
-        
-        # Middle section with obstacles
-        platforms.append(Platform(1000, GROUND_LEVEL - 200, 300, 20))
-        obstacles.append(Obstacle(1150, GROUND_LEVEL - 240, 100, 20, damage=25))
-        
-        # Vertical challenge section
-        for i in range(5):
-            platforms.append(Platform(1400 + i*150, GROUND_LEVEL - 120 - i*40, 80, 20))
-        
-        # Wall that blocks enemies
-        obstacles.append(Obstacle(2300, GROUND_LEVEL - 200, 30, 200, damage=0, 
-                                blocks_player=True, blocks_enemies=True, blocks_projectiles=False))
-        
-        # Final challenging section
-        platforms.append(Platform(2400, GROUND_LEVEL - 150, 100, 20))
-        platforms.append(Platform(2600, GROUND_LEVEL - 200, 100, 20))
-        platforms.append(Platform(2800, GROUND_LEVEL - 250, 100, 20))
-        platforms.append(Platform(3000, GROUND_LEVEL - 300, 150, 20))
-        obstacles.append(Obstacle(3000, GROUND_LEVEL - 50, 250, 20, damage=30))
-        
-        # Safe final platform
-        platforms.append(Platform(3300, GROUND_LEVEL - 150, 300, 20))
-    
-    return platforms, obstacles
-
-def draw_level_background(screen, camera_offset_x=0, debug_mode=False):
+def draw_level_background(screen, camera_offset_x=0, debug_mode=False, ground=True):
     """
     Draw the level background (sky, ground, etc.) with parallax scrolling
     
@@ -255,6 +174,8 @@ def draw_level_background(screen, camera_offset_x=0, debug_mode=False):
         screen (pygame.Surface): The screen to draw on
         camera_offset_x (float): The camera's x offset for parallax effect
         debug_mode (bool): Whether to draw debug information
+        ground (bool): Whether to draw the ground tiles; levels with a tile
+            layer bake their own ground into the level chunks
     """
     # Check if parallax background is initialized
     global parallax_background
@@ -289,7 +210,8 @@ def draw_level_background(screen, camera_offset_x=0, debug_mode=False):
         pygame.draw.polygon(screen, (100, 100, 100), [(0, 200), (100, 120), (200, 180), (300, 100), (400, 160), (WIDTH, 200)])
     
     # Draw ground with tile image instead of solid color
-    draw_ground_tiles(screen, camera_offset_x, debug_mode)
+    if ground:
+        draw_ground_tiles(screen, camera_offset_x, debug_mode)
 
 def draw_ground_tiles(screen, camera_offset_x, debug_mode=False):
     """Draw the ground using the ground_tile.png image"""
@@ -306,16 +228,15 @@ def draw_ground_tiles(screen, camera_offset_x, debug_mode=False):
                 'ground_tile.png'
             ]
             
-            for path in possible_paths:
-                if os.path.exists(path):
-                    # Load the ground tile
-                    original_tile = pygame.image.load(path).convert_alpha()
-                    
-                    # Scale the tile to be more visible (32x32 instead of 16x16)
-                    ground_tile_img = pygame.transform.scale(original_tile, (32, 32))
-                    
-                    add_debug(f"Ground tile loaded from {path}")
-                    break
+            path = find_asset(*possible_paths)
+            if path:
+                # Load the ground tile
+                original_tile = pygame.image.load(path).convert_alpha()
+                
+                # Scale the tile to be more visible (32x32 instead of 16x16)
+                ground_tile_img = surface_memory.track(pygame.transform.scale(original_tile, (32, 32)), "level")
+                
+                add_debug(f"Ground tile loaded from {path}")
             
             # If we didn't find the image, create a fallback
             if ground_tile_img is None:
@@ -324,7 +245,7 @@ def draw_ground_tiles(screen, camera_offset_x, debug_mode=False):
         except Exception as e:
             add_debug(f"Failed to load ground tile: {e}")
             # Create a fallback tile texture
-            ground_tile_img = pygame.Surface((32, 32))
+            ground_tile_img = surface_memory.track(pygame.Surface((32, 32)), "level")
             ground_tile_img.fill((101, 67, 33))  # Brown
             pygame.draw.line(ground_tile_img, (76, 153, 0), (0, 0), (32, 0), 5)  # Green grass line
     
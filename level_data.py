@@ -0,0 +1,322 @@
+"""
+Level files: JSON sources, compiled binary levels and the collision index
+
+Levels are authored as levels/levelN.json and compiled into levels/levelN.lvl,
+which holds everything needed to build the level in a single read:
+
+    header      magic, version, world width and section counts
+    platforms   x, y, width, height, RGBA color, baked surface index
+    obstacles   x, y, width, height, damage, blocking flags (sorted by x)
+    tiles       x, y, columns, rows, tile id (sorted by x)
+    collision   platform rects merged where they touch, sorted by x
+    index       left edges and running max of right edges for both the
+                collision rects and the obstacles
+    surfaces    pre-baked RGBA pixels, one per distinct platform size
+
+Run this module to compile every level: python level_data.py
+"""
+import os
+import sys
+import json
+import glob
+import struct
+from bisect import bisect_left, bisect_right
+import pygame
+from settings import GROUND_LEVEL, GRAY, LEVELS_DIR, PLATFORM_TILE
+from tilemap import TileRun, TILE_NAMES
+from surface_memory import surface_memory
+
+LEVEL_MAGIC = b"ZFLV"
+LEVEL_VERSION = 2
+
+HEADER = struct.Struct("<4sHIHHHHH")
+PLATFORM = struct.Struct("<iiHH4Bh")
+OBSTACLE = struct.Struct("<iiHHHB")
+TILE = struct.Struct("<iiHHB")
+RECT = struct.Struct("<iiHH")
+SURFACE = struct.Struct("<HH")
+
+# Obstacle blocking flags
+BLOCKS_PLAYER = 1
+BLOCKS_ENEMIES = 2
+BLOCKS_PROJECTILES = 4
+
+class CollisionRect:
+    """Solid rectangle entities can land on, merged from touching platforms"""
+    __slots__ = ("x", "y", "width", "height")
+
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    def check_collision(self, x, y, width, height):
+        """Check if the rect collides with the given rectangle"""
+        return (self.x < x + width and
+                self.x + self.width > x and
+                self.y < y + height and
+                self.y + self.height > y)
+
+class SpatialIndex:
+    """
+    Finds the items overlapping an x range with two binary searches
+
+    Items are sorted by left edge. Because the running max of right edges
+    never decreases, every item that can reach past x0 comes at or after
+    the first index whose running max exceeds x0.
+    """
+
+    def __init__(self, items, lefts=None, max_rights=None):
+        self.items = items
+        if lefts is None:
+            lefts, max_rights = build_index(items)
+        self.lefts = lefts
+        self.max_rights = max_rights
+
+    def query(self, x0, x1):
+        """Return the items whose x extent overlaps (x0, x1)"""
+        lo = bisect_right(self.max_rights, x0)
+        hi = bisect_left(self.lefts, x1)
+        return [item for item in self.items[lo:hi] if item.x + item.width > x0]
+
+class LevelData:
+    """Everything loaded from a level file"""
+
+    def __init__(self, number, width, platforms, obstacles, tiles, collision_rects, collision_index, obstacle_index):
+        from nav import NavGraph
+
+        self.number = number
+        self.width = width
+        self.platforms = platforms  # Drawable platforms
+        self.obstacles = obstacles  # Sorted by x
+        self.tiles = tiles  # Tile runs, sorted by x
+        self.collision_rects = collision_rects
+        self.collision = collision_index
+        self.obstacle_index = obstacle_index
+        self.nav = NavGraph(width, collision_index, obstacles)  # Enemy navigation, built once per load
+
+def build_index(items):
+    """Return the sorted left edges and the running max of right edges"""
+    lefts = []
+    max_rights = []
+    max_right = None
+    for item in items:
+        lefts.append(item.x)
+        right = item.x + item.width
+        max_right = right if max_right is None else max(max_right, right)
+        max_rights.append(max_right)
+    return lefts, max_rights
+
+def merge_rects(rects):
+    """Merge (x, y, width, height) rects at the same height that touch or overlap"""
+    merged = []
+    for x, y, width, height in sorted(rects, key=lambda r: (r[1], r[3], r[0])):
+        if merged:
+            mx, my, mwidth, mheight = merged[-1]
+            if my == y and mheight == height and x <= mx + mwidth:
+                merged[-1] = (mx, my, max(mx + mwidth, x + width) - mx, mheight)
+                continue
+        merged.append((x, y, width, height))
+    return sorted(merged)
+
+def level_source_path(number):
+    return os.path.join(LEVELS_DIR, f"level{number}.json")
+
+def level_compiled_path(number):
+    return os.path.join(LEVELS_DIR, f"level{number}.lvl")
+
+def level_count():
+    """Number of consecutive levels available, starting from level 1"""
+    count = 0
+    while os.path.exists(level_source_path(count + 1)) or os.path.exists(level_compiled_path(count + 1)):
+        count += 1
+    return count
+
+def read_level_source(number):
+    """
+    Read a JSON level into plain tuples
+
+    Elevations are measured upward from GROUND_LEVEL to the top of the rect.
+
+    Returns:
+        tuple: (platforms, obstacles, tiles) as lists of tuples
+    """
+    with open(level_source_path(number)) as f:
+        source = json.load(f)
+
+    platforms = []
+    for p in source["platforms"]:
+        color = tuple(p.get("color", GRAY))
+        if len(color) == 3:
+            color = color + (255,)
+        platforms.append((p["x"], GROUND_LEVEL - p["elevation"], p["width"], p["height"], color))
+
+    obstacles = []
+    for o in source.get("obstacles", []):
+        flags = 0
+        if o.get("blocks_player", True):
+            flags |= BLOCKS_PLAYER
+        if o.get("blocks_enemies", True):
+            flags |= BLOCKS_ENEMIES
+        if o.get("blocks_projectiles", False):
+            flags |= BLOCKS_PROJECTILES
+        obstacles.append((o["x"], GROUND_LEVEL - o["elevation"], o["width"], o["height"], o.get("damage", 10), flags))
+
+    tiles = []
+    for t in source.get("tiles", []):
+        tiles.append((t["x"], GROUND_LEVEL - t["elevation"], t.get("columns", 1), t.get("rows", 1),
+                      TILE_NAMES.index(t["tile"])))
+
+    return platforms, sorted(obstacles), sorted(tiles)
+
+def compile_level(number):
+    """Compile levels/levelN.json into levels/levelN.lvl"""
+    from level import bake_platform_surface
+
+    platforms, obstacles, tiles = read_level_source(number)
+    width = max(x + w for x, _, w, _, _ in platforms)
+
+    # Bake one surface per distinct size of visible platform
+    tile = pygame.image.load(PLATFORM_TILE) if os.path.exists(PLATFORM_TILE) else None
+    surface_sizes = []
+    if tile is not None:
+        for _, _, w, h, color in platforms:
+            if color[3] > 0 and (w, h) not in surface_sizes:
+                surface_sizes.append((w, h))
+
+    collision = merge_rects([(x, y, w, h) for x, y, w, h, _ in platforms])
+    collision_lefts, collision_rights = build_index([CollisionRect(*r) for r in collision])
+    obstacle_lefts, obstacle_rights = build_index([CollisionRect(*o[:4]) for o in obstacles])
+
+    parts = [HEADER.pack(LEVEL_MAGIC, LEVEL_VERSION, width,
+                         len(platforms), len(obstacles), len(tiles), len(collision), len(surface_sizes))]
+    for x, y, w, h, color in platforms:
+        surface_index = surface_sizes.index((w, h)) if (w, h) in surface_sizes else -1
+        parts.append(PLATFORM.pack(x, y, w, h, *color, surface_index))
+    for obstacle in obstacles:
+        parts.append(OBSTACLE.pack(*obstacle))
+    for tile_run in tiles:
+        parts.append(TILE.pack(*tile_run))
+    for rect in collision:
+        parts.append(RECT.pack(*rect))
+    for values in (collision_lefts, collision_rights, obstacle_lefts, obstacle_rights):
+        parts.append(struct.pack(f"<{len(values)}i", *values))
+    for w, h in surface_sizes:
+        parts.append(SURFACE.pack(w, h))
+        parts.append(pygame.image.tobytes(bake_platform_surface(tile, w, h), "RGBA"))
+
+    # Written beside the compiled level and moved over it, so a process
+    # loading the level never sees a partly written file
+    path = level_compiled_path(number)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(b"".join(parts))
+    os.replace(temp_path, path)
+
+def compiled_level_is_current(number):
+    """Check the compiled level is up to date with the format, its JSON source and the platform tile"""
+    compiled = level_compiled_path(number)
+    if not os.path.exists(compiled):
+        return False
+    with open(compiled, "rb") as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size or HEADER.unpack(header)[:2] != (LEVEL_MAGIC, LEVEL_VERSION):
+        return False
+    compiled_time = os.path.getmtime(compiled)
+    for source in (level_source_path(number), PLATFORM_TILE):
+        if os.path.exists(source) and os.path.getmtime(source) > compiled_time:
+            return False
+    return True
+
+def ensure_compiled(number):
+    """
+    Compile a level from JSON if its compiled file is missing or out of date
+
+    Call before starting worker processes, so they don't each compile it.
+    """
+    if os.path.exists(level_source_path(number)) and not compiled_level_is_current(number):
+        compile_level(number)
+
+def load_level(number):
+    """
+    Load a compiled level, compiling it from JSON first if needed
+
+    Returns:
+        LevelData: The level's platforms, obstacles and collision index
+    """
+    from level import Platform, Obstacle
+
+    ensure_compiled(number)
+
+    with open(level_compiled_path(number), "rb") as f:
+        data = f.read()
+
+    magic, version, width, n_platforms, n_obstacles, n_tiles, n_collision, n_surfaces = HEADER.unpack_from(data)
+    if magic != LEVEL_MAGIC or version != LEVEL_VERSION:
+        raise ValueError(f"{level_compiled_path(number)} is not a version {LEVEL_VERSION} level")
+    offset = HEADER.size
+
+    platform_records = []
+    for _ in range(n_platforms):
+        platform_records.append(PLATFORM.unpack_from(data, offset))
+        offset += PLATFORM.size
+
+    obstacles = []
+    for _ in range(n_obstacles):
+        x, y, w, h, damage, flags = OBSTACLE.unpack_from(data, offset)
+        offset += OBSTACLE.size
+        obstacles.append(Obstacle(x, y, w, h, damage=damage,
+                                  blocks_player=bool(flags & BLOCKS_PLAYER),
+                                  blocks_enemies=bool(flags & BLOCKS_ENEMIES),
+                                  blocks_projectiles=bool(flags & BLOCKS_PROJECTILES)))
+
+    tiles = []
+    for _ in range(n_tiles):
+        x, y, columns, rows, tile_id = TILE.unpack_from(data, offset)
+        offset += TILE.size
+        tiles.append(TileRun(x, y, TILE_NAMES[tile_id], columns, rows))
+
+    collision_rects = []
+    for _ in range(n_collision):
+        collision_rects.append(CollisionRect(*RECT.unpack_from(data, offset)))
+        offset += RECT.size
+
+    index_arrays = []
+    for count in (n_collision, n_collision, n_obstacles, n_obstacles):
+        index_arrays.append(list(struct.unpack_from(f"<{count}i", data, offset)))
+        offset += 4 * count
+
+    surfaces = []
+    for _ in range(n_surfaces):
+        w, h = SURFACE.unpack_from(data, offset)
+        offset += SURFACE.size
+        pixels = data[offset:offset + w * h * 4]
+        offset += w * h * 4
+        surface = pygame.image.frombuffer(pixels, (w, h), "RGBA")
+        surface = surface.convert_alpha() if pygame.display.get_surface() else surface.copy()
+        surfaces.append(surface_memory.track(surface, "platforms"))
+
+    platforms = []
+    for x, y, w, h, r, g, b, a, surface_index in platform_records:
+        color = (r, g, b) if a == 255 else (r, g, b, a)
+        surface = surfaces[surface_index] if surface_index >= 0 else None
+        platforms.append(Platform(x, y, w, h, color=color, surface=surface))
+
+    return LevelData(
+        number, width, platforms, obstacles, tiles, collision_rects,
+        SpatialIndex(collision_rects, index_arrays[0], index_arrays[1]),
+        SpatialIndex(obstacles, index_arrays[2], index_arrays[3])
+    )
+
+def main():
+    """Compile every JSON level in LEVELS_DIR"""
+    for path in sorted(glob.glob(os.path.join(LEVELS_DIR, "level*.json"))):
+        number = int(os.path.basename(path)[len("level"):-len(".json")])
+        compile_level(number)
+        print(f"Compiled {path} -> {level_compiled_path(number)} "
+              f"({os.path.getsize(level_compiled_path(number))} bytes)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
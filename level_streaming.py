@@ -0,0 +1,109 @@
+"""
+Chunked level streaming
+
+The world is split into CHUNK_WIDTH wide chunks. Chunks coming into view are
+baked into one surface holding their tiles, platforms and obstacles, and
+chunks the camera has left behind are dropped again, so drawing cost and
+baked surface memory depend on the screen width rather than on the length
+of the level.
+"""
+import pygame
+from settings import WIDTH, HEIGHT, CHUNK_WIDTH, CHUNK_PREFETCH, CHUNK_KEEP_BEHIND
+from debug import add_debug, DEBUG
+from level_data import SpatialIndex
+from surface_memory import surface_memory
+
+# Obstacle spikes stick out this far above the obstacle
+SPIKE_HEIGHT = 10
+
+class Chunk:
+    """One CHUNK_WIDTH slice of the level and its baked surface"""
+
+    def __init__(self, index, tiles, platforms, obstacles):
+        self.index = index
+        self.x = index * CHUNK_WIDTH
+        self.tiles = tiles
+        self.platforms = platforms
+        self.obstacles = obstacles
+        self.surface = None
+        self.top = 0
+
+    def bake(self):
+        """Draw the chunk's tiles, platforms and obstacles into a single surface"""
+        visible = [p for p in self.platforms if not p.has_transparency or p.color[3] > 0]
+        if not self.tiles and not visible and not self.obstacles:
+            return
+
+        # Only cover the band of the screen the chunk actually draws into
+        self.top = min([t.y for t in self.tiles] + [p.y for p in visible] +
+                       [o.y - SPIKE_HEIGHT for o in self.obstacles])
+        bottom = min(HEIGHT, max([t.y + t.height for t in self.tiles] + [p.y + p.height for p in visible] +
+                                 [o.y + o.height for o in self.obstacles]))
+        self.surface = surface_memory.track(
+            pygame.Surface((CHUNK_WIDTH, bottom - self.top), pygame.SRCALPHA), "chunks")
+
+        # Drawing with the chunk's origin as the camera offset gives chunk-local
+        # coordinates; anything overhanging the edge is clipped and drawn again
+        # by the neighbouring chunk
+        for tile_run in self.tiles:
+            tile_run.draw(self.surface, self.x, self.top)
+        for platform in visible:
+            platform.draw(self.surface, self.x, self.top)
+        for obstacle in self.obstacles:
+            obstacle.draw(self.surface, self.x, self.top)
+
+class LevelStreamer:
+    """Keeps the chunks around the camera baked and unloads the rest"""
+
+    def __init__(self, level_data):
+        self.level_data = level_data
+        self.platform_index = SpatialIndex(sorted(level_data.platforms, key=lambda p: p.x))
+        self.tile_index = SpatialIndex(level_data.tiles)
+        self.chunk_count = level_data.width // CHUNK_WIDTH + 1
+        self.chunks = {}  # Loaded chunks by index
+
+    def load_chunk(self, index):
+        """Collect and bake the tiles, platforms and obstacles overlapping a chunk"""
+        x0 = index * CHUNK_WIDTH
+        x1 = x0 + CHUNK_WIDTH
+        chunk = Chunk(index, self.tile_index.query(x0, x1), self.platform_index.query(x0, x1),
+                      self.level_data.obstacle_index.query(x0, x1))
+        chunk.bake()
+        self.chunks[index] = chunk
+        add_debug("Loaded chunk %d (%d tile runs, %d platforms, %d obstacles)",
+                  index, len(chunk.tiles), len(chunk.platforms), len(chunk.obstacles), level=DEBUG)
+
+    def visible_range(self, camera_offset_x):
+        """First and last index of the chunks on screen"""
+        first = max(0, int(camera_offset_x) // CHUNK_WIDTH)
+        last = min(self.chunk_count - 1, int(camera_offset_x + WIDTH) // CHUNK_WIDTH)
+        return first, last
+
+    def update(self, camera_offset_x):
+        """Load chunks coming into view and unload the ones left behind"""
+        first, last = self.visible_range(camera_offset_x)
+
+        # Chunks on screen have to be ready this frame
+        for index in range(first, last + 1):
+            if index not in self.chunks:
+                self.load_chunk(index)
+
+        # Chunks ahead of the camera are baked one per frame so that
+        # streaming never lands several bakes on the same frame
+        for index in range(last + 1, min(self.chunk_count, last + 1 + CHUNK_PREFETCH)):
+            if index not in self.chunks:
+                self.load_chunk(index)
+                break
+
+        for index in list(self.chunks):
+            if index < first - CHUNK_KEEP_BEHIND or index > last + CHUNK_PREFETCH:
+                del self.chunks[index]
+                add_debug("Unloaded chunk %d", index, level=DEBUG)
+
+    def draw(self, screen, camera_offset_x):
+        """Blit the baked surface of every chunk on screen"""
+        first, last = self.visible_range(camera_offset_x)
+        for index in range(first, last + 1):
+            chunk = self.chunks.get(index)
+            if chunk and chunk.surface:
+                screen.blit(chunk.surface, (chunk.x - int(camera_offset_x), chunk.top))
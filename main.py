@@ -1,87 +1,128 @@
+import time
+
+# Taken before anything else is imported, for --startup-report
+PROCESS_START = time.perf_counter()
+
 import pygame
 import sys
 import os
-from settings import WIDTH, HEIGHT, FPS
-from debug import add_debug, log_to_file
+import argparse
+from settings import WIDTH, HEIGHT, FPS, GAMEPLAY
+from debug import add_debug, log_to_file, shutdown_logging, DEBUG, WARNING
+from profiler import profiler
+from surface_memory import surface_memory
+from assets import load_manifest, asset_exists, find_asset
+
+# Assets the game expects, checked against the asset manifest at startup
+EXPECTED_ASSETS = {
+    "Player sprites": [
+        f"assets/player/{state}_{direction}_{i}.png"
+        for state in ("idle", "walking") for direction in ("right", "left") for i in range(4)
+    ],
+    "Zombie sprites": [
+        f"assets/enemy/zombie_{animation}_{direction}_{i}.png"
+        for animation, frames in (("run", 4), ("idle", 2), ("attack", 4))
+        for direction in ("right", "left") for i in range(frames)
+    ],
+    "Environment tiles": [
+        "assets/environment/platform.png",
+        "assets/environment/ground_tile.png",
+    ],
+}
+
+# Background layers, each may live in assets/background or the root directory
+BACKGROUND_ASSETS = [
+    "assetpack sky1.png",
+    "assetpack sky2.png",
+    "assetpack bg1.png",
+    "assetpack bg2.png",
+    "assetpack bg3.png",
+    "assetpack smog large.png",
+]
 
 # Add startup diagnostics
 def run_diagnostics():
-    """Run startup diagnostics to check for sprite files and background assets"""
+    """Check the expected sprite files and background assets against the asset manifest"""
     add_debug("=== STARTUP DIAGNOSTICS ===")
     
-    # Check for player sprites
-    if os.path.exists("assets"):
-        add_debug("Assets directory exists")
-        
-        # Check for player directory
-        if os.path.exists("assets/player"):
-            add_debug("Player assets directory exists")
-            
-            # List files in player directory
-            try:
-                files = os.listdir("assets/player")
-                add_debug(f"Found {len(files)} files in assets/player/")
-                
-                # Look for specific sprite patterns
-                idle_right = [f for f in files if f.startswith("idle_right_")]
-                walking_right = [f for f in files if f.startswith("walking_right_")]
-                idle_left = [f for f in files if f.startswith("idle_left_")]
-                walking_left = [f for f in files if f.startswith("walking_left_")]
-                
-                add_debug(f"Idle right sprites: {len(idle_right)}")
-                add_debug(f"Walking right sprites: {len(walking_right)}")
-                add_debug(f"Idle left sprites: {len(idle_left)}")
-                add_debug(f"Walking left sprites: {len(walking_left)}")
-                
-                # List all files for reference
-                for file in files:
-                    add_debug(f"  Found: {file}")
-            except Exception as e:
-                add_debug(f"Error listing files: {e}")
-        else:
-            add_debug("Player assets directory MISSING")
-    else:
-        add_debug("Assets directory MISSING")
-    
-    # Check for background assets
-    background_assets = [
-        "assetpack sky1.png",
-        "assetpack sky2.png",
-        "assetpack bg1.png",
-        "assetpack bg2.png",
-        "assetpack bg3.png",
-        "assetpack smog large.png",
-    ]
-    
-    # Check in the root directory
-    add_debug("Checking for background assets in root directory...")
-    for asset in background_assets:
-        if os.path.exists(asset):
-            add_debug(f"  Found: {asset}")
-        else:
-            add_debug(f"  Missing: {asset}")
-    
-    # Check in the assets/background directory
-    add_debug("Checking for background assets in assets/background directory...")
-    for asset in background_assets:
-        asset_path = os.path.join("assets", "background", asset)
-        if os.path.exists(asset_path):
-            add_debug(f"  Found: {asset_path}")
-        else:
-            add_debug(f"  Missing: {asset_path}")
+    manifest = load_manifest()
+    add_debug("Asset manifest lists %d files", len(manifest["files"]))
+    
+    # Check each group of required sprites
+    for group, paths in EXPECTED_ASSETS.items():
+        missing = [path for path in paths if not asset_exists(path)]
+        add_debug("%s: %d/%d found", group, len(paths) - len(missing), len(paths))
+        for path in missing:
+            add_debug("  Missing: %s", path, level=WARNING)
+    
+    # Background layers are optional, so only report which ones were found
+    found = 0
+    for asset in BACKGROUND_ASSETS:
+        path = find_asset(os.path.join("assets", "background", asset), asset)
+        if path:
+            found += 1
+            add_debug("  Found: %s", path, level=DEBUG)
+    add_debug("Background layers: %d/%d found", found, len(BACKGROUND_ASSETS))
     
     add_debug("=== END DIAGNOSTICS ===")
 
+class StartupReport:
+    """Records how long each startup phase takes, up to the first presented frame"""
+    
+    def __init__(self, start):
+        self.start = start
+        self.last = start
+        self.phases = []
+    
+    def mark(self, phase):
+        """End the current phase, naming what it did"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+    
+    def print_report(self):
+        """Print the per-phase breakdown"""
+        print("Startup time since main.py started:")
+        elapsed = 0.0
+        for phase, seconds in self.phases:
+            elapsed += seconds
+            print(f"  {phase:<12} {seconds * 1000:8.1f} ms  (at {elapsed * 1000:.1f} ms)")
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Zombie Fighters")
+    parser.add_argument("--telemetry", metavar="FILE",
+                        help="record per-frame gameplay metrics to FILE (see telemetry_analyzer.py)")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print how long each startup phase took once the first frame is shown")
+    parser.add_argument("--surface-report", metavar="FILE",
+                        help="write resident surface memory by subsystem to FILE on exit")
+    parser.add_argument("--horde", type=int, metavar="N",
+                        help="horde mode: every wave has N zombies")
+    return parser.parse_args()
+
 def main():
-    # Initialize pygame
-    pygame.init()
+    args = parse_args()
+    startup = StartupReport(PROCESS_START) if args.startup_report else None
+    if startup:
+        startup.mark("imports")
+    
+    # Initialize only the display; fonts load themselves on first use
+    # and the game has no audio, so the mixer is never started
+    pygame.display.init()
+    if startup:
+        startup.mark("display init")
     
     # Run diagnostics before creating the game window
     run_diagnostics()
+    if startup:
+        startup.mark("diagnostics")
     
     # Create the game window
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Zombie Fighters")
+    if startup:
+        startup.mark("window")
     
     # Only import game_states after pygame display is initialized
     from game_states import GameStateManager
@@ -90,33 +131,74 @@ def main():
     clock = pygame.time.Clock()
     
     # Initialize the game state manager
-    game_manager = GameStateManager()
+    game_manager = GameStateManager(horde=args.horde)
+    if startup:
+        startup.mark("game states")
+    
+    # Optional binary telemetry stream
+    telemetry = None
+    if args.telemetry:
+        from telemetry import TelemetryWriter
+        telemetry = TelemetryWriter(args.telemetry)
+        add_debug("Recording telemetry to %s", args.telemetry)
     
     # Main game loop
     running = True
     while running:
+        frame_start = time.perf_counter()
+        profiler.begin_frame()
+        
         # Handle events
+        profiler.begin("events")
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
             
             # Pass events to game state manager
             game_manager.handle_events(event)
+        profiler.end("events")
         
         # Update current state
+        update_start = time.perf_counter()
         game_manager.update()
+        update_ms = (time.perf_counter() - update_start) * 1000
         
         # Draw current state
         game_manager.draw(screen)
         
         # Update the display
+        profiler.begin("flip")
         pygame.display.flip()
+        profiler.end("flip")
+        profiler.end_frame()
+        surface_memory.end_frame()
+        
+        if startup:
+            startup.mark("first frame")
+            startup.print_report()
+            startup = None
+        
+        # Record this frame's metrics while playing
+        if telemetry and game_manager.current_state == GAMEPLAY:
+            gameplay = game_manager.states[GAMEPLAY]
+            telemetry.record(
+                gameplay.wave, len(gameplay.enemies), len(gameplay.projectiles),
+                gameplay.collisions_tested, gameplay.hits,
+                (time.perf_counter() - frame_start) * 1000, update_ms,
+                gameplay.camera_offset_x
+            )
         
         # Control the frame rate
         clock.tick(FPS)
     
-    # Log game closing
+    # Log game closing and write out any buffered log records
     add_debug("Game closing")
+    if telemetry:
+        telemetry.close()
+    if args.surface_report:
+        surface_memory.write_report(args.surface_report)
+        add_debug("Surface report written to %s", args.surface_report)
+    shutdown_logging()
     
     # Quit pygame
     pygame.quit()
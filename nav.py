@@ -0,0 +1,295 @@
+"""
+Navigation graph and flow fields for enemies
+
+The graph is built once per level. The top of every collision rect is a
+walkable span, split wherever an obstacle blocks enemies, and each span is
+cut into NAV_CELL wide cells. Jump and drop links between spans are found
+by simulating an enemy's jump arc or fall with the same physics as
+Zombie.update, so a link only exists where a zombie really lands.
+
+A flow field holds the next move toward one goal cell for every cell:
+the direction to walk, or the link to take. Fields are computed outward
+from the goal and cached per goal, so each zombie finds its next move
+with a lookup however many of them are chasing the player.
+"""
+import heapq
+import math
+from bisect import bisect_right
+from collections import OrderedDict
+import pygame
+from settings import (
+    GRAVITY, GROUND_LEVEL, ENEMY_TYPES,
+    NAV_CELL, NAV_JUMP_POWER, NAV_JUMP_SPEED, NAV_GROUND_MARGIN, NAV_FIELD_CACHE
+)
+
+# Links are simulated for the standard zombie's hitbox
+AGENT_WIDTH, AGENT_HEIGHT = ENEMY_TYPES["zombie"]["size"]
+
+# Drops start once the widest enemy has walked clear of the edge
+DROP_CLEARANCE = max(spec["size"][0] for spec in ENEMY_TYPES.values()) / 2 + 1
+
+# Flights longer than this count as failed
+MAX_FLIGHT_TICKS = 240
+
+def jump_height(power=NAV_JUMP_POWER):
+    """Highest rise of a jump in pixels, stepped like the game's physics"""
+    rise = 0
+    velocity = power
+    while velocity + GRAVITY < 0:
+        velocity += GRAVITY
+        rise -= velocity
+    return rise
+
+class Span:
+    """Walkable surface at height y between x0 and x1"""
+    __slots__ = ("id", "x0", "x1", "y", "first_cell", "cells")
+
+    def __init__(self, span_id, x0, x1, y, first_cell):
+        self.id = span_id
+        self.x0 = x0
+        self.x1 = x1
+        self.y = y  # Feet of anything standing on the span
+        self.first_cell = first_cell
+        self.cells = max(1, math.ceil((x1 - x0) / NAV_CELL))
+
+    def cell(self, x):
+        """Cell holding world x, clamped to the span"""
+        index = int((x - self.x0) // NAV_CELL)
+        return self.first_cell + min(max(index, 0), self.cells - 1)
+
+class Link:
+    """A jump or drop from one span to another"""
+    __slots__ = ("source", "target", "x", "jump", "direction", "land_x", "ticks")
+
+    def __init__(self, source, target, x, jump, direction, land_x, ticks):
+        self.source = source
+        self.target = target
+        self.x = x  # Center x to jump from, or to walk to before dropping
+        self.jump = jump
+        self.direction = direction  # -1, 0 or 1, horizontal direction of a jump
+        self.land_x = land_x  # Center x on landing
+        self.ticks = ticks  # Ticks in the air
+
+class FlowField:
+    """Next move toward one goal cell for every cell of a graph"""
+
+    def __init__(self, graph, goal, moves):
+        self.graph = graph
+        self.goal = goal
+        self.goal_span = graph.cell_spans[goal]
+        self.moves = moves
+
+    def next_move(self, span, x):
+        """
+        Move for something at center x on span
+
+        Returns:
+            Link, -1 or 1 to walk that way, 0 in the goal cell, or None when
+            the goal can't be reached
+        """
+        if span is None:
+            return None
+        return self.moves[span.cell(x)]
+
+class NavGraph:
+    """Spans, cells and links of one level"""
+
+    def __init__(self, width, collision, obstacles):
+        """
+        Args:
+            width (int): Level width
+            collision (SpatialIndex): Collision rects entities land on
+            obstacles (list): The level's obstacles
+        """
+        self.collision = collision
+        self.blockers = [o for o in obstacles if o.blocks_enemies]
+        self.spans = []
+        self.links = []
+        self.cell_spans = []  # Cell -> span it belongs to
+        self.rows = {}  # Span height -> (right edges, spans) sorted by x
+        self.fields = OrderedDict()  # Goal cell -> FlowField, least recently used first
+
+        surfaces = [(-NAV_GROUND_MARGIN, width + NAV_GROUND_MARGIN, GROUND_LEVEL)]
+        surfaces += [(r.x, r.x + r.width, r.y) for r in collision.items if r.y < GROUND_LEVEL]
+        for x0, x1, y in sorted(surfaces, key=lambda s: (s[2], s[0])):
+            for piece_x0, piece_x1 in self.split_surface(x0, x1, y):
+                span = Span(len(self.spans), piece_x0, piece_x1, y, len(self.cell_spans))
+                self.spans.append(span)
+                self.cell_spans.extend([span] * span.cells)
+                rights, spans = self.rows.setdefault(y, ([], []))
+                rights.append(piece_x1)
+                spans.append(span)
+
+        self.find_links()
+
+        # Reversed edges for the flow fields: cell -> [(previous cell, cost, move)]
+        self.incoming = [[] for _ in self.cell_spans]
+        for span in self.spans:
+            for cell in range(span.first_cell, span.first_cell + span.cells - 1):
+                self.incoming[cell + 1].append((cell, NAV_CELL, 1))
+                self.incoming[cell].append((cell + 1, NAV_CELL, -1))
+        for link in self.links:
+            cost = link.ticks * NAV_JUMP_SPEED + NAV_CELL
+            self.incoming[link.target.cell(link.land_x)].append((link.source.cell(link.x), cost, link))
+
+    def split_surface(self, x0, x1, y):
+        """Cut a surface wherever an obstacle stands in the way of anything walking on it"""
+        pieces = []
+        for o in sorted(self.blockers, key=lambda o: o.x):
+            if o.x < x1 and o.x + o.width > x0 and o.y < y and o.y + o.height > y - AGENT_HEIGHT:
+                if o.x > x0:
+                    pieces.append((x0, o.x))
+                x0 = max(x0, o.x + o.width)
+        if x1 > x0:
+            pieces.append((x0, x1))
+        return pieces
+
+    def locate(self, x, y, half_width=0, hint=None):
+        """
+        Span under something with center x and feet at y
+
+        Like the landing checks, anything overlapping a span stands on it.
+
+        Args:
+            half_width (float): Half the width of what is standing there
+            hint (Span): Span it stood on last time, checked first
+
+        Returns:
+            Span: The span, or None if it isn't standing on one
+        """
+        if hint is not None and hint.y == y and hint.x0 - half_width < x < hint.x1 + half_width:
+            return hint
+        row = self.rows.get(y)
+        if row is None:
+            return None
+        rights, spans = row
+        i = bisect_right(rights, x - half_width)
+        if i < len(spans) and spans[i].x0 - half_width < x:
+            return spans[i]
+        return None
+
+    def fly(self, x, y, velocity_y, direction):
+        """
+        Simulate a zombie in the air from center x and feet y
+
+        Returns:
+            tuple: (span, center x, ticks) where it lands, or None if it hits
+            a blocking obstacle or never lands
+        """
+        left = x - AGENT_WIDTH / 2
+        top = y - AGENT_HEIGHT
+        for tick in range(1, MAX_FLIGHT_TICKS + 1):
+            left += direction * NAV_JUMP_SPEED
+            velocity_y += GRAVITY
+            top += velocity_y
+
+            landed = False
+            for rect in self.collision.query(left, left + AGENT_WIDTH):
+                if velocity_y > 0 and rect.check_collision(left, top, AGENT_WIDTH, AGENT_HEIGHT):
+                    top = rect.y - AGENT_HEIGHT
+                    velocity_y = 0
+                    landed = True
+            if top >= GROUND_LEVEL - AGENT_HEIGHT:
+                top = GROUND_LEVEL - AGENT_HEIGHT
+                landed = True
+
+            for o in self.blockers:
+                if o.check_collision(left, top, AGENT_WIDTH, AGENT_HEIGHT):
+                    return None
+            if landed:
+                span = self.locate(left + AGENT_WIDTH / 2, top + AGENT_HEIGHT, AGENT_WIDTH / 2)
+                return (span, left + AGENT_WIDTH / 2, tick) if span is not None else None
+        return None
+
+    def find_links(self):
+        """Simulate jumps and drops from every span and keep those landing on another span"""
+        rise = jump_height()
+        airtime = 2 * math.ceil(-NAV_JUMP_POWER / GRAVITY)
+        reach = airtime * NAV_JUMP_SPEED
+
+        best = {}  # (source cell, target cell) -> Link
+        def add(link):
+            key = (link.source.cell(link.x), link.target.cell(link.land_x))
+            if key not in best or link.ticks < best[key].ticks:
+                best[key] = link
+
+        for span in self.spans:
+            lo = span.x0 + AGENT_WIDTH / 2  # Centers that stand fully on the span
+            hi = max(span.x1 - AGENT_WIDTH / 2, lo)
+
+            # Jump from both ends, and from every cell something can be reached from
+            takeoffs = {lo, hi}
+            for rect in self.collision.query(span.x0 - reach, span.x1 + reach):
+                if span.y - rise - AGENT_HEIGHT - rect.height < rect.y < span.y:
+                    for cell in range(span.cells):
+                        x = min(max(span.x0 + (cell + 0.5) * NAV_CELL, lo), hi)
+                        if rect.x - reach < x < rect.x + rect.width + reach:
+                            takeoffs.add(x)
+            for x in sorted(takeoffs):
+                for direction in (-1, 0, 1):
+                    landing = self.fly(x, span.y, NAV_JUMP_POWER, direction)
+                    if landing is not None and landing[0] is not span:
+                        add(Link(span, landing[0], x, True, direction, landing[1], landing[2]))
+
+            # Walk off either end and fall
+            for x in (span.x0 - DROP_CLEARANCE, span.x1 + DROP_CLEARANCE):
+                landing = self.fly(x, span.y, 0, 0)
+                if landing is not None and landing[0] is not span:
+                    add(Link(span, landing[0], x, False, 0, landing[1], landing[2]))
+
+        self.links = sorted(best.values(), key=lambda l: (l.source.id, l.x, l.target.id))
+
+    def flow_field(self, goal):
+        """
+        Flow field toward a goal cell, computed on first use and cached
+
+        Returns:
+            FlowField: Next move from every cell
+        """
+        field = self.fields.get(goal)
+        if field is not None:
+            self.fields.move_to_end(goal)
+            return field
+
+        # Dijkstra outward from the goal along reversed edges
+        distance = [math.inf] * len(self.cell_spans)
+        moves = [None] * len(self.cell_spans)
+        distance[goal] = 0
+        moves[goal] = 0
+        queue = [(0, goal)]
+        incoming = self.incoming
+        while queue:
+            d, cell = heapq.heappop(queue)
+            if d > distance[cell]:
+                continue
+            for previous, cost, move in incoming[cell]:
+                if d + cost < distance[previous]:
+                    distance[previous] = d + cost
+                    moves[previous] = move
+                    heapq.heappush(queue, (d + cost, previous))
+
+        field = self.fields[goal] = FlowField(self, goal, moves)
+        if len(self.fields) > NAV_FIELD_CACHE:
+            self.fields.popitem(last=False)
+        return field
+
+    def field_toward(self, x, y, half_width=0):
+        """Flow field toward something with center x and feet at y, or None if it isn't on a span"""
+        span = self.locate(x, y, half_width)
+        if span is None:
+            return None
+        return self.flow_field(span.cell(x))
+
+    def draw_debug(self, screen, camera_offset_x):
+        """Draw spans, cell boundaries and links"""
+        for span in self.spans:
+            x0 = max(span.x0 - camera_offset_x, -1)
+            x1 = min(span.x1 - camera_offset_x, screen.get_width() + 1)
+            if x0 < x1:
+                pygame.draw.line(screen, (0, 255, 255), (x0, span.y - 2), (x1, span.y - 2), 2)
+        for link in self.links:
+            color = (255, 255, 0) if link.jump else (255, 128, 0)
+            start = (link.x - camera_offset_x, link.source.y - 2)
+            end = (link.land_x - camera_offset_x, link.target.y - 2)
+            if max(start[0], end[0]) > 0 and min(start[0], end[0]) < screen.get_width():
+                pygame.draw.line(screen, color, start, end, 1)
@@ -0,0 +1,216 @@
+"""
+Network client for net_server.py
+
+Sends keyboard and mouse input to the server every frame and draws the
+latest snapshot it received. Start the server first, then one client per
+player.
+
+Run with: python net_client.py [--host HOST] [--port PORT] [--level N]
+The level must match the one the server is running.
+"""
+import sys
+import socket
+import argparse
+from collections import OrderedDict
+import pygame
+from settings import WIDTH, HEIGHT, FPS, GROUND_LEVEL, NET_PORT, NET_HISTORY
+from debug import add_debug
+from level_data import load_level
+from level_streaming import LevelStreamer
+from player import Player
+from enemy import Zombie
+from enemy_types import enemy_type_by_id
+from projectile import Projectile
+from weapons import WEAPON_LIST
+from ui import draw_gameplay_ui
+from animation import animation_clock
+from net_protocol import (
+    MSG_SNAPSHOT, BUTTON_LEFT, BUTTON_RIGHT, BUTTON_JUMP, BUTTON_SHOOT, BUTTON_WEAPON_SHIFT,
+    KIND_PLAYER, KIND_ZOMBIE, KIND_PROJECTILE, FLAG_FACING_RIGHT, FLAG_HIT,
+    FLAG_MOVING, FLAG_ATTACKING, FLAG_IDLE, MSG_DISCONNECT, DISCONNECT,
+    make_key, key_kind, dequantize, encode_input, decode_snapshot
+)
+
+class NetClient:
+    """Connection to the server and the entities drawn from its snapshots"""
+
+    def __init__(self, host, port, level=1):
+        self.server = (host, port)
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+
+        self.level_data = load_level(level)
+        self.streamer = LevelStreamer(self.level_data)
+
+        # Decoded snapshots by tick, kept as delta baselines
+        self.views = OrderedDict()
+        self.latest = None  # (tick, player id, camera offset, score, wave, view)
+        self.seq = 0
+        self.jump_pressed = False
+        self.shoot_pressed = False
+        self.weapon_index = 0
+
+        # Entities used for drawing, by key
+        self.players = {}
+        self.zombies = {}
+        self.zombie_pool = []
+        self.projectile = Projectile(0, 0, 0, 0)
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+            self.jump_pressed = True
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self.shoot_pressed = True
+        elif event.type == pygame.KEYDOWN and pygame.K_1 <= event.key < pygame.K_1 + len(WEAPON_LIST):
+            self.weapon_index = event.key - pygame.K_1
+
+    def send_input(self):
+        keys = pygame.key.get_pressed()
+        # A click shorter than a frame still counts as holding the trigger for one
+        trigger = self.shoot_pressed or pygame.mouse.get_pressed()[0]
+        buttons = ((keys[pygame.K_a] and BUTTON_LEFT) | (keys[pygame.K_d] and BUTTON_RIGHT) |
+                   (self.jump_pressed and BUTTON_JUMP) | (trigger and BUTTON_SHOOT) |
+                   (self.weapon_index << BUTTON_WEAPON_SHIFT))
+        aim_x, aim_y = pygame.mouse.get_pos()
+        self.seq += 1
+        ack = self.latest[0] if self.latest else 0
+        try:
+            self.socket.sendto(encode_input(self.seq, ack, buttons, aim_x, aim_y), self.server)
+        except OSError as e:
+            add_debug("Send to server failed: %s", e)
+        self.jump_pressed = self.shoot_pressed = False
+
+    def receive(self):
+        """Decode every waiting snapshot, keeping the newest"""
+        while True:
+            try:
+                data, _ = self.socket.recvfrom(4096)
+            except (BlockingIOError, InterruptedError):
+                return
+            except ConnectionResetError:
+                # Server not running (yet)
+                return
+            if not data or data[0] != MSG_SNAPSHOT:
+                continue
+
+            snapshot = decode_snapshot(data, self.views)
+            if snapshot is None:
+                continue  # Baseline already dropped, the server will send a newer one
+            tick = snapshot[0]
+            self.views[tick] = snapshot[5]
+            while len(self.views) > NET_HISTORY:
+                self.views.popitem(last=False)
+            if self.latest is None or tick > self.latest[0]:
+                self.latest = snapshot
+
+    def sync_entities(self, view, camera_offset_x):
+        """Create, update and retire the entities drawn for a snapshot"""
+        seen = set()
+        for key, values in view.items():
+            kind = key_kind(key)
+            if kind == KIND_PLAYER:
+                player = self.players.get(key)
+                if player is None:
+                    player = self.players[key] = Player(0, GROUND_LEVEL - 60)
+                x, y, player.health, flags = values
+                # Player.draw works in screen coordinates, against this client's camera
+                player.camera_offset_x = camera_offset_x
+                player.x = dequantize(x) - camera_offset_x
+                player.y = dequantize(y)
+                player.facing_right = bool(flags & FLAG_FACING_RIGHT)
+                player.is_hit = bool(flags & FLAG_HIT)
+                player.set_animation("walking" if flags & FLAG_MOVING else "idle")
+            elif kind == KIND_ZOMBIE:
+                zombie = self.zombies.get(key)
+                if zombie is None:
+                    zombie = self.zombies[key] = self.zombie_pool.pop() if self.zombie_pool else Zombie(0, 0)
+                x, y, zombie.health, flags, type_id = values
+                zombie.type = enemy_type_by_id(type_id)
+                zombie.x = dequantize(x)
+                zombie.y = dequantize(y)
+                zombie.facing_right = bool(flags & FLAG_FACING_RIGHT)
+                zombie.is_hit = bool(flags & FLAG_HIT)
+                zombie.is_attacking = bool(flags & FLAG_ATTACKING)
+                zombie.set_animation("attack" if zombie.is_attacking else
+                                     "idle" if flags & FLAG_IDLE else "run")
+            seen.add(key)
+
+        for key in [k for k in self.zombies if k not in seen]:
+            self.zombie_pool.append(self.zombies.pop(key))
+        for key in [k for k in self.players if k not in seen]:
+            del self.players[key]
+
+    def draw(self, screen):
+        from level import draw_level_background
+
+        if self.latest is None:
+            screen.fill((0, 0, 0))
+            return
+        _, player_id, camera_offset_x, score, wave, view = self.latest
+        # The server doesn't send animation frames, they are timed by local frames
+        animation_clock.advance()
+        self.sync_entities(view, camera_offset_x)
+
+        draw_level_background(screen, camera_offset_x, ground=not self.level_data.tiles)
+        self.streamer.update(camera_offset_x)
+        self.streamer.draw(screen, camera_offset_x)
+
+        for player in self.players.values():
+            player.draw(screen)
+
+        for zombie in self.zombies.values():
+            zombie.draw(screen, camera_offset_x)
+
+        for key, values in view.items():
+            if key_kind(key) == KIND_PROJECTILE:
+                self.projectile.x = dequantize(values[0])
+                self.projectile.y = dequantize(values[1])
+                self.projectile.draw(screen, camera_offset_x)
+
+        me = self.players.get(make_key(KIND_PLAYER, player_id))
+        if me is not None:
+            me.weapon = WEAPON_LIST[self.weapon_index]
+            draw_gameplay_ui(screen, me, score, wave)
+
+    def close(self):
+        try:
+            self.socket.sendto(DISCONNECT.pack(MSG_DISCONNECT), self.server)
+        except OSError:
+            pass
+        self.socket.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Join a Zombie Fighters server")
+    parser.add_argument("--host", default="127.0.0.1", help="server address")
+    parser.add_argument("--port", type=int, default=NET_PORT, help="server UDP port")
+    parser.add_argument("--level", type=int, default=1, help="level the server is running")
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Zombie Fighters (online)")
+    clock = pygame.time.Clock()
+
+    from level import initialize_level_graphics
+    initialize_level_graphics()
+
+    client = NetClient(args.host, args.port, args.level)
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+            client.handle_event(event)
+
+        client.send_input()
+        client.receive()
+        client.draw(screen)
+        pygame.display.flip()
+        clock.tick(FPS)
+
+    client.close()
+    pygame.quit()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Network protocol shared by net_server.py and net_client.py
+
+Clients send one INPUT packet per tick over UDP. Each one carries the
+client's buttons and aim, and the last snapshot tick it received.
+
+The server replies with SNAPSHOT packets holding the entities near that
+client's camera. A snapshot is a delta against the last snapshot the
+client acked (its baseline):
+
+    header    type, tick, baseline tick (0 for a full snapshot), the
+              client's player id, camera offset, score, wave, counts
+    removed   keys of entities in the baseline that are gone or out of view
+    entities  key, mask of changed fields, then only the changed fields
+
+Positions are quantized to 1/POSITION_SCALE of a pixel.
+"""
+import struct
+
+PROTOCOL_VERSION = 3
+
+# Packet types
+MSG_INPUT = 1
+MSG_SNAPSHOT = 2
+MSG_DISCONNECT = 3
+
+# type, version, input sequence, acked snapshot tick, buttons, aim x, aim y
+INPUT = struct.Struct("<BBIIBhh")
+# type, tick, baseline tick, player id, camera offset, score, wave, removed count, entity count
+SNAPSHOT_HEADER = struct.Struct("<BIIHiIHHH")
+DISCONNECT = struct.Struct("<B")
+KEY = struct.Struct("<HB")
+
+# Input buttons
+BUTTON_LEFT = 1
+BUTTON_RIGHT = 2
+BUTTON_JUMP = 4
+BUTTON_SHOOT = 8  # Set while the trigger is held
+BUTTON_WEAPON_SHIFT = 4  # Bits above the buttons hold the selected weapon
+
+# Entity kinds, stored in the top two bits of an entity key
+KIND_PLAYER = 0
+KIND_ZOMBIE = 1
+KIND_PROJECTILE = 2
+KIND_SHIFT = 14
+ID_MASK = (1 << KIND_SHIFT) - 1
+
+# Fields sent for each kind, in wire order
+KIND_FIELDS = {
+    KIND_PLAYER: (("x", "i"), ("y", "h"), ("health", "h"), ("flags", "B")),
+    KIND_ZOMBIE: (("x", "i"), ("y", "h"), ("health", "h"), ("flags", "B"), ("type", "B")),
+    KIND_PROJECTILE: (("x", "i"), ("y", "h")),
+}
+KIND_STRUCTS = {
+    kind: [struct.Struct("<" + code) for _, code in fields]
+    for kind, fields in KIND_FIELDS.items()
+}
+
+# Entity flags
+FLAG_FACING_RIGHT = 1
+FLAG_HIT = 2
+FLAG_MOVING = 4  # Player walking
+FLAG_ATTACKING = 4  # Zombie attacking
+FLAG_IDLE = 8  # Zombie showing its idle animation
+
+POSITION_SCALE = 4
+
+def make_key(kind, entity_id):
+    return (kind << KIND_SHIFT) | (entity_id & ID_MASK)
+
+def key_kind(key):
+    return key >> KIND_SHIFT
+
+def quantize(value):
+    return int(round(value * POSITION_SCALE))
+
+def dequantize(value):
+    return value / POSITION_SCALE
+
+def encode_input(seq, ack, buttons, aim_x, aim_y):
+    return INPUT.pack(MSG_INPUT, PROTOCOL_VERSION, seq, ack, buttons, aim_x, aim_y)
+
+def decode_input(data):
+    """Return (seq, ack, buttons, aim_x, aim_y), or None for a bad packet"""
+    if len(data) != INPUT.size:
+        return None
+    _, version, seq, ack, buttons, aim_x, aim_y = INPUT.unpack(data)
+    if version != PROTOCOL_VERSION:
+        return None
+    return seq, ack, buttons, aim_x, aim_y
+
+def encode_snapshot(tick, baseline_tick, player_id, camera_x, score, wave, view, baseline):
+    """
+    Delta-encode a client's view of the world against its baseline view
+
+    Args:
+        view (dict): {key: tuple of quantized field values} visible this tick
+        baseline (dict): The view the client last acked, empty for a full snapshot
+
+    Returns:
+        bytes: The SNAPSHOT packet
+    """
+    removed = [key for key in baseline if key not in view]
+    parts = []
+    count = 0
+    for key, values in view.items():
+        old = baseline.get(key)
+        if old == values:
+            continue
+        structs = KIND_STRUCTS[key_kind(key)]
+        mask = 0
+        fields = []
+        for i, value in enumerate(values):
+            if old is None or old[i] != value:
+                mask |= 1 << i
+                fields.append(structs[i].pack(value))
+        parts.append(KEY.pack(key, mask))
+        parts.extend(fields)
+        count += 1
+
+    header = SNAPSHOT_HEADER.pack(MSG_SNAPSHOT, tick, baseline_tick, player_id, quantize(camera_x),
+                                  score, wave, len(removed), count)
+    return header + struct.pack(f"<{len(removed)}H", *removed) + b"".join(parts)
+
+def decode_snapshot(data, baselines):
+    """
+    Rebuild a full view from a SNAPSHOT packet
+
+    Args:
+        baselines (dict): {tick: view} of snapshots already decoded
+
+    Returns:
+        tuple: (tick, player_id, camera_x, score, wave, view), or None when
+            the packet's baseline is no longer held
+    """
+    (_, tick, baseline_tick, player_id, camera_x, score, wave,
+     n_removed, n_entities) = SNAPSHOT_HEADER.unpack_from(data)
+    if baseline_tick:
+        if baseline_tick not in baselines:
+            return None
+        view = dict(baselines[baseline_tick])
+    else:
+        view = {}
+
+    offset = SNAPSHOT_HEADER.size
+    for key in struct.unpack_from(f"<{n_removed}H", data, offset):
+        view.pop(key, None)
+    offset += 2 * n_removed
+
+    for _ in range(n_entities):
+        key, mask = KEY.unpack_from(data, offset)
+        offset += KEY.size
+        structs = KIND_STRUCTS[key_kind(key)]
+        values = list(view.get(key, (0,) * len(structs)))
+        for i, field in enumerate(structs):
+            if mask & (1 << i):
+                values[i] = field.unpack_from(data, offset)[0]
+                offset += field.size
+        view[key] = tuple(values)
+
+    return tick, player_id, dequantize(camera_x), score, wave, view
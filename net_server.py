@@ -0,0 +1,302 @@
+"""
+Headless authoritative game server
+
+Owns the simulation for every connected player: one GameplayState with a
+player and camera per client, stepped the same way as a single player game.
+Clients (net_client.py) send their input each tick and get back
+delta-compressed snapshots of the entities near their own camera.
+
+Run with: python net_server.py [--host HOST] [--port PORT] [--level N] [--horde N]
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import sys
+import time
+import socket
+import argparse
+from collections import OrderedDict
+import pygame
+from settings import (
+    WIDTH, FPS, VICTORY, NET_PORT, NET_MAX_PLAYERS,
+    NET_SNAPSHOT_INTERVAL, NET_VIEW_MARGIN, NET_MAX_VIEW_ENTITIES, NET_HISTORY, NET_TIMEOUT
+)
+from debug import add_debug
+from game_states import GameplayState
+from headless import HeadlessManager
+from net_protocol import (
+    MSG_INPUT, MSG_DISCONNECT, BUTTON_LEFT, BUTTON_RIGHT, BUTTON_JUMP, BUTTON_SHOOT, BUTTON_WEAPON_SHIFT,
+    KIND_PLAYER, KIND_ZOMBIE, KIND_PROJECTILE, FLAG_FACING_RIGHT, FLAG_HIT, FLAG_MOVING,
+    FLAG_ATTACKING, FLAG_IDLE, make_key, quantize, decode_input, encode_snapshot
+)
+
+class RemotePlayer:
+    """A connected client and the player it controls"""
+
+    def __init__(self, player_id, address, player):
+        self.player_id = player_id
+        self.address = address
+        self.player = player  # Player in the server's GameplayState
+
+        # Latest input
+        self.input_seq = 0
+        self.buttons = 0
+        self.aim = (0, 0)
+        self.jump_pressed = False
+        self.shoot_pressed = False  # Trigger held in any input this tick
+        self.last_heard = time.monotonic()
+
+        # Views sent to this client that it may use as a delta baseline
+        self.acked_tick = 0
+        self.sent_views = OrderedDict()
+
+    @property
+    def camera_offset_x(self):
+        return self.player.camera_offset_x
+
+    @property
+    def world_x(self):
+        return self.player.world_x
+
+    @property
+    def alive(self):
+        return self.player.health > 0
+
+class GameServer:
+    """Runs the shared simulation and talks to the clients over UDP"""
+
+    def __init__(self, host, port, level=1, horde=None):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.socket.setblocking(False)
+        self.address = self.socket.getsockname()
+
+        self.level = level
+        self.clients = {}  # Address -> RemotePlayer
+        self.next_player_id = 1
+        self.next_entity_id = 1
+        self.tick = 0  # Keeps counting across restarts, so acks stay in order
+
+        # The simulation, with a player added for each client that joins
+        self.manager = HeadlessManager()
+        self.state = GameplayState(self.manager, level, history=False, horde=horde, effects=False, players=0)
+
+    def reset(self):
+        """Start the level over for everyone connected"""
+        self.manager.outcome = None
+        self.state.reset()
+
+    def new_entity_id(self):
+        entity_id = self.next_entity_id
+        self.next_entity_id += 1
+        return entity_id
+
+    def receive(self):
+        """Read every waiting packet"""
+        while True:
+            try:
+                data, address = self.socket.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except ConnectionResetError:
+                # Windows reports an earlier send to a closed client here
+                continue
+            if not data:
+                continue
+
+            if data[0] == MSG_DISCONNECT:
+                self.drop_client(address, "disconnected")
+                continue
+            if data[0] != MSG_INPUT:
+                continue
+            decoded = decode_input(data)
+            if decoded is None:
+                continue
+
+            client = self.clients.get(address)
+            if client is None:
+                if len(self.clients) >= NET_MAX_PLAYERS:
+                    continue
+                client = RemotePlayer(self.next_player_id, address, self.state.add_player())
+                self.next_player_id += 1
+                self.clients[address] = client
+                add_debug("Player %d joined from %s:%d", client.player_id, *address)
+
+            seq, ack, buttons, aim_x, aim_y = decoded
+            client.last_heard = time.monotonic()
+            client.acked_tick = max(client.acked_tick, ack)
+            if seq <= client.input_seq:
+                continue  # Late or duplicate packet
+            client.input_seq = seq
+            client.buttons = buttons
+            client.aim = (aim_x, aim_y)
+            # Presses are held until the next tick uses them
+            client.jump_pressed |= bool(buttons & BUTTON_JUMP)
+            client.shoot_pressed |= bool(buttons & BUTTON_SHOOT)
+
+    def drop_client(self, address, reason):
+        client = self.clients.pop(address, None)
+        if client:
+            self.state.remove_player(client.player)
+            add_debug("Player %d %s", client.player_id, reason)
+
+    def drop_idle_clients(self):
+        now = time.monotonic()
+        for address, client in list(self.clients.items()):
+            if now - client.last_heard > NET_TIMEOUT:
+                self.drop_client(address, "timed out")
+
+    def apply_input(self, client):
+        """Set a client's player up for the tick from its latest input, as GameplayState.handle_events does"""
+        state = self.state
+        player = client.player
+        player.moving_left = bool(client.buttons & BUTTON_LEFT)
+        player.moving_right = bool(client.buttons & BUTTON_RIGHT)
+        if client.jump_pressed:
+            player.jump()
+        weapon_index = client.buttons >> BUTTON_WEAPON_SHIFT
+        if weapon_index < len(state.tuning.weapons):
+            player.select_weapon(state.tuning.weapons[weapon_index])
+
+        # A new pull fires now; GameplayState keeps firing a held trigger
+        player.aim_target = client.aim
+        if client.shoot_pressed and not player.trigger_held:
+            if player.shoot(client.aim, player.camera_offset_x, state.projectiles):
+                state.muzzle_flash(player)
+        player.trigger_held = client.shoot_pressed
+        client.jump_pressed = client.shoot_pressed = False
+
+    def step(self):
+        """Advance the simulation by one tick"""
+        self.tick += 1
+        state = self.state
+        live = [c for c in self.clients.values() if c.alive]
+        if not live:
+            add_debug("All players down, restarting")
+            self.reset()
+            return
+
+        for client in live:
+            self.apply_input(client)
+        state.update()
+
+        # Entities are told apart on the wire by ids handed out as they appear
+        for enemy in state.spawned:
+            enemy.net_id = self.new_entity_id()
+        for projectile in state.projectiles:
+            if getattr(projectile, "net_id", None) is None:
+                projectile.net_id = self.new_entity_id()
+
+        if self.manager.outcome == VICTORY:
+            add_debug("Victory! Score: %d, restarting", state.score)
+            self.reset()
+
+    def build_view(self, client):
+        """
+        Quantized state of everything near a client's camera
+
+        Returns:
+            dict: {entity key: tuple of field values}
+        """
+        x0 = client.camera_offset_x - NET_VIEW_MARGIN
+        x1 = client.camera_offset_x + WIDTH + NET_VIEW_MARGIN
+
+        view = {}
+        for other in self.clients.values():
+            p = other.player
+            flags = ((p.facing_right and FLAG_FACING_RIGHT) | (p.is_hit and FLAG_HIT) |
+                     (p.animation_state == "walking" and FLAG_MOVING))
+            view[make_key(KIND_PLAYER, other.player_id)] = (
+                quantize(other.world_x), quantize(p.y), max(p.health, 0), flags)
+
+        # Interest management: only what is near this client's screen, closest first if there is too much
+        nearby = ([(KIND_ZOMBIE, e) for e in self.state.enemies if x0 < e.x < x1] +
+                  [(KIND_PROJECTILE, p) for p in self.state.projectiles if x0 < p.x < x1])
+        budget = NET_MAX_VIEW_ENTITIES - len(view)
+        if len(nearby) > budget:
+            center = client.world_x
+            nearby.sort(key=lambda item: abs(item[1].x - center))
+            del nearby[budget:]
+
+        for kind, entity in nearby:
+            if kind == KIND_PROJECTILE:
+                view[make_key(KIND_PROJECTILE, entity.net_id)] = (quantize(entity.x), quantize(entity.y))
+            else:
+                flags = ((entity.facing_right and FLAG_FACING_RIGHT) | (entity.is_hit and FLAG_HIT) |
+                         (entity.is_attacking and FLAG_ATTACKING) |
+                         (entity.animation_state == "idle" and FLAG_IDLE))
+                view[make_key(KIND_ZOMBIE, entity.net_id)] = (
+                    quantize(entity.x), quantize(entity.y), entity.health, flags, entity.type.type_id)
+        return view
+
+    def send_snapshots(self):
+        for client in list(self.clients.values()):
+            view = self.build_view(client)
+
+            # Delta against the newest snapshot the client has acked, or send everything
+            baseline = client.sent_views.get(client.acked_tick)
+            baseline_tick = client.acked_tick if baseline is not None else 0
+            packet = encode_snapshot(self.tick, baseline_tick, client.player_id, client.camera_offset_x,
+                                     self.state.score, self.state.wave, view, baseline or {})
+
+            # Views older than the ack can no longer be a baseline
+            client.sent_views[self.tick] = view
+            while client.sent_views and (next(iter(client.sent_views)) < client.acked_tick or
+                                         len(client.sent_views) > NET_HISTORY):
+                client.sent_views.popitem(last=False)
+
+            try:
+                self.socket.sendto(packet, client.address)
+            except OSError as e:
+                add_debug("Send to player %d failed: %s", client.player_id, e)
+
+    def run(self, ticks=None):
+        """Run the fixed-rate server loop, forever or for a number of ticks"""
+        add_debug("Server listening on %s:%d (level %d)", *self.address, self.level)
+        tick_length = 1.0 / FPS
+        next_tick = time.perf_counter()
+        elapsed = 0
+        while ticks is None or elapsed < ticks:
+            elapsed += 1
+            self.receive()
+            self.drop_idle_clients()
+            if self.clients:
+                self.step()
+                if self.tick % NET_SNAPSHOT_INTERVAL == 0:
+                    self.send_snapshots()
+
+            next_tick += tick_length
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()  # Fell behind, don't try to catch up
+
+    def close(self):
+        self.socket.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a headless Zombie Fighters server")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=NET_PORT, help="UDP port to listen on")
+    parser.add_argument("--level", type=int, default=1, help="level to play")
+    parser.add_argument("--horde", type=int, metavar="N", help="horde mode: every wave has N zombies")
+    parser.add_argument("--ticks", type=int, help="stop after this many ticks")
+    args = parser.parse_args()
+
+    # Sprites and levels are loaded as display surfaces, so headless still needs a (dummy) display
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+
+    server = GameServer(args.host, args.port, args.level, args.horde)
+    try:
+        server.run(args.ticks)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        pygame.quit()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
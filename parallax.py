@@ -5,6 +5,8 @@ import pygame
 import os
 from settings import WIDTH, HEIGHT
 from debug import add_debug
+from assets import find_asset
+from surface_memory import surface_memory
 
 class ParallaxLayer:
     """A single layer in the parallax background system"""
@@ -51,13 +53,15 @@ class ParallaxLayer:
             self.height = self.original_image.get_height()
             
             # Create the image for rendering
+            surface_memory.track(self.original_image, "parallax")
             self.image = self.original_image
             
             # If image is smaller than screen width, create a wider image by repeating
             if self.width < WIDTH * 2:
                 # Create a surface wide enough to cover screen with scrolling
                 repeats = (WIDTH * 2) // self.width + 1
-                self.image = pygame.Surface((self.width * repeats, self.height), pygame.SRCALPHA)
+                self.image = surface_memory.track(
+                    pygame.Surface((self.width * repeats, self.height), pygame.SRCALPHA), "parallax")
                 
                 # Fill with repeated copies of the original image
                 for i in range(repeats):
@@ -73,7 +77,7 @@ class ParallaxLayer:
         except pygame.error as e:
             add_debug(f"Error loading parallax image '{self.image_path}': {e}")
             # Create a placeholder surface
-            self.image = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+            self.image = surface_memory.track(pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA), "parallax")
             self.width = WIDTH
             self.height = HEIGHT
             return False
@@ -196,53 +200,29 @@ def create_parallax_background():
     close_city_y = 100
     smog_y = 120
     
-    # Check which assets exist and add them - ORDER MATTERS (back to front)
-    
-    # Sky (slowest moving - farthest back)
-    if os.path.exists(asset_paths['sky1']):
-        add_debug(f"Found {asset_paths['sky1']}")
-        parallax.add_layer(asset_paths['sky1'], scale=1.0, scroll_speed=0.0, y_position=sky_y)
-    elif os.path.exists(alt_paths['sky1']):
-        add_debug(f"Found {alt_paths['sky1']} in root")
-        parallax.add_layer(alt_paths['sky1'], scale=1.0, scroll_speed=0.0, y_position=sky_y)
-    elif os.path.exists(asset_paths['sky2']):
-        add_debug(f"Found {asset_paths['sky2']}")
-        parallax.add_layer(asset_paths['sky2'], scale=1.0, scroll_speed=0.0, y_position=sky_y)
-    elif os.path.exists(alt_paths['sky2']):
-        add_debug(f"Found {alt_paths['sky2']} in root")
-        parallax.add_layer(alt_paths['sky2'], scale=1.0, scroll_speed=0.0, y_position=sky_y)
+    # Look each layer up in the asset manifest - ORDER MATTERS (back to front)
+    
+    # Sky (slowest moving - farthest back), falling back to the second sky
+    sky_path = find_asset(asset_paths['sky1'], alt_paths['sky1'],
+                          asset_paths['sky2'], alt_paths['sky2'])
+    if sky_path:
+        add_debug(f"Found {sky_path}")
+        parallax.add_layer(sky_path, scale=1.0, scroll_speed=0.0, y_position=sky_y)
     else:
         add_debug("No sky background found")
     
-    # Background city silhouettes (ordered from back to front)
-    if os.path.exists(asset_paths['bg3']):
-        add_debug(f"Found {asset_paths['bg3']}")
-        parallax.add_layer(asset_paths['bg3'], scale=1.0, scroll_speed=0.15, y_position=far_city_y)
-    elif os.path.exists(alt_paths['bg3']):
-        add_debug(f"Found {alt_paths['bg3']} in root")
-        parallax.add_layer(alt_paths['bg3'], scale=1.0, scroll_speed=0.15, y_position=far_city_y)
-    
-    if os.path.exists(asset_paths['bg2']):
-        add_debug(f"Found {asset_paths['bg2']}")
-        parallax.add_layer(asset_paths['bg2'], scale=1.0, scroll_speed=0.3, y_position=mid_city_y)
-    elif os.path.exists(alt_paths['bg2']):
-        add_debug(f"Found {alt_paths['bg2']} in root")
-        parallax.add_layer(alt_paths['bg2'], scale=1.0, scroll_speed=0.3, y_position=mid_city_y)
-    
-    if os.path.exists(asset_paths['bg1']):
-        add_debug(f"Found {asset_paths['bg1']}")
-        parallax.add_layer(asset_paths['bg1'], scale=1.0, scroll_speed=0.5, y_position=close_city_y)
-    elif os.path.exists(alt_paths['bg1']):
-        add_debug(f"Found {alt_paths['bg1']} in root")
-        parallax.add_layer(alt_paths['bg1'], scale=1.0, scroll_speed=0.5, y_position=close_city_y)
-    
-    # Atmospheric effects (smog, fog, etc.)
-    if os.path.exists(asset_paths['smog']):
-        add_debug(f"Found {asset_paths['smog']}")
-        parallax.add_layer(asset_paths['smog'], scale=1.0, scroll_speed=0.7, y_position=smog_y)
-    elif os.path.exists(alt_paths['smog']):
-        add_debug(f"Found {alt_paths['smog']} in root")
-        parallax.add_layer(alt_paths['smog'], scale=1.0, scroll_speed=0.7, y_position=smog_y)
+    # Background city silhouettes (ordered from back to front),
+    # then atmospheric effects (smog, fog, etc.)
+    for name, scroll_speed, y_position in [
+        ('bg3', 0.15, far_city_y),
+        ('bg2', 0.3, mid_city_y),
+        ('bg1', 0.5, close_city_y),
+        ('smog', 0.7, smog_y),
+    ]:
+        path = find_asset(asset_paths[name], alt_paths[name])
+        if path:
+            add_debug(f"Found {path}")
+            parallax.add_layer(path, scale=1.0, scroll_speed=scroll_speed, y_position=y_position)
     
     add_debug(f"Added {len(parallax.layers)} parallax layers")
     
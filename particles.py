@@ -0,0 +1,158 @@
+"""
+Particle effects stored in fixed-size NumPy arrays
+
+Muzzle flashes, hit sparks, blood and death bursts are kept as columns of
+preallocated arrays holding at most PARTICLE_BUDGET particles. Emitting
+writes a batch of particles at a ring cursor, so once the budget is full
+each new particle takes the slot of the oldest one and effects can never
+grow past a fixed cost. Every tick moves all particles in one vectorized
+step, and drawing looks up each particle's frame in a set of sprites
+rendered up front and hands them to Surface.blits in one call.
+
+Particles are cosmetic: they draw from their own random generator rather
+than the random module, so effects never change how a game plays out or
+replays. NumPy is optional; without it, effects are turned off.
+"""
+import math
+import pygame
+from settings import PARTICLE_BUDGET, PARTICLE_FRAMES, PARTICLE_EFFECTS, GROUND_LEVEL, WIDTH
+from surface_memory import surface_memory
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class ParticleSystem:
+    """Live particles of one game, with the sprites and settings of each effect"""
+
+    def __init__(self, capacity=PARTICLE_BUDGET, enabled=True, seed=None):
+        """
+        Args:
+            capacity (int): Most particles alive at once
+            enabled (bool): False skips all particle work, as for headless games
+            seed (int): Seed for the particles' random generator
+        """
+        self.enabled = enabled and np is not None and capacity > 0
+        self.capacity = capacity
+        self.cursor = 0  # Slot the next particle is written to, always the oldest
+        self.live = 0  # Particles alive after the last update
+        self.effects = {}  # Effect name -> (first frame, settings)
+        self._sprites = None
+        # Largest sprite radius, how far off screen a particle can still show
+        self.margin = max((spec["size"] for spec in PARTICLE_EFFECTS.values()), default=0)
+        if not self.enabled:
+            return
+
+        self.rng = np.random.default_rng(seed)
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.gravity = np.zeros(capacity, dtype=np.float32)
+        self.drag = np.ones(capacity, dtype=np.float32)
+        self.age = np.zeros(capacity, dtype=np.int32)
+        self.lifetime = np.zeros(capacity, dtype=np.int32)  # Dead once age reaches it
+        self.first_frame = np.zeros(capacity, dtype=np.int32)  # Sprite of the particle's effect at age 0
+
+        for index, (name, spec) in enumerate(PARTICLE_EFFECTS.items()):
+            self.effects[name] = (index * PARTICLE_FRAMES, spec)
+
+    def clear(self):
+        """Remove every particle"""
+        if self.enabled:
+            self.age[:] = 0
+            self.lifetime[:] = 0
+        self.cursor = 0
+        self.live = 0
+
+    @property
+    def sprites(self):
+        """Frames of every effect in settings order, PARTICLE_FRAMES each, shrinking and fading"""
+        if self._sprites is None:
+            sprites = []
+            offsets = []
+            for spec in PARTICLE_EFFECTS.values():
+                for frame in range(PARTICLE_FRAMES):
+                    fade = 1 - frame / PARTICLE_FRAMES
+                    radius = max(1, round(spec["size"] * (0.5 + fade / 2)))
+                    sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+                    pygame.draw.circle(sprite, (*spec["color"], int(255 * fade)), (radius, radius), radius)
+                    sprites.append(surface_memory.track(sprite, "effects"))
+                    offsets.append(radius)
+            self._sprites = sprites
+            self.sprite_offsets = np.array(offsets, dtype=np.int32)
+        return self._sprites
+
+    def emit(self, effect, x, y, angle=0.0):
+        """
+        Add one burst of an effect
+
+        Args:
+            effect (str): Name of the effect in settings.PARTICLE_EFFECTS
+            x (float): World x the particles start at
+            y (float): Y the particles start at
+            angle (float): Direction in radians the burst is centered on, screen y pointing down
+        """
+        if not self.enabled:
+            return
+        first_frame, spec = self.effects[effect]
+        count = min(spec["count"], self.capacity)
+        slots = (self.cursor + np.arange(count)) % self.capacity
+        self.cursor = (self.cursor + count) % self.capacity
+
+        rng = self.rng
+        spread = math.radians(spec["spread"]) / 2
+        directions = angle + rng.uniform(-spread, spread, count)
+        speeds = rng.uniform(*spec["speed"], count)
+        self.x[slots] = x
+        self.y[slots] = y
+        self.vx[slots] = np.cos(directions) * speeds
+        self.vy[slots] = np.sin(directions) * speeds
+        self.gravity[slots] = spec["gravity"]
+        self.drag[slots] = spec["drag"]
+        self.age[slots] = 0
+        self.lifetime[slots] = rng.integers(spec["lifetime"][0], spec["lifetime"][1] + 1, count)
+        self.first_frame[slots] = first_frame
+        self.live = min(self.live + count, self.capacity)
+
+    def update(self):
+        """Move and age every particle by one tick"""
+        if not self.enabled or not self.live:
+            return
+        vx, vy, y = self.vx, self.vy, self.y
+        vx *= self.drag
+        vy *= self.drag
+        vy += self.gravity
+        self.x += vx
+        y += vy
+        self.age += 1
+
+        # Particles falling to the ground come to rest on it
+        grounded = y > GROUND_LEVEL
+        if grounded.any():
+            y[grounded] = GROUND_LEVEL
+            vy[grounded] = 0
+            vx[grounded] *= 0.5
+
+        self.live = int(np.count_nonzero(self.age < self.lifetime))
+
+    def draw(self, screen, camera_offset_x):
+        """Draw the live particles on screen with one Surface.blits call"""
+        if not self.enabled or not self.live:
+            return
+        sprites = self.sprites
+        alive = np.flatnonzero(self.age < self.lifetime)
+        screen_x = self.x[alive] - camera_offset_x
+        visible = (screen_x > -self.margin) & (screen_x < WIDTH + self.margin)
+        alive = alive[visible]
+        if not len(alive):
+            return
+
+        frames = self.first_frame[alive] + self.age[alive] * PARTICLE_FRAMES // self.lifetime[alive]
+        offsets = self.sprite_offsets[frames]
+        positions = np.empty((len(alive), 2), dtype=np.int32)
+        positions[:, 0] = screen_x[visible] - offsets
+        positions[:, 1] = self.y[alive] - offsets
+        screen.blits(list(zip([sprites[frame] for frame in frames.tolist()], positions.tolist())),
+                     doreturn=False)
@@ -1,28 +1,60 @@
 import pygame
 import math
-import os
+import random
 from settings import (
     PLAYER_WIDTH, PLAYER_HEIGHT, PLAYER_SPEED, PLAYER_MAX_HEALTH, 
-    PLAYER_JUMP_POWER, GREEN, WIDTH, GRAVITY, GROUND_LEVEL
+    PLAYER_JUMP_POWER, GREEN, WIDTH, GRAVITY, GROUND_LEVEL, WEAPON_HOLD_DISTANCE
 )
-from projectile import Projectile
-from debug import add_debug
+from weapons import WEAPON_LIST, weapon_rotations
+from debug import add_debug, DEBUG, ERROR
+from assets import asset_exists, list_assets
+from surface_memory import surface_memory
+from animation import animation_clock, make_clips
 
 class Player:
     """
     Player class with movement, shooting, and health mechanics
     """
-    def __init__(self, x, y):
-        # Position and dimensions
-        self.x = x
-        self.y = y
+    clips = None  # Animation clips shared by every player, loaded by the first one
+    
+    def __init__(self, x, y, timers=None, weapon=None, rng=None):
+        self.timers = timers  # TimingWheel of the simulation, ends the hit flash
+        self.rng = rng or random.Random()  # Random generator of the simulation, for weapon jitter
+        self.hit_timer = None
+        
+        # Dimensions
         self.width = PLAYER_WIDTH
         self.height = PLAYER_HEIGHT
         self.speed = PLAYER_SPEED
+        self.max_health = PLAYER_MAX_HEALTH
+        self.animation_delay = 8  # Frames between sprite changes
+        self.weapon = weapon or WEAPON_LIST[0]  # Kept across resets
+        
+        # Position, health, movement, animation, weapon and hit state
+        self.reset(x, y)
+        
+        # Debug info
+        add_debug("Player: Initializing sprite system")
+        
+        # Load sprites
+        self.use_sprites = True  # Set to False to completely disable sprite rendering
+        if Player.clips is None:
+            sprites = surface_memory.track_all(self.load_sprites(), "player")
+            Player.clips = make_clips(sprites, self.animation_delay)
+        
+        # Visuals (fallback color)
+        self.color = GREEN
+        
+        add_debug("Player: Initialization complete")
+    
+    def reset(self, x, y):
+        """Put the player back in its starting state, keeping the loaded sprites"""
+        # Position
+        self.x = x
+        self.y = y
         
         # Health
-        self.health = PLAYER_MAX_HEALTH
-        self.max_health = PLAYER_MAX_HEALTH
+        self.health = self.max_health
         
         # Movement state
         self.moving_left = False
@@ -33,25 +65,29 @@ class Player:
         
         # Animation
         self.animation_state = "idle"  # idle or walking
-        self.frame_index = 0
-        self.animation_timer = 0
-        self.animation_delay = 8  # Frames between sprite changes
+        self.animation_start = animation_clock.tick  # Tick the current clip started on
         
-        # Debug info
-        add_debug("Player: Initializing sprite system")
+        # Weapon state
+        self.fire_ready_tick = 0  # Tick the weapon can fire again on
+        self.trigger_held = False
+        self.aim_angle = 0.0  # Radians, screen y pointing down
+        self.aim_target = None  # Screen point a remote player aims at; None aims at the mouse
         
-        # Load sprites
-        self.use_sprites = True  # Set to False to completely disable sprite rendering
-        self.sprites = self.load_sprites()
+        # Camera following this player, so x stays a screen position
+        self.camera_offset_x = 0
         
-        # Visuals (fallback color)
-        self.color = GREEN
+        # Enemies' routes toward the cell the player last stood on
+        self.flow = None
         
         # Damage flash effect
         self.is_hit = False
-        self.hit_timer = 0
-        
-        add_debug("Player: Initialization complete")
+        if self.hit_timer is not None:
+            self.hit_timer.cancel()
+            self.hit_timer = None
+    
+    @property
+    def world_x(self):
+        return self.x + self.camera_offset_x
     
     def load_sprites(self):
         """Load all player sprite images"""
@@ -69,7 +105,7 @@ class Player:
         }
         
         # Check if we have the assets/player directory
-        if not os.path.exists("assets/player"):
+        if not list_assets("assets/player"):
             add_debug("Player: 'assets/player' directory not found!")
             self.create_fallback_sprites(sprites)
             return sprites
@@ -79,31 +115,31 @@ class Player:
             # Load idle right sprites
             for i in range(4):
                 sprite_path = f"assets/player/idle_right_{i}.png"
-                if os.path.exists(sprite_path):
+                if asset_exists(sprite_path):
                     # Load sprite and scale it to match player dimensions
                     original_sprite = pygame.image.load(sprite_path).convert_alpha()
                     scaled_sprite = pygame.transform.scale(original_sprite, (self.width, self.height))
                     sprites["idle"]["right"].append(scaled_sprite)
-                    add_debug(f"Player: Loaded and scaled {sprite_path}, new size: {scaled_sprite.get_size()}")
+                    add_debug("Player: Loaded and scaled %s, new size: %s", sprite_path, scaled_sprite.get_size(), level=DEBUG)
             
             # Load walking right sprites
             for i in range(4):
                 sprite_path = f"assets/player/walking_right_{i}.png"
-                if os.path.exists(sprite_path):
+                if asset_exists(sprite_path):
                     # Load sprite and scale it to match player dimensions
                     original_sprite = pygame.image.load(sprite_path).convert_alpha()
                     scaled_sprite = pygame.transform.scale(original_sprite, (self.width, self.height))
                     sprites["walking"]["right"].append(scaled_sprite)
-                    add_debug(f"Player: Loaded and scaled {sprite_path}, new size: {scaled_sprite.get_size()}")
+                    add_debug("Player: Loaded and scaled %s, new size: %s", sprite_path, scaled_sprite.get_size(), level=DEBUG)
             
             # Check if we have left sprites or need to flip right sprites
-            left_exists = os.path.exists("assets/player/idle_left_0.png")
+            left_exists = asset_exists("assets/player/idle_left_0.png")
             
             if left_exists:
                 # Load idle left sprites
                 for i in range(4):
                     sprite_path = f"assets/player/idle_left_{i}.png"
-                    if os.path.exists(sprite_path):
+                    if asset_exists(sprite_path):
                         # Load sprite and scale it to match player dimensions
                         original_sprite = pygame.image.load(sprite_path).convert_alpha()
                         scaled_sprite = pygame.transform.scale(original_sprite, (self.width, self.height))
@@ -112,7 +148,7 @@ class Player:
                 # Load walking left sprites
                 for i in range(4):
                     sprite_path = f"assets/player/walking_left_{i}.png"
-                    if os.path.exists(sprite_path):
+                    if asset_exists(sprite_path):
                         # Load sprite and scale it to match player dimensions
                         original_sprite = pygame.image.load(sprite_path).convert_alpha()
                         scaled_sprite = pygame.transform.scale(original_sprite, (self.width, self.height))
@@ -130,7 +166,7 @@ class Player:
                 raise ValueError("Missing required sprites")
                 
         except Exception as e:
-            add_debug(f"Player: Error during sprite loading: {e}")
+            add_debug("Player: Error during sprite loading: %s", e, level=ERROR)
             self.create_fallback_sprites(sprites)
         
         return sprites
@@ -169,18 +205,14 @@ class Player:
     
     def move(self, platforms, camera_offset_x):
         """Update player position and handle collisions"""
-        # Set default animation state
-        self.animation_state = "idle"
-        
         # Horizontal movement
         if self.moving_left:
             self.x -= self.speed
             self.facing_right = False  # Ensure player faces left when moving left
-            self.animation_state = "walking"
         if self.moving_right:
             self.x += self.speed
             self.facing_right = True  # Ensure player faces right when moving right
-            self.animation_state = "walking"
+        self.set_animation("walking" if self.moving_left or self.moving_right else "idle")
         
         # Apply gravity
         self.velocity_y += GRAVITY
@@ -206,88 +238,109 @@ class Player:
         # Keep player within left boundary
         if self.x < 0:
             self.x = 0
-        
-        # Update animation timer
-        self.animation_timer += 1
-        if self.animation_timer >= self.animation_delay:
-            self.animation_timer = 0
-            # Make sure we don't go out of index range
-            max_frames = len(self.sprites[self.animation_state]["right"])
-            self.frame_index = (self.frame_index + 1) % max_frames if max_frames > 0 else 0
-        
-        # Update hit effect timer
-        if self.is_hit:
-            self.hit_timer += 1
-            if self.hit_timer >= 10:  # Flash for 10 frames
-                self.is_hit = False
-                self.hit_timer = 0
+    
+    def set_animation(self, state):
+        """Switch to another clip, starting it from its first frame"""
+        if state != self.animation_state:
+            self.animation_state = state
+            self.animation_start = animation_clock.tick
     
     def jump(self):
         """Make the player jump"""
         if self.on_ground:
             self.velocity_y = PLAYER_JUMP_POWER
             self.on_ground = False
-            add_debug("Player jumped")
+            add_debug("Player jumped", level=DEBUG)
     
-    def shoot(self, mouse_pos, camera_offset_x, projectiles):
-        """Create a projectile in the direction of the mouse cursor"""
-        # Get mouse position
-        mouse_x, mouse_y = mouse_pos
-        
-        # Convert player screen position to world position
-        player_world_pos_x = self.x + camera_offset_x
+    def select_weapon(self, weapon):
+        """Switch to another WeaponType, which has to reload before it fires"""
+        if weapon is not self.weapon:
+            self.weapon = weapon
+            self.fire_ready_tick = self.timers.tick + weapon.fire_interval
+            add_debug("Player switched to the %s", weapon.name)
+    
+    @property
+    def reload_progress(self):
+        """0 just after firing, up to 1 once the weapon can fire again"""
+        remaining = self.fire_ready_tick - self.timers.tick
+        return 1.0 if remaining <= 0 else 1 - remaining / self.weapon.fire_interval
+    
+    def aim(self, mouse_pos, camera_offset_x):
+        """
+        Point the weapon at the mouse cursor
         
-        # Calculate direction vector
-        dir_x = (mouse_x + camera_offset_x) - (player_world_pos_x + self.width/2)
-        dir_y = mouse_y - (self.y + self.height/2)
+        Returns:
+            tuple: World (x, y) of the muzzle
+        """
+        mouse_x, mouse_y = mouse_pos
+        center_x = self.x + self.width / 2
+        center_y = self.y + self.height / 2
+        dir_x = mouse_x - center_x
+        dir_y = mouse_y - center_y
         
         # Update facing direction based on mouse position
         # Note: Only update direction if the player isn't moving
         if not (self.moving_left or self.moving_right):
-            if dir_x > 0:
-                self.facing_right = True
-            else:
-                self.facing_right = False
-        
-        # Normalize the direction vector
-        length = math.sqrt(dir_x ** 2 + dir_y ** 2)
-        if length > 0:
-            dir_x /= length
-            dir_y /= length
-        
-        # Create projectile at player's world position
-        projectile = Projectile(
-            player_world_pos_x + self.width // 2,
-            self.y + self.height // 2,
-            dir_x, dir_y
-        )
-        
-        # Add projectile to the game's projectiles list
-        projectiles.append(projectile)
-        add_debug(f"Projectile created at ({projectile.x:.1f}, {projectile.y:.1f})")
+            self.facing_right = dir_x > 0
+        
+        self.aim_angle = math.atan2(dir_y, dir_x)
+        return self.muzzle(camera_offset_x)
+    
+    def muzzle(self, camera_offset_x):
+        """World (x, y) of the weapon's muzzle at the current aim"""
+        return (self.x + self.width / 2 + camera_offset_x + math.cos(self.aim_angle) * WEAPON_HOLD_DISTANCE,
+                self.y + self.height / 2 + math.sin(self.aim_angle) * WEAPON_HOLD_DISTANCE)
+    
+    def shoot(self, mouse_pos, camera_offset_x, projectiles):
+        """
+        Pull the trigger: aim at the mouse cursor and fire if the weapon has reloaded
+        
+        Returns:
+            bool: Whether the weapon fired
+        """
+        muzzle_x, muzzle_y = self.aim(mouse_pos, camera_offset_x)
+        if self.timers.tick < self.fire_ready_tick:
+            return False
+        self.weapon.fire(muzzle_x, muzzle_y, self.aim_angle, projectiles, self.rng)
+        self.fire_ready_tick = self.timers.tick + self.weapon.fire_interval
+        return True
+    
+    def hold_trigger(self, mouse_pos, camera_offset_x, projectiles):
+        """
+        Keep the trigger held after pulling it: automatic weapons fire again
+        whenever they have reloaded, the rest only aim
+        
+        Returns:
+            bool: Whether the weapon fired
+        """
+        if self.weapon.automatic:
+            return self.shoot(mouse_pos, camera_offset_x, projectiles)
+        self.aim(mouse_pos, camera_offset_x)
+        return False
     
     def take_damage(self, amount):
         """Reduce player health by the given amount"""
         self.health -= amount
+        
+        # Flash for 10 frames, starting over if already flashing
         self.is_hit = True
-        self.hit_timer = 0
+        if self.hit_timer is not None:
+            self.hit_timer.cancel()
+        self.hit_timer = self.timers.schedule(10, self.end_flash)
+    
+    def end_flash(self):
+        """Timer callback for the end of the hit flash"""
+        self.is_hit = False
+        self.hit_timer = None
     
     def draw(self, screen, debug_mode=False):
         """Draw the player on the screen"""
         if self.use_sprites:
-            # Get the current sprite based on animation state and direction
-            direction = "right" if self.facing_right else "left"
+            # The frame follows from the clock and when the clip started
+            clip = self.clips.get(self.animation_state)
+            current_sprite = clip.frame(self.animation_start, self.facing_right) if clip else None
             
-            # Safeguard against potential index errors
-            if (self.animation_state in self.sprites and 
-                direction in self.sprites[self.animation_state] and 
-                len(self.sprites[self.animation_state][direction]) > 0):
-                
-                # Make sure frame index is valid
-                if self.frame_index >= len(self.sprites[self.animation_state][direction]):
-                    self.frame_index = 0
-                
-                current_sprite = self.sprites[self.animation_state][direction][self.frame_index]
+            if current_sprite is not None:
                 sprite_width, sprite_height = current_sprite.get_size()
                 
                 # Calculate position to center sprite horizontally and align bottom with player's feet
@@ -297,10 +350,11 @@ class Player:
                 # Apply hit effect (flash red) if player was recently hit
                 if self.is_hit:
                     # Create a copy of the sprite to modify
-                    hit_sprite = current_sprite.copy()
+                    hit_sprite = surface_memory.track(current_sprite.copy(), "effects")
                     
                     # Create red overlay
-                    red_overlay = pygame.Surface(hit_sprite.get_size(), pygame.SRCALPHA)
+                    red_overlay = surface_memory.track(
+                        pygame.Surface(hit_sprite.get_size(), pygame.SRCALPHA), "effects")
                     red_overlay.fill((255, 0, 0, 128))  # Red with 50% transparency
                     
                     # Apply overlay to sprite
@@ -318,6 +372,8 @@ class Player:
             # Use fallback drawing if sprites are disabled
             self._draw_fallback(screen)
         
+        self._draw_weapon(screen)
+        
         # Draw debug info
         if debug_mode:
             # Draw collision box
@@ -328,6 +384,27 @@ class Player:
             pygame.draw.circle(screen, (255, 0, 0), 
                             (int(self.x + self.width/2), int(self.y + self.height)), 3)
     
+    def _draw_weapon(self, screen):
+        """Draw the weapon pointing where the player last aimed, on the side it faces"""
+        if self.timers is None:
+            return
+        sprite = self.weapon.frame(self.reload_progress)
+        if sprite is None:
+            return
+        
+        angle = self.aim_angle
+        pointing_right = math.cos(angle) >= 0
+        if pointing_right != self.facing_right:
+            # Turned away since aiming: mirror the aim onto the side faced
+            angle = math.pi - angle
+            pointing_right = not pointing_right
+        # Flipped when pointing left to keep the weapon upright
+        rotated = weapon_rotations.get(sprite, angle, not pointing_right)
+        
+        center_x = self.x + self.width / 2 + math.cos(angle) * WEAPON_HOLD_DISTANCE
+        center_y = self.y + self.height / 2 + math.sin(angle) * WEAPON_HOLD_DISTANCE
+        screen.blit(rotated, rotated.get_rect(center=(int(center_x), int(center_y))))
+    
     def _draw_fallback(self, screen):
         """Draw a simple colored rectangle as fallback"""
         # Draw the player as a colored rectangle
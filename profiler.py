@@ -0,0 +1,159 @@
+"""
+Frame profiler that times named scopes and draws a frame-time overlay
+"""
+import time
+from collections import deque
+import pygame
+from settings import WIDTH, FPS, DEBUG_FONT, WHITE, BLACK, PROFILER_HISTORY
+from surface_memory import surface_memory
+
+# Overlay layout
+GRAPH_WIDTH = 290
+GRAPH_HEIGHT = 100
+GRAPH_MAX_MS = 2000.0 / FPS  # Graph top is two frame budgets
+
+# Colors cycled through for the stacked scopes
+SCOPE_COLORS = [
+    (230, 25, 75), (60, 180, 75), (255, 225, 25), (0, 130, 200),
+    (245, 130, 48), (145, 30, 180), (70, 240, 240), (240, 50, 230),
+    (210, 245, 60), (250, 190, 212), (0, 128, 128), (170, 110, 40),
+]
+
+def percentile(values, percent):
+    """Return the given percentile (0-100) of a sequence of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = int(round(percent / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+class FrameProfiler:
+    """
+    Times named scopes within each frame and keeps a rolling history per scope
+
+    All timing calls return immediately while the profiler is disabled, so
+    the instrumentation can stay in place in release builds.
+    """
+
+    def __init__(self, history=PROFILER_HISTORY):
+        self.enabled = False
+        self.history = history
+        self.samples = {}  # Scope name -> deque of milliseconds per frame
+        self.colors = {}   # Scope name -> graph color
+        self.frame_samples = deque(maxlen=history)
+        self._frame = {}   # Scope name -> milliseconds spent this frame
+        self._starts = {}
+        self._frame_start = None
+        self._graph = None
+
+    def set_enabled(self, enabled):
+        """Turn profiling on or off, dropping any collected history"""
+        self.enabled = enabled
+        self.samples.clear()
+        self.frame_samples.clear()
+        self._frame.clear()
+        self._starts.clear()
+        self._frame_start = None
+        self._graph = None
+
+    def begin_frame(self):
+        """Mark the start of a frame"""
+        if not self.enabled:
+            return
+        self._frame_start = time.perf_counter()
+
+    def begin(self, name):
+        """Start timing a named scope"""
+        if not self.enabled:
+            return
+        self._starts[name] = time.perf_counter()
+
+    def end(self, name):
+        """Stop timing a named scope, adding its time to the current frame"""
+        if not self.enabled:
+            return
+        start = self._starts.pop(name, None)
+        if start is not None:
+            elapsed = (time.perf_counter() - start) * 1000
+            self._frame[name] = self._frame.get(name, 0.0) + elapsed
+
+    def end_frame(self):
+        """Mark the end of a frame and push its timings into the history"""
+        if not self.enabled:
+            return
+        if self._frame_start is None:
+            # Profiling was enabled part way through this frame
+            self._frame.clear()
+            return
+
+        frame_ms = (time.perf_counter() - self._frame_start) * 1000
+        self.frame_samples.append(frame_ms)
+
+        for name in self._frame:
+            if name not in self.samples:
+                self.samples[name] = deque(maxlen=self.history)
+                self.colors[name] = SCOPE_COLORS[len(self.colors) % len(SCOPE_COLORS)]
+        for name, values in self.samples.items():
+            values.append(self._frame.get(name, 0.0))
+
+        self._add_graph_column(frame_ms)
+        self._frame.clear()
+        self._frame_start = None
+
+    def _add_graph_column(self, frame_ms):
+        """Scroll the graph one pixel and draw the newest frame as a stacked column"""
+        if self._graph is None:
+            self._graph = surface_memory.track(pygame.Surface((GRAPH_WIDTH, GRAPH_HEIGHT)), "debug")
+            self._graph.fill((0, 0, 0))
+
+        self._graph.scroll(-1, 0)
+        x = GRAPH_WIDTH - 1
+        pygame.draw.line(self._graph, (0, 0, 0), (x, 0), (x, GRAPH_HEIGHT))
+
+        # Untracked time in the frame is drawn in gray underneath the scopes
+        scale = GRAPH_HEIGHT / GRAPH_MAX_MS
+        bottom = GRAPH_HEIGHT
+        top = bottom - int(frame_ms * scale)
+        pygame.draw.line(self._graph, (90, 90, 90), (x, max(top, 0)), (x, bottom))
+
+        for name, ms in self._frame.items():
+            height = ms * scale
+            if height < 1:
+                continue
+            top = bottom - height
+            pygame.draw.line(self._graph, self.colors[name], (x, max(int(top), 0)), (x, int(bottom)))
+            bottom = top
+
+        # Frame budget line
+        budget_y = GRAPH_HEIGHT - int(1000.0 / FPS * scale)
+        self._graph.set_at((x, budget_y), WHITE)
+
+    def draw_overlay(self, screen, x=WIDTH - 300, y=220):
+        """Draw the stacked frame-time graph and p50/p99 of every scope"""
+        if not self.enabled or self._graph is None:
+            return
+
+        screen.blit(self._graph, (x, y))
+        pygame.draw.rect(screen, WHITE, (x, y, GRAPH_WIDTH, GRAPH_HEIGHT), 1)
+
+        # Legend background sized for the frame line plus one line per scope
+        legend_height = 28 + 16 * len(self.samples)
+        pygame.draw.rect(screen, BLACK, (x, y + GRAPH_HEIGHT, GRAPH_WIDTH, legend_height))
+
+        y_pos = y + GRAPH_HEIGHT + 5
+        text = DEBUG_FONT.render(
+            f"frame  p50 {percentile(self.frame_samples, 50):.2f}  "
+            f"p99 {percentile(self.frame_samples, 99):.2f} ms", True, WHITE)
+        screen.blit(text, (x, y_pos))
+        y_pos += 18
+
+        for name, values in self.samples.items():
+            pygame.draw.rect(screen, self.colors[name], (x, y_pos + 4, 8, 8))
+            text = DEBUG_FONT.render(
+                f"{name}  p50 {percentile(values, 50):.2f}  p99 {percentile(values, 99):.2f}",
+                True, WHITE)
+            screen.blit(text, (x + 12, y_pos))
+            y_pos += 16
+
+# Global profiler shared by the main loop and game states
+profiler = FrameProfiler()
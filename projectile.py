@@ -8,17 +8,28 @@ from settings import (
 class Projectile:
     """Projectile class for player's bullets"""
     
-    def __init__(self, x, y, dir_x, dir_y):
+    def __init__(self, x, y, dir_x, dir_y, weapon=None):
         self.x = x  # World x position
         self.y = y
-        self.radius = PROJECTILE_RADIUS
-        self.speed = PROJECTILE_SPEED
         self.dir_x = dir_x
         self.dir_y = dir_y
-        self.damage = PROJECTILE_DAMAGE
         self.color = YELLOW
         self.age = 0  # Track how long the projectile has existed
-        self.max_age = PROJECTILE_MAX_AGE  # Maximum frames the projectile can exist
+        self.set_weapon(weapon)
+    
+    def set_weapon(self, weapon):
+        """Take speed, damage, size and range from the weapon that fired it, or the defaults"""
+        self.weapon = weapon
+        if weapon is None:
+            self.radius = PROJECTILE_RADIUS
+            self.speed = PROJECTILE_SPEED
+            self.damage = PROJECTILE_DAMAGE
+            self.max_age = PROJECTILE_MAX_AGE  # Maximum frames the projectile can exist
+        else:
+            self.radius = weapon.projectile_radius
+            self.speed = weapon.projectile_speed
+            self.damage = weapon.projectile_damage
+            self.max_age = weapon.projectile_max_age
     
     def update(self):
         """Update projectile position and age"""
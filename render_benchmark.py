@@ -0,0 +1,272 @@
+"""
+Render micro-benchmarks for the game's draw routines
+
+Times each draw routine in isolation against render targets of different
+bit depths, with the source images converted to each surface format we
+could ship (convert, convert_alpha, colorkey + RLEACCEL).
+
+Run with: python render_benchmark.py [--duration SECONDS] [--csv FILE]
+"""
+import os
+import sys
+import time
+import argparse
+import copy
+
+# Benchmarks never need a real window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from settings import WIDTH, HEIGHT, GROUND_LEVEL
+
+# Bit depths to create render targets with
+TARGET_DEPTHS = (16, 24, 32)
+
+# Color used to mark transparent pixels for colorkeyed surfaces
+COLORKEY = (255, 0, 255)
+
+
+def format_convert(surface, target):
+    """Opaque surface in the target's pixel format"""
+    return surface.convert(target)
+
+
+def format_convert_alpha(surface, target):
+    """Per-pixel alpha surface in the display's alpha format"""
+    return surface.convert_alpha()
+
+
+def format_colorkey_rle(surface, target):
+    """Opaque surface with a colorkey for transparent pixels, RLE accelerated"""
+    keyed = pygame.Surface(surface.get_size())
+    keyed.fill(COLORKEY)
+    keyed.blit(surface, (0, 0))
+    keyed = keyed.convert(target)
+    keyed.set_colorkey(COLORKEY, pygame.RLEACCEL)
+    return keyed
+
+
+# Surface formats the source images are converted to, in report order
+SURFACE_FORMATS = {
+    "convert": format_convert,
+    "convert_alpha": format_convert_alpha,
+    "colorkey_rle": format_colorkey_rle,
+}
+
+
+def load_source(path, size=None):
+    """Load an image without conversion, optionally scaling it"""
+    image = pygame.image.load(path)
+    if size is not None:
+        image = pygame.transform.scale(image, size)
+    return image
+
+
+def case_parallax_layer(fmt, target):
+    """ParallaxLayer.draw with the closest city layer"""
+    from parallax import ParallaxLayer
+
+    layer = ParallaxLayer(os.path.join("assets", "background", "assetpack bg1.png"),
+                          scroll_speed=0.5, y_position=100)
+    layer.image = fmt(load_source(layer.image_path), target)
+    layer.width = layer.image.get_width()
+    layer.height = layer.image.get_height()
+    layer.loaded = True
+    layer.update(1234)
+
+    return lambda: layer.draw(target), 2
+
+
+def case_ground_tiles(fmt, target):
+    """draw_ground_tiles for one screen width of ground"""
+    import level
+
+    level.ground_tile_img = fmt(
+        load_source(os.path.join("assets", "environment", "ground_tile.png"), (32, 32)), target)
+    blits = (WIDTH // level.ground_tile_img.get_width()) + 1
+
+    return lambda: level.draw_ground_tiles(target, 1234), blits
+
+
+def case_platform(fmt, target):
+    """Platform.draw for a tiled floating platform"""
+    import level
+
+    level.platform_tile_img = fmt(
+        load_source(os.path.join("assets", "environment", "platform.png")), target)
+    platform = level.Platform(300, GROUND_LEVEL - 120, 200, 20)
+
+    return lambda: platform.draw(target, 0), 1
+
+
+def case_obstacle(fmt, target):
+    """Obstacle.draw for a hazard with spike polygons"""
+    import level
+
+    obstacle = level.Obstacle(100, GROUND_LEVEL - 10, 200, 10, damage=20)
+    # One rect plus one polygon per spike
+    draws = 1 + obstacle.width // 10
+
+    return lambda: obstacle.draw(target, 0), draws
+
+
+def case_zombie(fmt, target):
+    """Zombie.draw including its health bar"""
+    from enemy import Zombie
+    from animation import Clip
+
+    zombie = Zombie(300, GROUND_LEVEL - 50)
+    # Convert the frames on a private copy of the type; the shared one is left alone
+    zombie.type = copy.copy(zombie.type)
+    zombie.type._clips = {
+        animation: Clip([fmt(frame, target) for frame in clip.right],
+                        [fmt(frame, target) for frame in clip.left], clip.delay)
+        for animation, clip in zombie.clips.items()
+    }
+
+    # Sprite blit plus the two health bar rects
+    return lambda: zombie.draw(target, 0), 3
+
+
+def case_projectile(fmt, target):
+    """Projectile.draw"""
+    from projectile import Projectile
+
+    projectile = Projectile(300, 300, 1, 0)
+
+    return lambda: projectile.draw(target, 0), 1
+
+
+def case_victory(fmt, target):
+    """draw_victory, dominated by its per-line gradient"""
+    from ui import draw_victory
+
+    # One line per row of the gradient, the rest is text and rects
+    return lambda: draw_victory(target, 12345, 10, 0), HEIGHT
+
+
+# Benchmark cases in report order
+CASES = {
+    "ParallaxLayer.draw": case_parallax_layer,
+    "draw_ground_tiles": case_ground_tiles,
+    "Platform.draw": case_platform,
+    "Obstacle.draw": case_obstacle,
+    "Zombie.draw": case_zombie,
+    "Projectile.draw": case_projectile,
+    "draw_victory": case_victory,
+}
+
+# Cases that draw only primitives, so they are timed once per target depth
+PRIMITIVE_CASES = {"Obstacle.draw", "Projectile.draw", "draw_victory"}
+
+
+def time_call(draw, duration):
+    """
+    Call draw repeatedly for about duration seconds
+
+    Returns:
+        tuple: (calls, elapsed seconds)
+    """
+    # Warm up caches and any lazy loading
+    for _ in range(3):
+        draw()
+
+    calls = 0
+    batch = 1
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < duration:
+        for _ in range(batch):
+            draw()
+        calls += batch
+        batch = min(batch * 2, 1024)
+        elapsed = time.perf_counter() - start
+
+    return calls, elapsed
+
+
+def run_benchmarks(duration=0.25, case_names=None):
+    """
+    Run every case for every surface format and target depth
+
+    Args:
+        duration (float): Seconds to spend timing each combination
+        case_names (list): Optional subset of CASES to run
+
+    Returns:
+        list: One result dict per (case, format, depth)
+    """
+    results = []
+    for name, case in CASES.items():
+        if case_names and name not in case_names:
+            continue
+        for depth in TARGET_DEPTHS:
+            target = pygame.Surface((WIDTH, HEIGHT), 0, depth)
+            for format_name, fmt in SURFACE_FORMATS.items():
+                if name in PRIMITIVE_CASES:
+                    if format_name != "convert":
+                        continue
+                    format_name = "-"
+                draw, blits_per_call = case(fmt, target)
+                calls, elapsed = time_call(draw, duration)
+                results.append({
+                    "case": name,
+                    "format": format_name,
+                    "depth": depth,
+                    "calls": calls,
+                    "us_per_call": elapsed / calls * 1e6,
+                    "blits_per_sec": calls * blits_per_call / elapsed,
+                })
+    return results
+
+
+def print_report(results):
+    """Print results as a table, slowest combination of each case first"""
+    header = f"{'case':<20} {'format':<14} {'depth':>5} {'us/call':>10} {'blits/s':>12}"
+    print(header)
+    print("-" * len(header))
+
+    current_case = None
+    for result in sorted(results, key=lambda r: (list(CASES).index(r["case"]), -r["us_per_call"])):
+        if current_case is not None and result["case"] != current_case:
+            print()
+        current_case = result["case"]
+        print(f"{result['case']:<20} {result['format']:<14} {result['depth']:>5} "
+              f"{result['us_per_call']:>10.1f} {result['blits_per_sec']:>12.0f}")
+
+
+def write_csv(results, path):
+    """Write results to a CSV file for later comparison"""
+    import csv
+
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zombie Fighters render micro-benchmarks")
+    parser.add_argument("--duration", type=float, default=0.25,
+                        help="seconds to time each case/format/depth combination")
+    parser.add_argument("--case", action="append", choices=list(CASES),
+                        help="only run the given case (can be repeated)")
+    parser.add_argument("--csv", help="also write the results to this CSV file")
+    args = parser.parse_args()
+
+    pygame.init()
+    # convert() and convert_alpha() need a display surface to exist
+    pygame.display.set_mode((WIDTH, HEIGHT))
+
+    results = run_benchmarks(args.duration, args.case)
+    print_report(results)
+    if args.csv:
+        write_csv(results, args.csv)
+
+    pygame.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
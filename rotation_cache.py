@@ -0,0 +1,69 @@
+"""
+Cache of sprites rotated to quantized angles
+
+Rotating a sprite with pygame.transform.rotate every frame costs a
+rotation and a fresh Surface each time. Aim angles are instead rounded to
+one of ROTATION_STEPS directions, and each (sprite, direction, flip)
+combination is rendered once on first use and kept in a least recently
+used table. Once the directions a player actually aims in are warm,
+drawing an aimed sprite is a dictionary lookup and a blit.
+"""
+import math
+from collections import OrderedDict
+import pygame
+from settings import ROTATION_STEPS, ROTATION_CACHE_SIZE
+from surface_memory import surface_memory
+
+class RotationCache:
+    """Rotated and flipped copies of sprites, evicted least recently used first"""
+
+    def __init__(self, subsystem, steps=ROTATION_STEPS, capacity=ROTATION_CACHE_SIZE):
+        """
+        Args:
+            subsystem (str): Surface memory subsystem the rendered copies count towards
+            steps (int): Directions a full turn is divided into
+            capacity (int): Most rendered copies kept
+        """
+        self.subsystem = subsystem
+        self.steps = steps
+        self.capacity = capacity
+        self.entries = OrderedDict()  # (sprite, step, flipped) -> rotated Surface
+        self.hits = 0
+        self.misses = 0
+
+    def step(self, angle):
+        """Nearest of the cache's directions to an angle in radians"""
+        return round(angle * self.steps / (2 * math.pi)) % self.steps
+
+    def get(self, sprite, angle, flipped=False):
+        """
+        Sprite rotated to the cached direction nearest an angle
+
+        Args:
+            sprite (Surface): Sprite pointing right
+            angle (float): Angle in radians, screen y pointing down
+            flipped (bool): Flip the sprite vertically before rotating
+
+        Returns:
+            Surface: The rotated sprite
+        """
+        key = (sprite, self.step(angle), flipped)
+        entries = self.entries
+        rotated = entries.get(key)
+        if rotated is not None:
+            entries.move_to_end(key)
+            self.hits += 1
+            return rotated
+
+        self.misses += 1
+        if flipped:
+            sprite = pygame.transform.flip(sprite, False, True)
+        rotated = pygame.transform.rotate(sprite, -360 * key[1] / self.steps)
+        entries[key] = surface_memory.track(rotated, self.subsystem)
+        if len(entries) > self.capacity:
+            entries.popitem(last=False)
+        return rotated
+
+    def clear(self):
+        """Drop every rendered copy"""
+        self.entries.clear()
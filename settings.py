@@ -3,10 +3,6 @@ Game constants and settings
 """
 import pygame
 
-# Initialize pygame (if not already done)
-if not pygame.get_init():
-    pygame.init()
-
 # Game constants
 WIDTH = 800
 HEIGHT = 600
@@ -36,11 +32,35 @@ GRASS_GREEN = (76, 153, 0)
 DIRT_BROWN = (101, 67, 33)
 
 # Fonts
-pygame.font.init()  # Initialize font system
-TITLE_FONT = pygame.font.Font(None, 80)
-MENU_FONT = pygame.font.Font(None, 50)
-UI_FONT = pygame.font.Font(None, 36)
-DEBUG_FONT = pygame.font.Font(None, 24)
+class LazyFont:
+    """Font that initializes the font system and loads itself on first use"""
+    
+    def __init__(self, point_size):
+        self.point_size = point_size
+        self._font = None
+    
+    def _load(self):
+        if self._font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            self._font = pygame.font.Font(None, self.point_size)
+        return self._font
+    
+    def __getattr__(self, name):
+        # Only called for attributes LazyFont doesn't have, e.g. size()
+        return getattr(self._load(), name)
+    
+    def render(self, *args, **kwargs):
+        """Render text, counting the new surface as text memory"""
+        # Imported here since surface_memory itself imports settings
+        from surface_memory import surface_memory
+        return surface_memory.track(self._load().render(*args, **kwargs), "text")
+
+TITLE_FONT = LazyFont(80)
+MENU_FONT = LazyFont(50)
+UI_FONT = LazyFont(36)
+DEBUG_FONT = LazyFont(24)
+SMALL_DEBUG_FONT = LazyFont(20)
 
 # Menu options
 MENU_OPTIONS = ["Play", "Level Select", "Controls", "Exit"]
@@ -51,6 +71,9 @@ VICTORY_OPTIONS = ["Next Level", "Main Menu"]
 
 # Game difficulty settings
 MAX_WAVES = 10  # Number of waves to complete for victory
+WAVE_BASE_ENEMIES = 5  # Wave N spawns WAVE_BASE_ENEMIES + N zombies
+SPAWN_PER_TICK = 4  # Most zombies a wave brings in per tick
+SPAWN_OFFSETS = (WIDTH, WIDTH + 200, WIDTH + 400, -WIDTH, -WIDTH - 200)  # Spawn points from the player's world x
 
 # In settings.py
 PLAYER_WIDTH = 40  # Set to match sprite width
@@ -67,11 +90,216 @@ ZOMBIE_MAX_HEALTH = 50
 ZOMBIE_DAMAGE = 10
 ZOMBIE_ATTACK_COOLDOWN = 30
 
+# Enemy types, each shared by every enemy of that type. Clips are
+# (path, frames): a path with {direction} and {i} names one image per
+# frame, any other path is a right-facing sheet of square frames.
+# New types go at the end, their position is saved in snapshots.
+ENEMY_TYPES = {
+    "zombie": {
+        "size": (int(PLAYER_WIDTH * 0.9), int(PLAYER_HEIGHT * 0.9)),
+        "speed": ZOMBIE_SPEED,
+        "max_health": ZOMBIE_MAX_HEALTH,
+        "damage": ZOMBIE_DAMAGE,
+        "attack_cooldown": ZOMBIE_ATTACK_COOLDOWN,
+        "attack_range": 50,  # Starts attacking when this close to the player
+        "attack_duration": 40,  # Frames for attack animation
+        "score": 100,
+        "color": BROWN,  # Drawn when sprites are missing
+        "animation_delay": 10,  # Frames between sprite changes
+        "first_wave": 1,
+        "spawn_weight": 4,
+        "clips": {
+            "run": ("assets/enemy/zombie_run_{direction}_{i}.png", 4),
+            "idle": ("assets/enemy/zombie_idle_{direction}_{i}.png", 2),
+            "attack": ("assets/enemy/zombie_attack_{direction}_{i}.png", 4),
+        },
+    },
+    "chonker": {
+        "size": (50, 70),
+        "speed": 1,
+        "max_health": 150,
+        "damage": 20,
+        "attack_cooldown": 45,
+        "attack_range": 55,
+        "attack_duration": 50,
+        "score": 300,
+        "color": (90, 110, 40),
+        "animation_delay": 14,
+        "first_wave": 3,
+        "spawn_weight": 1,
+        "clips": {
+            "run": ("Zombie Asset Pack/enemies/chonker/chonker_run.png", 4),
+            "idle": ("Zombie Asset Pack/enemies/chonker/chonker_idle.png", 2),
+            "attack": ("Zombie Asset Pack/enemies/chonker/chonker_attack.png", 4),
+        },
+    },
+}
+
+# Timer settings
+TIMER_WHEEL_BITS = 6  # Each timing wheel level has 2**bits slots
+TIMER_WHEEL_LEVELS = 4  # Levels of the timing wheel, covering 2**(bits*levels) ticks
+
 # Projectile settings
 PROJECTILE_RADIUS = 5
 PROJECTILE_SPEED = 10
 PROJECTILE_DAMAGE = 25
 PROJECTILE_MAX_AGE = 120  # Max frames a projectile can exist
 
+# Weapons, selected with the number keys in this order
+WEAPONS = {
+    "pistol": {
+        "sprite": ("Zombie Asset Pack/weapons/pistol.png", 1),  # (sheet, frames); later frames play while reloading
+        "fire_interval": 8,  # Ticks between shots
+        "automatic": False,  # Keeps firing while the trigger is held, instead of once per pull
+        "pellets": 1,  # Projectiles per shot
+        "spread": 0,  # Degrees the pellets of a shot fan out across
+        "jitter": 0,  # Random degrees added to each pellet's direction
+        "projectile": {"speed": PROJECTILE_SPEED, "damage": PROJECTILE_DAMAGE,
+                       "radius": PROJECTILE_RADIUS, "max_age": PROJECTILE_MAX_AGE},
+    },
+    "automatic rifle": {
+        "sprite": ("Zombie Asset Pack/weapons/automatic rifle.png", 1),
+        "fire_interval": 5,
+        "automatic": True,
+        "pellets": 1,
+        "spread": 0,
+        "jitter": 3,
+        "projectile": {"speed": 14, "damage": 15, "radius": 3, "max_age": 90},
+    },
+    "shotgun": {
+        "sprite": ("Zombie Asset Pack/weapons/shotgun.png", 2),
+        "fire_interval": 35,
+        "automatic": False,
+        "pellets": 7,
+        "spread": 20,
+        "jitter": 2,
+        "projectile": {"speed": 11, "damage": 12, "radius": 3, "max_age": 35},
+    },
+    "sawed off shotgun": {
+        "sprite": ("Zombie Asset Pack/weapons/sawed off shotgun.png", 7),
+        "fire_interval": 55,
+        "automatic": False,
+        "pellets": 10,
+        "spread": 36,
+        "jitter": 3,
+        "projectile": {"speed": 10, "damage": 12, "radius": 3, "max_age": 22},
+    },
+}
+WEAPON_SCALE = 2  # Weapon sprites are drawn this many times their pixel size
+WEAPON_HOLD_DISTANCE = 14  # Pixels from the player's center to the weapon and muzzle
+ROTATION_STEPS = 64  # Directions aimed sprites are pre-rotated to
+ROTATION_CACHE_SIZE = 512  # Most rotated sprites kept before the least recently drawn is dropped
+
+# Particle effects
+PARTICLE_BUDGET = 2048  # Most particles alive at once; new ones replace the oldest past this
+PARTICLE_FRAMES = 4  # Sprites per effect, each smaller and fainter, played over a particle's life
+PARTICLE_EFFECTS = {
+    "muzzle flash": {
+        "color": (255, 220, 120),
+        "size": 4,  # Radius in pixels of the first frame
+        "count": 6,  # Particles per burst
+        "speed": (1.5, 4.0),  # Range of starting speeds in pixels per tick
+        "spread": 30,  # Degrees the burst fans out across around its direction
+        "lifetime": (4, 8),  # Range of ticks a particle lives
+        "gravity": 0.0,  # Added to vertical speed each tick
+        "drag": 0.8,  # Speed kept each tick
+    },
+    "hit spark": {
+        "color": (255, 240, 180),
+        "size": 2,
+        "count": 5,
+        "speed": (2.0, 5.0),
+        "spread": 90,
+        "lifetime": (6, 12),
+        "gravity": 0.2,
+        "drag": 0.9,
+    },
+    "blood": {
+        "color": (150, 10, 10),
+        "size": 3,
+        "count": 8,
+        "speed": (1.0, 4.0),
+        "spread": 70,
+        "lifetime": (15, 30),
+        "gravity": 0.35,
+        "drag": 0.95,
+    },
+    "death burst": {
+        "color": (110, 0, 0),
+        "size": 4,
+        "count": 30,
+        "speed": (1.0, 6.0),
+        "spread": 360,
+        "lifetime": (20, 40),
+        "gravity": 0.3,
+        "drag": 0.94,
+    },
+}
+
 # Debug settings
-DEBUG_MODE = False
\ No newline at end of file
+DEBUG_MODE = False
+PROFILER_HISTORY = 240  # Frames of timing history kept per profiler scope
+SNAPSHOT_SECONDS = 5  # Seconds of gameplay kept in the rewind buffer
+SNAPSHOT_MAX_ZOMBIES = 256  # Zombies that fit in one snapshot
+SNAPSHOT_MAX_PROJECTILES = 256  # Projectiles that fit in one snapshot
+
+# Level settings
+LEVELS_DIR = "levels"  # Holds levelN.json sources and compiled levelN.lvl files
+PLATFORM_TILE = "assets/environment/platform.png"
+TILESET_DIR = "Zombie Asset Pack"  # Holds the tileset sheets used by the tilemap layer
+CHUNK_WIDTH = 512  # Width of one streamed level chunk in pixels
+CHUNK_PREFETCH = 1  # Chunks baked ahead of the right edge of the screen
+CHUNK_KEEP_BEHIND = 1  # Chunks kept loaded behind the left edge of the screen
+
+# Navigation settings
+NAV_CELL = 32  # Width of one flow field cell in pixels
+NAV_JUMP_POWER = PLAYER_JUMP_POWER  # Zombies jump as high as the player
+NAV_JUMP_SPEED = 3  # Horizontal pixels per tick while a zombie leaps, whatever its walking speed
+NAV_GROUND_MARGIN = WIDTH * 2  # Ground the graph covers beyond either end of the level
+NAV_FIELD_CACHE = 64  # Flow fields kept, one per goal cell
+
+# Simulation level of detail
+LOD_ACTIVE_MARGIN = 200  # Zombies this far beyond the screen edges get full updates
+LOD_FAR_INTERVAL = 4  # Ticks between the simplified updates of zombies outside the margin
+
+# Crowd separation
+CROWD_CELL = 64  # Width of a neighbour grid cell in pixels
+CROWD_SPACING = 0.6  # Closest zombie centers come, as a fraction of their combined half widths
+CROWD_PUSH = 3  # Most a zombie is pushed aside per tick, more than any zombie walks
+
+# Network settings
+NET_PORT = 5555  # UDP port the server listens on
+NET_MAX_PLAYERS = 4
+NET_SNAPSHOT_INTERVAL = 2  # Ticks between snapshots sent to each client
+NET_VIEW_MARGIN = 200  # Entities this far outside a client's screen are still sent
+NET_MAX_VIEW_ENTITIES = 96  # Closest entities sent per snapshot, keeps packets under ~1200 bytes
+NET_HISTORY = 64  # Snapshots kept as delta baselines
+NET_TIMEOUT = 5.0  # Seconds without input before a client is dropped
+
+# Agent environment settings
+ENV_NEAREST_ZOMBIES = 8  # Zombies described in each observation, nearest first
+ENV_NEAREST_PROJECTILES = 4  # Projectiles described in each observation, nearest first
+ENV_ACTION_REPEAT = 4  # Ticks simulated per environment step
+ENV_MAX_TICKS = FPS * 60 * 5  # Episodes are truncated after this many ticks
+ENV_SCORE_WEIGHT = 0.01  # Reward per point scored (a kill is worth 1)
+ENV_DAMAGE_WEIGHT = 0.05  # Penalty per point of damage taken
+
+# Soak test settings
+SOAK_SAMPLE_SECONDS = 60  # Simulated seconds between memory and frame time samples
+SOAK_WARMUP_SAMPLES = 3  # Samples ignored while caches fill
+SOAK_TARGET_HOURS = 12  # Uptime the soak report projects memory to
+SOAK_GROWTH_RATIO = 0.75  # Share of rising samples that counts as monotonic growth
+SOAK_DRIFT_LIMIT = 1.25  # Late over early frame time ratio that counts as drift
+SOAK_MEMORY_LIMIT_MB = 512  # Projected memory above this fails the soak
+
+# Asset settings
+ASSET_DIRS = ("assets", "Zombie Asset Pack")  # Directories covered by the asset manifest
+ASSET_MANIFEST_FILE = ".cache/asset_manifest.json"
+
+# Logging settings
+LOG_FILE = "debug_log.txt"
+LOG_LEVEL = "INFO"  # DEBUG, INFO, WARNING or ERROR
+LOG_BUFFER_SIZE = 4096  # Max records waiting for the writer thread
+LOG_FLUSH_INTERVAL = 0.25  # Seconds between writer thread flushes
+LOG_MAX_BYTES = 1024 * 1024  # Rotate the log file once it grows past this
+LOG_BACKUP_COUNT = 3  # Rotated log files to keep
@@ -0,0 +1,282 @@
+"""
+Long-session soak test
+
+Drives the scripted bot through game after game, restarting in place the
+way Try Again does, and samples Python heap (tracemalloc) and surface
+memory, live object counts and frame time at intervals. The report flags
+anything that grows monotonically or frame times that drift upward, and
+projects memory out to SOAK_TARGET_HOURS of uptime for a go/no-go verdict.
+
+Run with: python soak.py [--waves N] [--minutes N] [--render] [--report FILE]
+Pass --render to draw every frame to the dummy display as well. tracemalloc
+slows every tick down, so frame times are only comparable within a session.
+"""
+import sys
+import json
+import time
+import argparse
+import statistics
+import tracemalloc
+import pygame
+from settings import (
+    WIDTH, HEIGHT, FPS, GAMEOVER, VICTORY,
+    SOAK_SAMPLE_SECONDS, SOAK_WARMUP_SAMPLES, SOAK_TARGET_HOURS,
+    SOAK_GROWTH_RATIO, SOAK_DRIFT_LIMIT, SOAK_MEMORY_LIMIT_MB
+)
+from headless import init_headless, HeadlessManager, ScriptedBot
+from surface_memory import surface_memory
+
+# Games without a cleared wave for this long are restarted
+STALL_TICKS = FPS * 120
+
+# Samples needed after warm-up before trends are judged
+MIN_SAMPLES = 5
+
+# Sampled metrics that should stay flat over a session; byte counts are
+# projected to the target uptime
+MEMORY_METRICS = ("heap_bytes", "surface_bytes")
+COUNT_METRICS = ("surfaces", "surface_allocations", "debug_messages", "enemies", "zombie_pool",
+                 "projectiles", "chunks")
+
+def heap_snapshot():
+    """tracemalloc snapshot without the soak harness's own allocations"""
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ))
+
+def trend(times, values):
+    """
+    Slope per hour and share of rising samples
+
+    Returns:
+        tuple: (slope per simulated hour, share of samples higher than the one before)
+    """
+    if len(values) < 2 or len(set(times)) < 2:
+        return 0.0, 0.0
+    slope, _ = statistics.linear_regression(times, values)
+    rises = sum(1 for a, b in zip(values, values[1:]) if b > a)
+    return slope, rises / (len(values) - 1)
+
+class SoakTest:
+    """One soak session and the samples taken during it"""
+
+    def __init__(self, level=1, seed=0, render=False):
+        from game_states import GameplayState
+
+        init_headless()
+        self.render = render
+        if render:
+            from level import initialize_level_graphics
+            self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+            initialize_level_graphics()
+
+        self.manager = HeadlessManager()
+        self.state = GameplayState(self.manager, level, seed=seed)
+        self.bot = ScriptedBot()
+
+        self.ticks = 0
+        self.games = 1
+        self.waves_cleared = 0
+        self.victories = 0
+        self.deaths = 0
+        self.samples = []
+        self.baseline = None  # tracemalloc snapshot taken after warm-up
+
+    def sample(self, frame_times, allocations):
+        """Record memory, object counts and the frame times since the last sample"""
+        from debug import debug_messages
+
+        state = self.state
+        heap = heap_snapshot()
+        sample = {
+            "hours": self.ticks / FPS / 3600,
+            "heap_bytes": sum(stat.size for stat in heap.statistics("filename")),
+            "surface_bytes": surface_memory.total_bytes(),
+            "surfaces": sum(surface_memory.resident_count.values()),
+            "surface_allocations": allocations / len(frame_times),
+            "debug_messages": len(debug_messages),
+            "enemies": len(state.enemies),
+            "zombie_pool": len(state.zombie_pool),
+            "projectiles": len(state.projectiles),
+            "chunks": len(state.streamer.chunks),
+            "frame_ms": statistics.fmean(frame_times) * 1000,
+            "frame_ms_max": max(frame_times) * 1000,
+            "waves_cleared": self.waves_cleared,
+        }
+        for name, size in surface_memory.resident_bytes.items():
+            sample[f"surface_bytes.{name}"] = size
+        self.samples.append(sample)
+        if len(self.samples) == SOAK_WARMUP_SAMPLES:
+            self.baseline = heap
+
+    def run(self, max_waves=None, max_ticks=None):
+        """Play until either limit is reached, sampling every SOAK_SAMPLE_SECONDS"""
+        state = self.state
+        manager = self.manager
+        sample_ticks = SOAK_SAMPLE_SECONDS * FPS
+        frame_times = []
+        allocations = 0
+        wave = state.wave
+        last_progress = 0
+
+        tracemalloc.start()
+        while True:
+            start = time.perf_counter()
+            self.bot.act(state)
+            state.update()
+            if self.render:
+                state.draw(self.screen)
+            frame_times.append(time.perf_counter() - start)
+            surface_memory.end_frame()
+            allocations += surface_memory.allocation_history[-1]
+            self.ticks += 1
+
+            if state.wave > wave:
+                self.waves_cleared += state.wave - wave
+                last_progress = state.tick
+            wave = state.wave
+
+            # Restart in place like Try Again, also when the bot is stuck
+            if manager.outcome is not None or state.tick - last_progress > STALL_TICKS:
+                self.victories += manager.outcome == VICTORY
+                self.deaths += manager.outcome == GAMEOVER
+                manager.outcome = None
+                state.reset()
+                wave = state.wave
+                last_progress = 0
+                self.games += 1
+
+            if self.ticks % sample_ticks == 0:
+                self.sample(frame_times, allocations)
+                frame_times = []
+                allocations = 0
+                if ((max_waves and self.waves_cleared >= max_waves) or
+                        (max_ticks and self.ticks >= max_ticks)):
+                    break
+
+        self.top_growth = []
+        if self.baseline is not None:
+            stats = heap_snapshot().compare_to(self.baseline, "lineno")
+            self.top_growth = [(str(s.traceback), s.size_diff) for s in stats[:10] if s.size_diff > 0]
+        tracemalloc.stop()
+
+    def report(self):
+        """
+        Judge the session
+
+        Returns:
+            dict: Per-metric trends, frame time drift, findings and a verdict
+        """
+        samples = self.samples[SOAK_WARMUP_SAMPLES:]
+        report = {
+            "simulated_hours": self.ticks / FPS / 3600,
+            "ticks": self.ticks,
+            "games": self.games,
+            "waves_cleared": self.waves_cleared,
+            "victories": self.victories,
+            "deaths": self.deaths,
+            "metrics": {},
+            "findings": [],
+            "top_growth": self.top_growth,
+            "samples": self.samples,
+        }
+        if len(samples) < MIN_SAMPLES:
+            report["findings"].append("Too few samples after warm-up to judge; run longer")
+            report["verdict"] = "NO-GO"
+            return report
+
+        hours = [s["hours"] for s in samples]
+        remaining = max(SOAK_TARGET_HOURS - hours[-1], 0)
+        projected_total = 0
+        subsystems = sorted(name for name in samples[-1] if name.startswith("surface_bytes."))
+        for name in MEMORY_METRICS + COUNT_METRICS + tuple(subsystems):
+            values = [s.get(name, 0) for s in samples]
+            slope, rising = trend(hours, values)
+            projected = values[-1] + max(slope, 0) * remaining
+            growing = rising >= SOAK_GROWTH_RATIO and values[-1] > values[0]
+            report["metrics"][name] = {
+                "start": values[0], "end": values[-1], "per_hour": slope,
+                "rising": rising, "projected": projected, "growing": growing,
+            }
+            if name in MEMORY_METRICS:
+                projected_total += projected
+            if growing:
+                report["findings"].append(
+                    f"{name} grows monotonically: {values[0]} -> {values[-1]} "
+                    f"({rising:.0%} of samples rising, {slope:+.0f}/hour)")
+
+        report["projected_mb"] = projected_total / (1024 * 1024)
+        if report["projected_mb"] > SOAK_MEMORY_LIMIT_MB:
+            report["findings"].append(
+                f"Memory projected to {report['projected_mb']:.0f} MB after {SOAK_TARGET_HOURS} hours "
+                f"(limit {SOAK_MEMORY_LIMIT_MB} MB)")
+
+        # Compare the first and last quarters so one slow wave doesn't count as drift
+        quarter = max(len(samples) // 4, 1)
+        early = statistics.median(s["frame_ms"] for s in samples[:quarter])
+        late = statistics.median(s["frame_ms"] for s in samples[-quarter:])
+        report["frame_ms_early"] = early
+        report["frame_ms_late"] = late
+        report["frame_drift"] = late / early if early else 1.0
+        if report["frame_drift"] > SOAK_DRIFT_LIMIT:
+            report["findings"].append(
+                f"Frame time drifts from {early:.3f} ms to {late:.3f} ms ({report['frame_drift']:.2f}x)")
+
+        report["verdict"] = "NO-GO" if report["findings"] else "GO"
+        return report
+
+def print_report(report):
+    print(f"Simulated {report['simulated_hours']:.2f} hours ({report['ticks']} ticks): "
+          f"{report['games']} games, {report['waves_cleared']} waves cleared, "
+          f"{report['victories']} victories, {report['deaths']} deaths")
+    if report["metrics"]:
+        print()
+        print(f"{'metric':<24} {'start':>12} {'end':>12} {'per hour':>12} {'rising':>7} "
+              f"{f'at {SOAK_TARGET_HOURS}h':>12}")
+        for name, m in report["metrics"].items():
+            print(f"{name:<24} {m['start']:>12.0f} {m['end']:>12.0f} {m['per_hour']:>+12.0f} "
+                  f"{m['rising']:>7.0%} {m['projected']:>12.0f}{'  GROWING' if m['growing'] else ''}")
+        print()
+        print(f"Frame time: {report['frame_ms_early']:.3f} ms early, {report['frame_ms_late']:.3f} ms late "
+              f"({report['frame_drift']:.2f}x)")
+        print(f"Projected memory after {SOAK_TARGET_HOURS} hours: {report['projected_mb']:.1f} MB")
+    if report["top_growth"]:
+        print()
+        print("Largest heap growth since warm-up:")
+        for where, size in report["top_growth"]:
+            print(f"  {size / 1024:+10.1f} KiB  {where}")
+    print()
+    for finding in report["findings"]:
+        print(f"- {finding}")
+    print(f"Verdict: {report['verdict']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test the game for memory growth and frame time drift")
+    parser.add_argument("--waves", type=int, default=2000, help="stop after this many waves are cleared")
+    parser.add_argument("--minutes", type=float, help="stop after this much simulated time instead")
+    parser.add_argument("--level", type=int, default=1, help="level to play")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--render", action="store_true", help="draw every frame to the dummy display")
+    parser.add_argument("--report", help="write the full report and samples to this JSON file")
+    args = parser.parse_args()
+
+    from debug import set_log_level, ERROR
+    set_log_level(ERROR)
+
+    soak = SoakTest(args.level, args.seed, args.render)
+    if args.minutes:
+        soak.run(max_ticks=int(args.minutes * 60 * FPS))
+    else:
+        soak.run(max_waves=args.waves)
+    report = soak.report()
+    print_report(report)
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote report to {args.report}")
+    return 0 if report["verdict"] == "GO" else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Spawn director that spreads each wave over several ticks
+
+Starting a wave queues its zombies instead of creating them all at once;
+update() brings in at most SPAWN_PER_TICK of them each tick, so a wave
+transition costs no more than an ordinary tick. A wave's composition is
+drawn when the wave before it starts, which lets a game that draws load
+the sprites of an enemy type a whole wave before the first one appears. Spawn
+points are checked against the level index: a zombie only appears off
+every player's screen, standing clear of platforms and blocking obstacles.
+"""
+from collections import deque
+from settings import WIDTH, GROUND_LEVEL, SPAWN_PER_TICK, SPAWN_OFFSETS
+from debug import add_debug
+from enemy import Zombie
+
+class SpawnDirector:
+    """Queued and planned spawns of one simulation"""
+
+    def __init__(self, level_data, timers, pool, tuning, rng, per_tick=SPAWN_PER_TICK, preload=False):
+        """
+        Args:
+            level_data (LevelData): Level the zombies spawn into
+            timers (TimingWheel): Timing wheel new zombies schedule their timers on
+            pool (list): Dead zombies, respawned before new ones are created
+            tuning (Tuning): Wave count and the enemy types waves are drawn from
+            rng (random.Random): Random generator of the game, for wave makeup and spawn points
+            per_tick (int): Most zombies spawned in one tick
+            preload (bool): Load the sprites of each type as soon as it is planned
+        """
+        self.level_data = level_data
+        self.timers = timers
+        self.pool = pool
+        self.tuning = tuning
+        self.rng = rng
+        self.per_tick = per_tick
+        self.preload = preload
+        self.queue = deque()  # EnemyTypes of the current wave still to spawn
+        self.planned = []  # EnemyTypes of the next wave
+        self.planned_wave = 0  # Wave the plan is for
+        self.upcoming_types = set()  # Types queued or planned
+
+    def clear(self):
+        """Drop every queued and planned spawn"""
+        self.queue.clear()
+        self.planned = []
+        self.planned_wave = 0
+        self.upcoming_types = set()
+
+    @property
+    def pending(self):
+        """Zombies of the current wave still to spawn"""
+        return len(self.queue)
+
+    def start_wave(self, wave, size, next_size):
+        """
+        Queue a wave's zombies and plan the next wave
+
+        Args:
+            wave (int): Wave number
+            size (int): Zombies in the wave, if it wasn't planned already
+            next_size (int): Zombies in the following wave
+        """
+        if self.planned_wave != wave:
+            self.planned = [self.tuning.choose_enemy_type(wave, self.rng) for _ in range(size)]
+        self.queue.extend(self.planned)
+        if wave < self.tuning.max_waves:
+            self.planned = [self.tuning.choose_enemy_type(wave + 1, self.rng) for _ in range(next_size)]
+        else:
+            self.planned = []
+        self.planned_wave = wave + 1
+        self.types_changed()
+        add_debug("Wave %d queued: %d zombies", wave, len(self.queue))
+
+    def types_changed(self):
+        """Recount the types ahead after the queue or plan was replaced"""
+        self.upcoming_types = set(self.queue).union(self.planned)
+        if self.preload:
+            for enemy_type in self.upcoming_types:
+                enemy_type.preload()
+
+    def spawn_point(self, enemy_type, player_world_x, cameras):
+        """
+        Choose where a zombie of the given type appears
+
+        Args:
+            enemy_type (EnemyType): Type being spawned
+            player_world_x (float): World x the spawn offsets are measured from
+            cameras (list): Camera offsets of every screen the zombie must be off
+
+        Returns:
+            tuple: World (x, y), or None if no spawn point is usable this tick
+        """
+        width, height = enemy_type.width, enemy_type.height
+        y = GROUND_LEVEL - height
+        usable = []
+        for offset in SPAWN_OFFSETS:
+            x = player_world_x + offset
+            if any(x + width > camera and x < camera + WIDTH for camera in cameras):
+                continue
+            if any(rect.check_collision(x, y, width, height)
+                   for rect in self.level_data.collision.query(x, x + width)):
+                continue
+            if any(o.blocks_enemies and o.check_collision(x, y, width, height)
+                   for o in self.level_data.obstacle_index.query(x, x + width)):
+                continue
+            usable.append(x)
+        if not usable:
+            return None
+        return self.rng.choice(usable), y
+
+    def update(self, enemies, player_world_x, cameras):
+        """
+        Spawn up to per_tick queued zombies
+
+        Args:
+            enemies (list): Live zombies, which spawned ones are added to
+            player_world_x (float): World x the spawn offsets are measured from
+            cameras (list): Camera offsets of every screen zombies must spawn off
+
+        Returns:
+            list: Zombies spawned this tick
+        """
+        spawned = []
+        queue = self.queue
+        while queue and len(spawned) < self.per_tick:
+            point = self.spawn_point(queue[0], player_world_x, cameras)
+            if point is None:
+                # Try again next tick, once the players have moved
+                break
+            enemy_type = queue.popleft()
+            if self.pool:
+                zombie = self.pool.pop()
+                zombie.reset(point[0], point[1], enemy_type)
+            else:
+                zombie = Zombie(point[0], point[1], enemy_type, self.timers)
+            enemies.append(zombie)
+            spawned.append(zombie)
+        return spawned
@@ -0,0 +1,142 @@
+"""
+Surface memory accounting
+
+Every Surface the game keeps or creates per frame is passed through
+track() with the subsystem it belongs to. The accounting keeps resident
+pixel bytes and surface counts per subsystem, releasing them when a
+Surface is garbage collected, and counts the surfaces created each frame.
+The debug overlay shows the totals and write_report() exports them.
+"""
+import json
+import time
+import weakref
+from collections import deque
+import pygame
+from settings import DEBUG_FONT, WHITE, BLACK, PROFILER_HISTORY
+
+# Overlay layout, sized to fit between the HUD and the debug messages
+PANEL_WIDTH = 300
+PANEL_ROWS = 6  # Largest subsystems listed
+
+def surface_bytes(surface):
+    """
+    Pixel bytes owned by a surface
+
+    Subsurfaces share their parent's pixels, so they own nothing.
+    """
+    if surface.get_parent() is not None:
+        return 0
+    return surface.get_pitch() * surface.get_height()
+
+class SurfaceAccounting:
+    """Resident surface memory and per-frame surface allocations by subsystem"""
+
+    def __init__(self, history=PROFILER_HISTORY):
+        self.resident_bytes = {}  # Subsystem -> bytes held by live surfaces
+        self.resident_count = {}  # Subsystem -> live surfaces
+        self.peak_bytes = {}      # Subsystem -> highest resident bytes seen
+        self.created = {}         # Subsystem -> surfaces created since startup
+        self.frame_allocations = {}  # Subsystem -> surfaces created this frame
+        self.last_frame = {}      # Subsystem -> surfaces created last frame
+        self.allocation_history = deque(maxlen=history)  # Surfaces created per frame
+
+    def track(self, surface, subsystem):
+        """
+        Attribute a surface to a subsystem until it is garbage collected
+
+        Returns:
+            Surface: The same surface, so creation sites can wrap their call
+        """
+        size = surface_bytes(surface)
+        self.resident_bytes[subsystem] = self.resident_bytes.get(subsystem, 0) + size
+        self.resident_count[subsystem] = self.resident_count.get(subsystem, 0) + 1
+        if self.resident_bytes[subsystem] > self.peak_bytes.get(subsystem, 0):
+            self.peak_bytes[subsystem] = self.resident_bytes[subsystem]
+        self.created[subsystem] = self.created.get(subsystem, 0) + 1
+        self.frame_allocations[subsystem] = self.frame_allocations.get(subsystem, 0) + 1
+
+        # Runs when the surface is collected; not needed at interpreter exit
+        weakref.finalize(surface, self._release, subsystem, size).atexit = False
+        return surface
+
+    def track_all(self, surfaces, subsystem):
+        """Track every surface in a nested dict/list of surfaces, e.g. a sprite set"""
+        stack = [surfaces]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, pygame.Surface):
+                self.track(item, subsystem)
+            elif isinstance(item, dict):
+                stack.extend(item.values())
+            elif isinstance(item, (list, tuple)):
+                stack.extend(item)
+        return surfaces
+
+    def _release(self, subsystem, size):
+        self.resident_bytes[subsystem] -= size
+        self.resident_count[subsystem] -= 1
+
+    def end_frame(self):
+        """Close the current frame's allocation counts"""
+        self.last_frame = self.frame_allocations
+        self.frame_allocations = {}
+        self.allocation_history.append(sum(self.last_frame.values()))
+
+    def total_bytes(self):
+        return sum(self.resident_bytes.values())
+
+    def report(self):
+        """
+        Per-subsystem totals, largest first
+
+        Returns:
+            dict: {"total_bytes", "subsystems": {name: {...}}, "allocations_per_frame"}
+        """
+        subsystems = {}
+        for name in sorted(self.resident_bytes, key=self.resident_bytes.get, reverse=True):
+            subsystems[name] = {
+                "bytes": self.resident_bytes[name],
+                "surfaces": self.resident_count[name],
+                "peak_bytes": self.peak_bytes.get(name, 0),
+                "created": self.created.get(name, 0),
+                "last_frame_allocations": self.last_frame.get(name, 0),
+            }
+        history = self.allocation_history
+        return {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "total_bytes": self.total_bytes(),
+            "subsystems": subsystems,
+            "allocations_per_frame": {
+                "mean": sum(history) / len(history) if history else 0.0,
+                "max": max(history, default=0),
+            },
+        }
+
+    def write_report(self, path):
+        """Export the current report as JSON"""
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def draw_overlay(self, screen, x=10, y=150):
+        """Draw resident MB, surface count and last frame's allocations of the largest subsystems"""
+        names = sorted(self.resident_bytes, key=self.resident_bytes.get, reverse=True)[:PANEL_ROWS]
+        pygame.draw.rect(screen, BLACK, (x - 5, y - 5, PANEL_WIDTH, 28 + 16 * len(names)))
+
+        history = self.allocation_history
+        text = DEBUG_FONT.render(
+            f"surfaces {self.total_bytes() / 1048576:.1f} MB  "
+            f"allocs/frame {history[-1] if history else 0} (max {max(history, default=0)})",
+            True, WHITE)
+        screen.blit(text, (x, y))
+        y += 18
+
+        for name in names:
+            text = DEBUG_FONT.render(
+                f"{name}  {self.resident_bytes[name] / 1048576:.2f} MB  "
+                f"{self.resident_count[name]}  +{self.last_frame.get(name, 0)}",
+                True, WHITE)
+            screen.blit(text, (x, y))
+            y += 16
+
+# Global accounting shared by every module that creates surfaces
+surface_memory = SurfaceAccounting()
@@ -0,0 +1,84 @@
+"""
+Binary per-frame telemetry stream
+
+Each gameplay frame is packed into a fixed-size record and written to a
+telemetry file by a background thread. Use telemetry_analyzer.py to
+summarize a recorded session.
+"""
+import struct
+import threading
+import queue
+import time
+
+# File header: magic, format version, record size, session start (unix time)
+HEADER_FORMAT = "<4sHHd"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+MAGIC = b"ZFTL"
+VERSION = 1
+
+# Record fields, in file order. Keep in sync with RECORD_FORMAT.
+RECORD_FIELDS = (
+    "frame",        # uint32 frame number since recording started
+    "wave",         # uint16 current wave
+    "enemies",      # uint16 live enemies
+    "projectiles",  # uint16 live projectiles
+    "collisions",   # uint32 collision tests this frame
+    "hits",         # uint16 projectile hits this frame
+    "frame_ms",     # float32 total frame time (without the FPS cap sleep)
+    "update_ms",    # float32 simulation update time
+    "camera_x",     # float32 camera offset
+)
+RECORD_FORMAT = "<IHHHIHfff"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+# Records packed in memory before a batch is handed to the writer thread
+BATCH_RECORDS = 1024
+
+class TelemetryWriter:
+    """Packs per-frame records into a buffer and writes them in batches"""
+
+    def __init__(self, path):
+        self.path = path
+        self.frame = 0
+        self._record = struct.Struct(RECORD_FORMAT)
+        self._buffer = bytearray(RECORD_SIZE * BATCH_RECORDS)
+        self._count = 0
+
+        # File writes happen on a background thread, never on the frame thread
+        self._batches = queue.SimpleQueue()
+        self._batches.put(struct.pack(HEADER_FORMAT, MAGIC, VERSION, RECORD_SIZE, time.time()))
+        self._thread = threading.Thread(target=self._write_batches, name="TelemetryWriter", daemon=True)
+        self._thread.start()
+
+    def _write_batches(self):
+        with open(self.path, "wb") as f:
+            while True:
+                batch = self._batches.get()
+                if batch is None:
+                    break
+                f.write(batch)
+                f.flush()
+
+    def record(self, wave, enemies, projectiles, collisions, hits, frame_ms, update_ms, camera_x):
+        """Append one frame of metrics"""
+        self._record.pack_into(
+            self._buffer, self._count * RECORD_SIZE,
+            self.frame, wave, enemies, projectiles, collisions, hits,
+            frame_ms, update_ms, camera_x
+        )
+        self.frame += 1
+        self._count += 1
+        if self._count == BATCH_RECORDS:
+            self.flush()
+
+    def flush(self):
+        """Hand the buffered records to the writer thread"""
+        if self._count:
+            self._batches.put(bytes(self._buffer[:self._count * RECORD_SIZE]))
+            self._count = 0
+
+    def close(self):
+        """Write out everything recorded so far and stop the writer thread"""
+        self.flush()
+        self._batches.put(None)
+        self._thread.join()
@@ -0,0 +1,177 @@
+"""
+Offline analyzer for telemetry files recorded with --telemetry
+
+Summarizes frame time against entity counts across a whole session and
+finds the first wave where frames start missing their budget.
+
+Run with: python telemetry_analyzer.py telemetry.bin [--plot FILE]
+Requires NumPy; plotting also requires matplotlib.
+"""
+import sys
+import mmap
+import struct
+import argparse
+import numpy as np
+
+from settings import FPS
+from telemetry import (
+    HEADER_FORMAT, HEADER_SIZE, MAGIC, VERSION, RECORD_SIZE
+)
+
+# NumPy view of one telemetry record, matching telemetry.RECORD_FORMAT
+RECORD_DTYPE = np.dtype([
+    ("frame", "<u4"),
+    ("wave", "<u2"),
+    ("enemies", "<u2"),
+    ("projectiles", "<u2"),
+    ("collisions", "<u4"),
+    ("hits", "<u2"),
+    ("frame_ms", "<f4"),
+    ("update_ms", "<f4"),
+    ("camera_x", "<f4"),
+])
+
+# Frame budget at the game's tick rate
+FRAME_BUDGET_MS = 1000.0 / FPS
+
+def load_records(path):
+    """
+    Memory-map a telemetry file and return its records as a structured array
+
+    Returns:
+        tuple: (records, session start time)
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, record_size, started = struct.unpack_from(HEADER_FORMAT, mapped)
+    if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+        raise ValueError(f"{path} is not a version {VERSION} telemetry file")
+    if RECORD_DTYPE.itemsize != RECORD_SIZE:
+        raise ValueError("RECORD_DTYPE is out of sync with telemetry.RECORD_FORMAT")
+
+    count = (len(mapped) - HEADER_SIZE) // RECORD_SIZE
+    records = np.frombuffer(mapped, dtype=RECORD_DTYPE, count=count, offset=HEADER_SIZE)
+    return records, started
+
+def summarize_session(records):
+    """Overall frame and update time statistics"""
+    frame_ms = records["frame_ms"]
+    return {
+        "frames": len(records),
+        "frame_ms_mean": float(frame_ms.mean()),
+        "frame_ms_p50": float(np.percentile(frame_ms, 50)),
+        "frame_ms_p99": float(np.percentile(frame_ms, 99)),
+        "frame_ms_max": float(frame_ms.max()),
+        "update_ms_mean": float(records["update_ms"].mean()),
+        "over_budget": float((frame_ms > FRAME_BUDGET_MS).mean()),
+    }
+
+def summarize_waves(records):
+    """Per-wave entity counts and frame time statistics"""
+    waves = []
+    for wave in np.unique(records["wave"]):
+        rows = records[records["wave"] == wave]
+        waves.append({
+            "wave": int(wave),
+            "frames": len(rows),
+            "enemies_mean": float(rows["enemies"].mean()),
+            "enemies_max": int(rows["enemies"].max()),
+            "projectiles_max": int(rows["projectiles"].max()),
+            "collisions_mean": float(rows["collisions"].mean()),
+            "frame_ms_mean": float(rows["frame_ms"].mean()),
+            "frame_ms_p99": float(np.percentile(rows["frame_ms"], 99)),
+            "update_ms_mean": float(rows["update_ms"].mean()),
+        })
+    return waves
+
+def frame_time_by_entities(records, bucket=10):
+    """Mean and p99 frame time for each bucket of total entity count"""
+    entities = records["enemies"].astype(np.int64) + records["projectiles"]
+    buckets = entities // bucket
+    table = []
+    for b in np.unique(buckets):
+        rows = records["frame_ms"][buckets == b]
+        table.append((int(b) * bucket, len(rows), float(rows.mean()), float(np.percentile(rows, 99))))
+    return table
+
+def collapse_wave(waves, budget_ms=FRAME_BUDGET_MS):
+    """Return the first wave whose p99 frame time misses the budget, or None"""
+    for wave in waves:
+        if wave["frame_ms_p99"] > budget_ms:
+            return wave["wave"]
+    return None
+
+def plot_session(records, path):
+    """Plot frame time against entity count and over the session"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    entities = records["enemies"].astype(np.int64) + records["projectiles"]
+    fig, (left, right) = plt.subplots(1, 2, figsize=(12, 5))
+
+    left.scatter(entities, records["frame_ms"], s=2, alpha=0.3)
+    left.axhline(FRAME_BUDGET_MS, color="red", linewidth=1)
+    left.set_xlabel("enemies + projectiles")
+    left.set_ylabel("frame time (ms)")
+
+    right.scatter(records["frame"], records["frame_ms"], c=records["wave"], s=2, cmap="viridis")
+    right.axhline(FRAME_BUDGET_MS, color="red", linewidth=1)
+    right.set_xlabel("frame")
+    right.set_ylabel("frame time (ms)")
+
+    fig.tight_layout()
+    fig.savefig(path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a Zombie Fighters telemetry file")
+    parser.add_argument("path", help="telemetry file written with main.py --telemetry")
+    parser.add_argument("--plot", help="save plots of frame time vs entity count to this image")
+    args = parser.parse_args()
+
+    records, _ = load_records(args.path)
+    if len(records) == 0:
+        print("No records")
+        return 1
+
+    session = summarize_session(records)
+    print(f"Frames: {session['frames']}")
+    print(f"Frame time: mean {session['frame_ms_mean']:.2f} ms, p50 {session['frame_ms_p50']:.2f} ms, "
+          f"p99 {session['frame_ms_p99']:.2f} ms, max {session['frame_ms_max']:.2f} ms")
+    print(f"Update time: mean {session['update_ms_mean']:.2f} ms")
+    print(f"Frames over budget: {session['over_budget'] * 100:.1f}%")
+
+    waves = summarize_waves(records)
+    print()
+    print(f"{'wave':>4} {'frames':>7} {'enemies':>8} {'max':>4} {'proj':>5} {'tests':>7} "
+          f"{'frame':>7} {'p99':>7} {'update':>7}")
+    for w in waves:
+        print(f"{w['wave']:>4} {w['frames']:>7} {w['enemies_mean']:>8.1f} {w['enemies_max']:>4} "
+              f"{w['projectiles_max']:>5} {w['collisions_mean']:>7.0f} {w['frame_ms_mean']:>7.2f} "
+              f"{w['frame_ms_p99']:>7.2f} {w['update_ms_mean']:>7.2f}")
+
+    print()
+    print(f"{'entities':>8} {'frames':>7} {'mean ms':>8} {'p99 ms':>8}")
+    for entities, frames, mean_ms, p99_ms in frame_time_by_entities(records):
+        print(f"{entities:>8} {frames:>7} {mean_ms:>8.2f} {p99_ms:>8.2f}")
+
+    wave = collapse_wave(waves)
+    print()
+    if wave is None:
+        print("Every wave stayed within the frame budget")
+    else:
+        print(f"Performance collapses at wave {wave} (p99 over {FRAME_BUDGET_MS:.1f} ms)")
+
+    if args.plot:
+        try:
+            plot_session(records, args.plot)
+        except ImportError:
+            print("Plotting requires matplotlib")
+            return 1
+        print(f"Saved plot to {args.plot}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Tilemap layer built from the Zombie Asset Pack tilesets
+
+Levels place runs of named tiles (a tile repeated across columns and rows).
+Tiles are only drawn when a level chunk is baked, never once per frame.
+"""
+import os
+import pygame
+from settings import TILESET_DIR
+from debug import add_debug
+from surface_memory import surface_memory
+
+# Named tile regions: (sheet, (x, y, width, height))
+TILES = {
+    "stone_pillar": ("tileset.png", (12, 12, 24, 84)),
+    "stone_post": ("tileset.png", (48, 16, 32, 32)),
+    "stone_ledge": ("tileset.png", (60, 64, 24, 16)),
+    "brick_pillar": ("tileset_2.png", (12, 12, 24, 84)),
+    "brick_post": ("tileset_2.png", (48, 16, 32, 32)),
+    "brick_ledge": ("tileset_2.png", (60, 64, 24, 16)),
+    "road": ("road_tileset.png", (0, 0, 32, 64)),
+    "sidewalk": ("road_tileset.png", (0, 0, 32, 16)),
+    "asphalt": ("road_tileset.png", (0, 34, 32, 30)),
+}
+
+# Tile ids stored in compiled levels. Only ever append to this list,
+# or compiled levels will point at the wrong tiles.
+TILE_NAMES = (
+    "stone_pillar", "stone_post", "stone_ledge",
+    "brick_pillar", "brick_post", "brick_ledge",
+    "road", "sidewalk", "asphalt",
+)
+
+# Loaded tile sheets and tile images, filled on first use
+_sheets = {}
+_tiles = {}
+
+def tile_size(name):
+    """Width and height of a named tile"""
+    _, (_, _, width, height) = TILES[name]
+    return width, height
+
+def get_tile(name):
+    """Return the image for a named tile, cutting it from its sheet on first use"""
+    tile = _tiles.get(name)
+    if tile is None:
+        sheet_name, rect = TILES[name]
+        sheet = _sheets.get(sheet_name)
+        if sheet is None:
+            path = os.path.join(TILESET_DIR, sheet_name)
+            try:
+                sheet = pygame.image.load(path)
+                if pygame.display.get_surface():
+                    sheet = sheet.convert_alpha()
+            except (pygame.error, FileNotFoundError) as e:
+                add_debug("Failed to load tileset %s: %s", path, e)
+                # Magenta placeholder so missing tiles are obvious
+                sheet = pygame.Surface((96, 96))
+                sheet.fill((255, 0, 255))
+            _sheets[sheet_name] = surface_memory.track(sheet, "tilemap")
+        tile = surface_memory.track(sheet.subsurface(rect), "tilemap")
+        _tiles[name] = tile
+    return tile
+
+class TileRun:
+    """A tile repeated across columns and rows at a fixed spot in the level"""
+    __slots__ = ("x", "y", "width", "height", "tile", "columns", "rows")
+
+    def __init__(self, x, y, tile, columns=1, rows=1):
+        tile_width, tile_height = tile_size(tile)
+        self.x = x
+        self.y = y
+        self.tile = tile
+        self.columns = columns
+        self.rows = rows
+        self.width = tile_width * columns
+        self.height = tile_height * rows
+
+    def draw(self, surface, offset_x, offset_y=0):
+        """Draw the tiles that land on the surface, with the given offset"""
+        image = get_tile(self.tile)
+        tile_width, tile_height = image.get_size()
+
+        # Skip columns that fall outside the surface
+        first = max(0, int(offset_x - self.x) // tile_width)
+        last = min(self.columns, int(offset_x + surface.get_width() - self.x) // tile_width + 1)
+
+        surface.blits([
+            (image, (self.x + column * tile_width - offset_x, self.y + row * tile_height - offset_y))
+            for row in range(self.rows)
+            for column in range(first, last)
+        ], doreturn=False)
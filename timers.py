@@ -0,0 +1,109 @@
+"""
+Hierarchical timing wheel for entity timers
+
+Entities schedule a callback for the tick a timer runs out (an attack
+ending, a hit flash fading) instead of counting down every frame. Level 0
+of the wheel has one slot per tick; every level above it has slots
+TIMER_WHEEL_SLOTS times as wide, and its timers cascade down a level once
+the wheel reaches their slot. Advancing one tick only touches the timers
+that are due, plus an occasional cascade, however many are pending.
+"""
+from settings import TIMER_WHEEL_BITS, TIMER_WHEEL_LEVELS
+
+class Timer:
+    """A scheduled callback; keep it to cancel the timer"""
+
+    __slots__ = ("expires", "callback", "args")
+
+    def __init__(self, expires, callback, args):
+        self.expires = expires  # Tick the callback runs on
+        self.callback = callback
+        self.args = args
+
+    @property
+    def pending(self):
+        return self.callback is not None
+
+    def cancel(self):
+        """Stop the callback from running; the wheel drops the timer when it reaches it"""
+        self.callback = None
+        self.args = ()
+
+class TimingWheel:
+    """Timers of one simulation, advanced once per tick"""
+
+    def __init__(self, bits=TIMER_WHEEL_BITS, levels=TIMER_WHEEL_LEVELS):
+        self.bits = bits
+        self.mask = (1 << bits) - 1
+        self.levels = [[[] for _ in range(1 << bits)] for _ in range(levels)]
+        self.tick = 0
+        self.fired = 0  # Callbacks run by the last advance()
+
+    def clear(self, tick=0):
+        """Drop every timer and restart the wheel at the given tick"""
+        for level in self.levels:
+            for slot in level:
+                slot.clear()
+        self.tick = tick
+
+    def __len__(self):
+        """Timers still pending"""
+        return sum(timer.pending for level in self.levels for slot in level for timer in slot)
+
+    def schedule(self, delay, callback, *args):
+        """
+        Run callback(*args) a number of ticks from now
+
+        Args:
+            delay (int): Ticks from now, at least 1
+            callback (callable): Called when the wheel reaches the tick
+
+        Returns:
+            Timer: Handle that can cancel the timer
+        """
+        return self.schedule_at(self.tick + max(delay, 1), callback, *args)
+
+    def schedule_at(self, tick, callback, *args):
+        """Run callback(*args) on the given future tick, e.g. to restore a saved timer"""
+        # The current tick's slot has already run
+        timer = Timer(max(tick, self.tick + 1), callback, args)
+        self._insert(timer)
+        return timer
+
+    def _insert(self, timer):
+        # A timer goes on the lowest level whose slot range holds both now
+        # and its expiry; the top level takes anything further out
+        expires = timer.expires
+        bits = self.bits
+        top = len(self.levels) - 1
+        level = 0
+        while level < top and (expires >> (bits * (level + 1))) != (self.tick >> (bits * (level + 1))):
+            level += 1
+        self.levels[level][(expires >> (bits * level)) & self.mask].append(timer)
+
+    def advance(self):
+        """Move to the next tick and run every callback due on it"""
+        self.tick += 1
+        tick = self.tick
+        bits = self.bits
+
+        # At the start of a level's slot its timers move down a level,
+        # highest level first so they can cascade all the way to level 0
+        for level in range(len(self.levels) - 1, 0, -1):
+            if tick & ((1 << (bits * level)) - 1) == 0:
+                slot = self.levels[level][(tick >> (bits * level)) & self.mask]
+                due, slot[:] = slot[:], []
+                for timer in due:
+                    if timer.callback is not None:
+                        self._insert(timer)
+
+        slot = self.levels[0][tick & self.mask]
+        due, slot[:] = slot[:], []
+        self.fired = 0
+        for timer in due:
+            callback = timer.callback
+            if callback is not None:
+                # Cleared first so a callback can tell its timer has run out
+                timer.callback = None
+                callback(*timer.args)
+                self.fired += 1
@@ -0,0 +1,87 @@
+"""
+Balance values one game is played with
+
+GameplayState takes a Tuning and everything in the simulation that
+depends on a balance value reads it from there: the wave count and size,
+and the enemy types and weapons in play. Defaults come from settings and
+the shared registries. A balance sweep changes a game by building a
+Tuning with overrides rather than by patching module globals; enemy types
+and weapons whose stats are overridden are copies owned by the Tuning, so
+the registries themselves are never modified.
+"""
+import copy
+from settings import MAX_WAVES, WAVE_BASE_ENEMIES
+from enemy_types import ENEMY_TYPE_LIST, ENEMY_TYPE_NAMES
+from weapons import WEAPON_LIST, WEAPON_NAMES
+
+def with_stats(entry, stats):
+    """
+    An enemy type or weapon with some of its stats replaced
+
+    Args:
+        entry (EnemyType or WeaponType): Registry entry
+        stats (dict): {attribute: value}, or None to keep the entry as it is
+
+    Returns:
+        The entry itself if nothing is replaced, otherwise a copy
+    """
+    if not stats:
+        return entry
+    entry = copy.copy(entry)
+    for attribute, value in stats.items():
+        if not hasattr(entry, attribute):
+            raise AttributeError(f"{entry.name} has no stat {attribute!r}")
+        setattr(entry, attribute, value)
+    return entry
+
+class Tuning:
+    """Wave rules, enemy types and weapons of one game"""
+
+    def __init__(self, max_waves=MAX_WAVES, wave_base_enemies=WAVE_BASE_ENEMIES,
+                 enemy_stats=None, weapon_stats=None):
+        """
+        Args:
+            max_waves (int): Waves to complete for victory
+            wave_base_enemies (int): Wave N brings wave_base_enemies + N zombies
+            enemy_stats (dict): {enemy type name: {attribute: value}} to override
+            weapon_stats (dict): {weapon name: {attribute: value}} to override
+        """
+        enemy_stats = enemy_stats or {}
+        weapon_stats = weapon_stats or {}
+        for name in enemy_stats:
+            if name not in ENEMY_TYPE_NAMES:
+                raise KeyError(f"No enemy type {name!r}")
+        for name in weapon_stats:
+            if name not in WEAPON_NAMES:
+                raise KeyError(f"No weapon {name!r}")
+
+        self.max_waves = max_waves
+        self.wave_base_enemies = wave_base_enemies
+        # Same order as the registries, so ids saved in snapshots index these too
+        self.enemy_types = [with_stats(t, enemy_stats.get(t.name)) for t in ENEMY_TYPE_LIST]
+        self.weapons = [with_stats(w, weapon_stats.get(w.name)) for w in WEAPON_LIST]
+        self.enemy_type_names = {t.name: t for t in self.enemy_types}
+        self.weapon_names = {w.name: w for w in self.weapons}
+
+    def wave_size(self, wave):
+        """Zombies in the given wave"""
+        return self.wave_base_enemies + wave
+
+    def enemy_type(self, name):
+        return self.enemy_type_names[name]
+
+    def weapon(self, name):
+        return self.weapon_names[name]
+
+    def choose_enemy_type(self, wave, rng):
+        """
+        Pick a random type among those that appear by this wave, by spawn weight
+
+        Args:
+            wave (int): Wave the enemy spawns in
+            rng (random.Random): Random generator of the game
+        """
+        available = [t for t in self.enemy_types if t.first_wave <= wave]
+        if len(available) == 1:
+            return available[0]
+        return rng.choices(available, weights=[t.spawn_weight for t in available])[0]
@@ -7,7 +7,7 @@ from settings import (
     RED, WHITE, YELLOW, BLACK, MENU_OPTIONS, LEVEL_OPTIONS,
     PAUSE_OPTIONS, GAMEOVER_OPTIONS, VICTORY_OPTIONS, MAX_WAVES
 )
-from debug import draw_debug_info
+from surface_memory import surface_memory
 
 def draw_menu(screen, background, selected_option):
     """Draw the main menu screen"""
@@ -55,7 +55,8 @@ def draw_controls(screen):
         "A - Move Left",
         "D - Move Right",
         "SPACE - Jump",
-        "Left Click - Shoot",
+        "Left Click - Shoot (hold for automatic fire)",
+        "1-4 - Switch Weapon",
         "ESC - Pause Game",
         "F3 - Toggle Debug Mode"
     ]
@@ -83,7 +84,7 @@ def draw_health_bar(screen, player):
     health_text = UI_FONT.render(f"Health: {player.health}/{player.max_health}", True, WHITE)
     screen.blit(health_text, (10, 40))
 
-def draw_gameplay_ui(screen, player, score, wave):
+def draw_gameplay_ui(screen, player, score, wave, max_waves=MAX_WAVES):
     """Draw the in-game UI elements"""
     # Draw health bar
     draw_health_bar(screen, player)
@@ -92,8 +93,12 @@ def draw_gameplay_ui(screen, player, score, wave):
     score_text = UI_FONT.render(f"Score: {score}", True, WHITE)
     screen.blit(score_text, (10, 70))
     
+    # Draw the weapon being held next to the health bar
+    weapon_text = UI_FONT.render(player.weapon.name.title(), True, WHITE)
+    screen.blit(weapon_text, (220, 5))
+    
     # Draw wave counter
-    wave_text = UI_FONT.render(f"Wave: {wave}/{MAX_WAVES}", True, WHITE)
+    wave_text = UI_FONT.render(f"Wave: {wave}/{max_waves}", True, WHITE)
     screen.blit(wave_text, (10, 100))
     
     # Draw progress bar for waves
@@ -106,50 +111,17 @@ def draw_gameplay_ui(screen, player, score, wave):
     pygame.draw.rect(screen, (100, 100, 100), (progress_x, progress_y, progress_width, progress_height))
     
     # Progress fill
-    wave_progress = min(1.0, wave / MAX_WAVES)
+    wave_progress = min(1.0, wave / max_waves)
     pygame.draw.rect(screen, (0, 255, 0), 
                     (progress_x, progress_y, int(progress_width * wave_progress), progress_height))
 
-def draw_gameplay(screen, player, platforms, obstacles, enemies, projectiles, score, wave, camera_offset_x, debug_mode):
-    """Draw the gameplay state"""
-    from level import draw_level_background
-    
-    # Draw level background
-    draw_level_background(screen)
-    
-    # Draw platforms
-    for platform in platforms:
-        platform.draw(screen, camera_offset_x)
-    
-    # Draw obstacles
-    for obstacle in obstacles:
-        obstacle.draw(screen, camera_offset_x)
-    
-    # Draw player
-    player.draw(screen, debug_mode)
-    
-    # Draw enemies
-    for enemy in enemies:
-        enemy.draw(screen, camera_offset_x, debug_mode)
-    
-    # Draw projectiles
-    for projectile in projectiles:
-        projectile.draw(screen, camera_offset_x, debug_mode)
-    
-    # Draw UI elements
-    draw_gameplay_ui(screen, player, score, wave)
-    
-    # Draw debug info if enabled
-    if debug_mode:
-        draw_debug_info(screen, player, camera_offset_x, enemies, projectiles)
-
 def draw_pause(screen, gameplay_screen, selected_option):
     """Draw the pause menu over the gameplay screen"""
     # First draw the gameplay (passed as a surface)
     screen.blit(gameplay_screen, (0, 0))
     
     # Draw semi-transparent overlay
-    overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+    overlay = surface_memory.track(pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA), "ui")
     overlay.fill((0, 0, 0, 128))  # Black with 50% transparency
     screen.blit(overlay, (0, 0))
     
@@ -181,7 +153,7 @@ def draw_gameover(screen, score, selected_option):
         text = MENU_FONT.render(option, True, color)
         screen.blit(text, (WIDTH // 2 - text.get_width() // 2, 300 + i * 60))
 
-def draw_victory(screen, score, wave, selected_option):
+def draw_victory(screen, score, wave, selected_option, max_waves=MAX_WAVES):
     """Draw the victory screen"""
     # Create a gradient background (dark blue to light blue)
     for y in range(HEIGHT):
@@ -205,7 +177,7 @@ def draw_victory(screen, score, wave, selected_option):
     score_text = MENU_FONT.render(f"Final Score: {score}", True, WHITE)
     screen.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, 220))
     
-    wave_text = MENU_FONT.render(f"Waves Completed: {wave}/{MAX_WAVES}", True, WHITE)
+    wave_text = MENU_FONT.render(f"Waves Completed: {wave}/{max_waves}", True, WHITE)
     screen.blit(wave_text, (WIDTH // 2 - wave_text.get_width() // 2, 270))
     
     # Congratulatory message
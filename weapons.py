@@ -0,0 +1,119 @@
+"""
+Weapon registry
+
+Each entry in settings.WEAPONS is loaded once into a WeaponType shared by
+everything holding that weapon. A shot's pellets are fanned evenly across
+the weapon's spread, nudged by its jitter, and added to the projectile
+list in one batch, so a shotgun blast or a burst of automatic fire costs
+one list extend rather than a call and a log record per bullet.
+"""
+import math
+import pygame
+from settings import WEAPONS, WEAPON_SCALE
+from debug import add_debug, ERROR
+from assets import asset_exists
+from surface_memory import surface_memory
+from projectile import Projectile
+from rotation_cache import RotationCache
+
+class WeaponType:
+    """Shared stats and sprites of one weapon; sprites are loaded on first use"""
+
+    def __init__(self, weapon_id, name, spec):
+        self.weapon_id = weapon_id  # Position in the registry, saved in snapshots
+        self.name = name
+        self.sprite_source = spec["sprite"]  # (path, frames)
+        self.fire_interval = spec["fire_interval"]
+        self.automatic = spec["automatic"]
+        self.pellets = spec["pellets"]
+        self.jitter = math.radians(spec["jitter"])
+
+        # Angle of each pellet from the aim, evenly across the spread
+        spread = math.radians(spec["spread"])
+        if self.pellets > 1:
+            self.offsets = tuple(-spread / 2 + spread * i / (self.pellets - 1) for i in range(self.pellets))
+        else:
+            self.offsets = (0.0,)
+
+        stats = spec["projectile"]
+        self.projectile_speed = stats["speed"]
+        self.projectile_damage = stats["damage"]
+        self.projectile_radius = stats["radius"]
+        self.projectile_max_age = stats["max_age"]
+        self._frames = None
+
+    @property
+    def frames(self):
+        """Sprite frames pointing right: ready first, then the reload animation"""
+        if self._frames is None:
+            self._frames = tuple(surface_memory.track_all(self.load_frames(), "weapons"))
+        return self._frames
+
+    def load_frames(self):
+        """Load the weapon's sheet, cropped to the area its frames use and scaled up"""
+        path, count = self.sprite_source
+        if not asset_exists(path):
+            add_debug("%s: Missing sprite %s", self.name.capitalize(), path, level=ERROR)
+            return []
+        try:
+            sheet = pygame.image.load(path).convert_alpha()
+            size = sheet.get_width() // count
+            frames = [sheet.subsurface((i * size, 0, size, sheet.get_height())) for i in range(count)]
+            bounds = frames[0].get_bounding_rect()
+            for frame in frames[1:]:
+                bounds = bounds.union(frame.get_bounding_rect())
+            return [pygame.transform.scale(frame.subsurface(bounds),
+                                           (bounds.width * WEAPON_SCALE, bounds.height * WEAPON_SCALE))
+                    for frame in frames]
+        except Exception as e:
+            add_debug("%s: Error loading sprite: %s", self.name.capitalize(), e, level=ERROR)
+            return []
+
+    def frame(self, reload_progress):
+        """
+        Sprite for how far the weapon is through reloading
+
+        Args:
+            reload_progress (float): 0 just after firing up to 1 when ready
+
+        Returns:
+            Surface: The frame, or None if the weapon has no sprite
+        """
+        frames = self.frames
+        if not frames:
+            return None
+        if reload_progress >= 1 or len(frames) == 1:
+            return frames[0]
+        return frames[1 + min(int(reload_progress * (len(frames) - 1)), len(frames) - 2)]
+
+    def fire(self, x, y, angle, projectiles, rng):
+        """
+        Add one shot's pellets to the projectile list
+
+        Args:
+            x (float): World x of the muzzle
+            y (float): Y of the muzzle
+            angle (float): Aim in radians, screen y pointing down
+            projectiles (list): Projectiles, extended in one batch
+            rng (random.Random): Random generator of the game, for the jitter
+        """
+        jitter = self.jitter
+        if jitter:
+            uniform = rng.uniform
+            angles = [angle + offset + uniform(-jitter, jitter) for offset in self.offsets]
+        else:
+            angles = [angle + offset for offset in self.offsets]
+        projectiles.extend([Projectile(x, y, math.cos(a), math.sin(a), self) for a in angles])
+
+# Registry in settings order; a weapon's weapon_id indexes this list
+WEAPON_LIST = [WeaponType(i, name, spec) for i, (name, spec) in enumerate(WEAPONS.items())]
+WEAPON_NAMES = {weapon.name: weapon for weapon in WEAPON_LIST}
+
+# Weapon frames at every aim direction drawn so far, shared by all players
+weapon_rotations = RotationCache("weapons")
+
+def get_weapon(name):
+    return WEAPON_NAMES[name]
+
+def weapon_by_id(weapon_id):
+    return WEAPON_LIST[weapon_id]